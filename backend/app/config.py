@@ -17,6 +17,46 @@ class Settings(BaseSettings):
     database_url: str = "sqlite+aiosqlite:///./labelcheck.db"
     upload_dir: str = "./uploads"
     log_level: str = "info"
+    provider_warmup: bool = True
+    cache_dir: str = "./cache"
+    ocr_cache_enabled: bool = True
+    ocr_cache_max_mb: int = 256
+    llm_cache_enabled: bool = True
+    llm_cache_max_mb: int = 64
+    llm_cache_ttl_hours: float = 168
+    cpu_executor_kind: str = "thread"
+    cpu_executor_workers: int = 0
+    ocr_preprocess_enabled: bool = False
+    ocr_max_side: int = 2048
+    ocr_grayscale: bool = True
+    ocr_encode_format: str = "jpeg"
+    ocr_jpeg_quality: int = 90
+    status_mode: str = "durable"
+    status_group_commit: bool = False
+    status_group_commit_max_batch: int = 64
+    status_group_commit_delay_ms: float = 5.0
+    sqlite_profile_enabled: bool = False
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_synchronous: str = "normal"
+    sqlite_mmap_size_mb: int = 256
+    sqlite_read_pool_size: int = 8
+    history_count_ttl_seconds: float = 30.0
+    fast_json_responses: bool = True
+    response_cache_max_mb: int = 32
+    batch_progress_flush_ms: float = 250.0
+    batch_progress_flush_items: int = 20
+    job_concurrency: int = 5
+    job_claim_size: int = 20
+    job_interactive_reserve: int = 2
+    job_lease_seconds: float = 120.0
+    job_max_attempts: int = 3
+    job_poll_interval_seconds: float = 2.0
+    api_runs_jobs: bool = True
+    status_poll_seconds: float = 1.0
+    scheduler_ocr_concurrency: int = 8
+    scheduler_llm_concurrency: int = 4
+    scheduler_cpu_concurrency: int = 0
+    scheduler_batch_max_wait_ms: float = 2000.0
 
     model_config = {"env_file": str(_ENV_FILE), "env_file_encoding": "utf-8", "extra": "ignore"}
 
@@ -1,8 +1,43 @@
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from app.models.base import Base
 
+logger = logging.getLogger(__name__)
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    """Add nullable columns introduced since a table was first created.
+
+    ``create_all`` never alters existing tables, so an older database would
+    otherwise miss columns the models now map.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                logger.warning("Cannot add NOT NULL column %s.%s in place", table.name, column.name)
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
+def _create_missing_indexes(conn: Connection) -> None:
+    """Create indexes declared on tables that already existed."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
 
 async def create_all_tables(engine: AsyncEngine) -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
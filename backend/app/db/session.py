@@ -1,9 +1,60 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from app.config import settings
+from app.config import Settings, settings
 
-engine = create_async_engine(settings.database_url, echo=False)
+SQLITE_SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+
+
+def _uses_sqlite_file(database_url: str) -> bool:
+    return database_url.startswith("sqlite") and ":memory:" not in database_url
+
+
+def _install_pragmas(engine: AsyncEngine, pragmas: list[str]) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _apply(dbapi_connection, _record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def create_engines(config: Settings) -> tuple[AsyncEngine, AsyncEngine]:
+    """Build the (writer, reader) engine pair for ``config.database_url``.
+
+    Without the SQLite profile both are the same default engine. With it,
+    every connection runs in WAL mode with the configured busy timeout, mmap
+    size and synchronous level, and reads get their own ``query_only`` pool
+    so GET routes and SSE pollers don't queue behind pipeline writes.
+    """
+    engine = create_async_engine(config.database_url, echo=False)
+    if not (config.sqlite_profile_enabled and _uses_sqlite_file(config.database_url)):
+        return engine, engine
+
+    synchronous = config.sqlite_synchronous.lower()
+    if synchronous not in SQLITE_SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Unknown SQLite synchronous level: {config.sqlite_synchronous!r}")
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA busy_timeout={int(config.sqlite_busy_timeout_ms)}",
+        f"PRAGMA synchronous={synchronous.upper()}",
+        f"PRAGMA mmap_size={int(config.sqlite_mmap_size_mb) * 1024 * 1024}",
+    ]
+    _install_pragmas(engine, pragmas)
+
+    read_engine = create_async_engine(
+        config.database_url,
+        echo=False,
+        pool_size=config.sqlite_read_pool_size,
+        max_overflow=0,
+    )
+    _install_pragmas(read_engine, pragmas + ["PRAGMA query_only=ON"])
+    return engine, read_engine
+
+
+engine, read_engine = create_engines(settings)
 async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+read_session_factory = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_async_session() -> AsyncSession:
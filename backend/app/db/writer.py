@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class GroupCommitWriter:
+    """Runs queued writes from many tasks in shared transactions.
+
+    Each ``submit`` call queues an operation; a single background task
+    collects whatever arrives within ``max_delay_ms`` (up to ``max_batch``
+    operations), applies them in one session and commits once. On SQLite that
+    turns N concurrent terminal-state writes into one fsync and one hold of
+    the writer lock. If the group fails, its operations are retried one by
+    one so a single bad write can't sink the others.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch: int = 64,
+        max_delay_ms: float = 5.0,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000
+        self._queue: asyncio.Queue[tuple[WriteOp, asyncio.Future] | None] | None = None
+        self._task: asyncio.Task | None = None
+        self._commits = 0
+        self._writes = 0
+        self._largest_group = 0
+
+    async def submit(self, op: WriteOp) -> Any:
+        """Queue ``op`` and wait until the transaction containing it has committed."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(self._queue))
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            group = [await queue.get()]
+            # Give concurrent writers a moment to join, then take everything queued
+            if self._max_delay and queue.qsize() < self._max_batch - 1:
+                await asyncio.sleep(self._max_delay)
+            while len(group) < self._max_batch and not queue.empty():
+                group.append(queue.get_nowait())
+
+            stop = None in group
+            group = [item for item in group if item is not None]
+            if group:
+                await self._commit_group(group)
+            if stop:
+                return
+
+    async def _commit_group(self, group: list[tuple[WriteOp, asyncio.Future]]) -> None:
+        try:
+            async with self._session_factory() as session:
+                results = [await op(session) for op, _ in group]
+                await session.commit()
+        except Exception as exc:
+            if len(group) == 1:
+                _, future = group[0]
+                if not future.done():
+                    future.set_exception(exc)
+                return
+            logger.warning("Group commit of %d writes failed; retrying individually", len(group))
+            for item in group:
+                await self._commit_group([item])
+            return
+
+        self._commits += 1
+        self._writes += len(group)
+        self._largest_group = max(self._largest_group, len(group))
+        for (_, future), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "commits": self._commits,
+            "writes": self._writes,
+            "mean_group_size": round(self._writes / self._commits, 2) if self._commits else 0.0,
+            "largest_group": self._largest_group,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    async def aclose(self) -> None:
+        """Stop the writer once everything already queued has been committed."""
+        if self._task is None or self._queue is None:
+            return
+        if not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
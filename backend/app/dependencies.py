@@ -4,15 +4,24 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.config import settings
 from app.db.session import async_session_factory as _default_factory
-from app.services.compliance.engine import ComplianceEngine
-from app.services.llm.azure_openai import AzureOpenAILLMService
+from app.db.session import read_session_factory as _default_read_factory
+from app.providers import Providers
+from app.services.cache import MemoryLRUCache
+from app.services.events import BatchProgressHub
+from app.services.history import CountCache
+from app.services.jobs import JobDispatcher
 from app.services.llm.base import LLMServiceProtocol
-from app.services.ocr.azure_vision import AzureVisionOCRService
 from app.services.ocr.base import OCRServiceProtocol
 from app.services.pipeline import AnalysisPipeline
+from app.services.status import StatusRegistry
 
-# Overridable session factory — tests swap this to point at the in-memory DB
+# Overridable session factories — tests swap these to point at the in-memory DB.
+# The read factory is a separate query-only pool under the SQLite profile.
 session_factory: async_sessionmaker[AsyncSession] = _default_factory
+read_session_factory: async_sessionmaker[AsyncSession] = _default_read_factory
+
+# App-scoped providers — installed by the lifespan in app.main; tests swap this for fakes
+providers: Providers | None = None
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -20,21 +29,54 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session_factory() as session:
+        yield session
+
+
+def get_providers() -> Providers:
+    global providers
+    if providers is None:
+        # Outside the app lifespan (scripts, ad-hoc use) build on first use
+        providers = Providers.from_settings(settings)
+    return providers
+
+
 def get_ocr_service() -> OCRServiceProtocol:
-    return AzureVisionOCRService(settings.azure_vision_endpoint, settings.azure_vision_key)
+    return get_providers().ocr
 
 
 def get_llm_service() -> LLMServiceProtocol:
-    return AzureOpenAILLMService(
-        settings.azure_openai_endpoint,
-        settings.azure_openai_key,
-        settings.azure_openai_deployment,
-        settings.azure_openai_api_version,
-    )
+    return get_providers().llm
 
 
 def get_pipeline() -> AnalysisPipeline:
-    ocr = get_ocr_service()
-    llm = get_llm_service()
-    engine = ComplianceEngine(llm)
-    return AnalysisPipeline(ocr, engine)
+    return get_providers().pipeline
+
+
+def get_status_registry() -> StatusRegistry:
+    return get_providers().status
+
+
+def get_history_counts() -> CountCache:
+    return get_providers().history_counts
+
+
+def get_response_cache() -> MemoryLRUCache:
+    return get_providers().responses
+
+
+def get_batch_progress() -> BatchProgressHub:
+    return get_providers().batch_progress
+
+
+def get_job_dispatcher() -> JobDispatcher:
+    """The providers' job dispatcher, started on first use with the current session factory.
+
+    With ``api_runs_jobs`` off it is never started here: separate worker
+    processes claim the jobs, and ``notify`` is a no-op.
+    """
+    dispatcher = get_providers().jobs
+    if settings.api_runs_jobs:
+        dispatcher.start(session_factory)
+    return dispatcher
@@ -4,24 +4,59 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import dependencies
 from app.config import settings
 from app.db.init_db import create_all_tables
 from app.db.session import engine
+from app.providers import Providers
 from app.routers import analysis, batch, health, samples
+from app.services.batch_progress import recover_batch_counts
+from app.services.jobs import sweep_jobs
 
 logging.basicConfig(level=settings.log_level.upper())
 logger = logging.getLogger(__name__)
 
 
+async def resume_queued_work() -> None:
+    """Repair what a previous process left behind, then start running queued jobs."""
+    # Batch counters are flushed lazily; rebuild any a previous process left behind
+    recovered = await recover_batch_counts(dependencies.session_factory)
+    if recovered:
+        logger.info("Recomputed progress for %d unfinished batches", recovered)
+
+    reclaimed, queued = await sweep_jobs(dependencies.session_factory)
+    if reclaimed or queued:
+        logger.info("Requeued %d jobs with lapsed leases and %d orphaned batch items", reclaimed, queued)
+    dependencies.get_job_dispatcher()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Import models so metadata is populated
-    from app.models import analysis, batch, label  # noqa: F401
+    from app.models import analysis, batch, job, label  # noqa: F401
 
     logger.info("Creating database tables...")
     await create_all_tables(engine)
     logger.info("Database ready")
-    yield
+
+    # Build OCR/LLM clients once so requests share their connection pools.
+    # A container installed beforehand (tests) is left alone.
+    owns_providers = dependencies.providers is None
+    if owns_providers:
+        dependencies.providers = Providers.from_settings(settings)
+        if settings.provider_warmup:
+            await dependencies.providers.warmup()
+            logger.info("Providers warmed up")
+
+    await resume_queued_work()
+
+    try:
+        yield
+    finally:
+        await dependencies.get_providers().jobs.stop()
+        if owns_providers and dependencies.providers is not None:
+            await dependencies.providers.aclose()
+            dependencies.providers = None
 
 
 app = FastAPI(
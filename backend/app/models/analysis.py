@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Enum, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, generate_uuid
@@ -22,6 +22,12 @@ class OverallVerdict(str, enum.Enum):
 
 class AnalysisResult(Base, TimestampMixin):
     __tablename__ = "analysis_results"
+    __table_args__ = (
+        # History listing: newest-first keyset pages, with and without a verdict filter
+        Index("ix_analysis_results_created_at_id", "created_at", "id"),
+        Index("ix_analysis_results_verdict_created_at_id", "overall_verdict", "created_at", "id"),
+        Index("ix_analysis_results_label_id", "label_id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     label_id: Mapped[str] = mapped_column(
@@ -51,5 +57,7 @@ class AnalysisResult(Base, TimestampMixin):
     detected_brand_name: Mapped[str | None] = mapped_column(String, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     total_duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Per-stage durations (JSON object of name -> ms)
+    stage_timings: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     label: Mapped["Label"] = relationship(back_populates="analysis")
@@ -0,0 +1,45 @@
+import enum
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, TimestampMixin, generate_uuid
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    # Gave up after too many attempts
+    FAILED = "failed"
+
+
+class AnalysisJob(Base, TimestampMixin):
+    """One queued pipeline run for an analysis.
+
+    A dispatcher claims a job by setting ``claimed_by`` and a lease; while it
+    runs the job it keeps extending the lease. A job whose lease has lapsed
+    belonged to a process that died and can be claimed again.
+    """
+
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        # Claiming: queued jobs oldest first, plus running jobs with a lapsed lease
+        Index("ix_analysis_jobs_status_created_at", "status", "created_at"),
+        Index("ix_analysis_jobs_status_lease", "status", "lease_expires_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
+    analysis_id: Mapped[str] = mapped_column(
+        String, ForeignKey("analysis_results.id"), nullable=False, unique=True
+    )
+    batch_id: Mapped[str | None] = mapped_column(
+        String, ForeignKey("batch_jobs.id"), nullable=True
+    )
+    status: Mapped[str] = mapped_column(
+        Enum(JobStatus), default=JobStatus.QUEUED, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    claimed_by: Mapped[str | None] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, generate_uuid
@@ -6,6 +6,10 @@ from app.models.base import Base, TimestampMixin, generate_uuid
 
 class Label(Base, TimestampMixin):
     __tablename__ = "labels"
+    __table_args__ = (
+        # Batch detail pages and batch counter recomputes
+        Index("ix_labels_batch_id", "batch_id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=generate_uuid)
     original_filename: Mapped[str] = mapped_column(String, nullable=False)
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import os
+
+from app.config import Settings
+from app.db.writer import GroupCommitWriter
+from app.services.cache import DiskLRUCache, MemoryLRUCache
+from app.services.compliance.engine import ComplianceEngine
+from app.services.events import BatchProgressHub
+from app.services.executors import CPUExecutor
+from app.services.history import CountCache
+from app.services.image import OCRPreprocessOptions
+from app.services.jobs import JobDispatcher
+from app.services.llm.azure_openai import AzureOpenAILLMService
+from app.services.llm.base import LLMServiceProtocol
+from app.services.llm.cache import CachedLLMService
+from app.services.llm.scheduled import ScheduledLLMService
+from app.services.ocr.azure_vision import AzureVisionOCRService
+from app.services.ocr.base import OCRServiceProtocol
+from app.services.ocr.cache import CachedOCRService
+from app.services.ocr.scheduled import ScheduledOCRService
+from app.services.pipeline import AnalysisPipeline
+from app.services.scheduler import StageScheduler
+from app.services.status import STATUS_MODES, StatusRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class Providers:
+    """App-scoped container for the OCR/LLM clients and the pipeline built on them.
+
+    Built once in the app lifespan so every request shares the same HTTP
+    connection pools (keep-alive, no per-label TLS handshake). Tests install
+    their own instance with fake services via ``app.dependencies.providers``.
+    """
+
+    def __init__(
+        self,
+        ocr: OCRServiceProtocol,
+        llm: LLMServiceProtocol,
+        cpu_executor: CPUExecutor | None = None,
+        ocr_preprocess: OCRPreprocessOptions | None = None,
+        status_mode: str = "durable",
+        writer: GroupCommitWriter | None = None,
+        history_count_ttl_seconds: float = 30.0,
+        response_cache_max_bytes: int = 32 * 1024 * 1024,
+        job_options: dict | None = None,
+        scheduler: StageScheduler | None = None,
+    ) -> None:
+        if status_mode not in STATUS_MODES:
+            raise ValueError(f"Unknown status mode: {status_mode!r} (expected one of {STATUS_MODES})")
+        self.ocr = ocr
+        self.llm = llm
+        self.cpu_executor = cpu_executor
+        # Shared stage limits; from_settings also routes the OCR/LLM clients through it
+        self.scheduler = scheduler or StageScheduler()
+        self.status = StatusRegistry()
+        self.history_counts = CountCache(history_count_ttl_seconds)
+        # Serialized responses of terminal analyses, keyed by analysis id
+        self.responses = MemoryLRUCache(response_cache_max_bytes)
+        self.batch_progress = BatchProgressHub()
+        self.writer = writer
+        self.pipeline = AnalysisPipeline(
+            ocr, ComplianceEngine(llm), cpu_executor, ocr_preprocess,
+            status_registry=self.status,
+            scheduler=self.scheduler,
+            writer=writer,
+            defer_status=status_mode == "deferred",
+        )
+        # Runs queued analysis jobs; started by app.dependencies.get_job_dispatcher
+        self.jobs = JobDispatcher(self.pipeline, self.batch_progress, writer, **(job_options or {}))
+
+    @classmethod
+    def from_settings(cls, settings: Settings, job_overrides: dict | None = None) -> "Providers":
+        cpu_executor = CPUExecutor(settings.cpu_executor_kind, settings.cpu_executor_workers)
+        scheduler = StageScheduler(
+            ocr=settings.scheduler_ocr_concurrency,
+            llm=settings.scheduler_llm_concurrency,
+            cpu=settings.scheduler_cpu_concurrency or cpu_executor.max_workers,
+            batch_max_wait_ms=settings.scheduler_batch_max_wait_ms,
+        )
+
+        ocr: OCRServiceProtocol = ScheduledOCRService(
+            AzureVisionOCRService(settings.azure_vision_endpoint, settings.azure_vision_key),
+            scheduler,
+        )
+        if settings.ocr_cache_enabled:
+            cache = DiskLRUCache(
+                os.path.join(settings.cache_dir, "ocr_cache.sqlite3"),
+                max_bytes=settings.ocr_cache_max_mb * 1024 * 1024,
+            )
+            ocr = CachedOCRService(ocr, cache)
+
+        azure_llm = AzureOpenAILLMService(
+            settings.azure_openai_endpoint,
+            settings.azure_openai_key,
+            settings.azure_openai_deployment,
+            settings.azure_openai_api_version,
+        )
+        llm: LLMServiceProtocol = ScheduledLLMService(azure_llm, scheduler)
+        if settings.llm_cache_enabled:
+            cache = DiskLRUCache(
+                os.path.join(settings.cache_dir, "llm_cache.sqlite3"),
+                max_bytes=settings.llm_cache_max_mb * 1024 * 1024,
+            )
+            llm = CachedLLMService(
+                llm,
+                cache,
+                deployment=azure_llm.deployment,
+                temperature=azure_llm.temperature,
+                ttl_seconds=settings.llm_cache_ttl_hours * 3600,
+            )
+        ocr_preprocess = None
+        if settings.ocr_preprocess_enabled:
+            ocr_preprocess = OCRPreprocessOptions(
+                max_side=settings.ocr_max_side,
+                grayscale=settings.ocr_grayscale,
+                encode_format=settings.ocr_encode_format,
+                jpeg_quality=settings.ocr_jpeg_quality,
+            )
+        writer = None
+        # The SQLite profile funnels pipeline writes through one writer task
+        if settings.status_group_commit or settings.sqlite_profile_enabled:
+            from app.db.session import async_session_factory
+
+            writer = GroupCommitWriter(
+                async_session_factory,
+                max_batch=settings.status_group_commit_max_batch,
+                max_delay_ms=settings.status_group_commit_delay_ms,
+            )
+        return cls(
+            ocr, llm, cpu_executor, ocr_preprocess, settings.status_mode, writer,
+            settings.history_count_ttl_seconds, settings.response_cache_max_mb * 1024 * 1024,
+            job_options={
+                "concurrency": settings.job_concurrency,
+                "interactive_reserve": settings.job_interactive_reserve,
+                "claim_size": settings.job_claim_size,
+                "lease_seconds": settings.job_lease_seconds,
+                "max_attempts": settings.job_max_attempts,
+                "poll_interval": settings.job_poll_interval_seconds,
+                "flush_interval_ms": settings.batch_progress_flush_ms,
+                "flush_every": settings.batch_progress_flush_items,
+                **(job_overrides or {}),
+            },
+            scheduler=scheduler,
+        )
+
+    def metrics(self) -> dict:
+        metrics: dict = {"pipeline": self.pipeline.stats()}
+        if hasattr(self.ocr, "stats"):
+            metrics["ocr_cache"] = self.ocr.stats()
+        if hasattr(self.llm, "stats"):
+            metrics["llm_cache"] = self.llm.stats()
+        if self.cpu_executor is not None:
+            metrics["cpu_executor"] = self.cpu_executor.stats()
+        metrics["status"] = {"live": len(self.status)}
+        metrics["response_cache"] = self.responses.stats()
+        metrics["batch_progress"] = self.batch_progress.stats()
+        metrics["jobs"] = self.jobs.stats()
+        metrics["scheduler"] = self.scheduler.stats()
+        if self.writer is not None:
+            metrics["writer"] = self.writer.stats()
+        return metrics
+
+    async def warmup(self) -> None:
+        """Best-effort connection warm-up; failures are logged, never raised."""
+        for service in (self.ocr, self.llm):
+            warmup = getattr(service, "warmup", None)
+            if warmup is None:
+                continue
+            try:
+                await warmup()
+            except Exception as exc:
+                logger.warning("Warm-up failed for %s: %s", type(service).__name__, exc)
+
+    async def aclose(self) -> None:
+        await self.jobs.stop()
+        for service in (self.ocr, self.llm):
+            aclose = getattr(service, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception as exc:
+                logger.warning("Failed to close %s: %s", type(service).__name__, exc)
+        if self.writer is not None:
+            await self.writer.aclose()
+        if self.cpu_executor is not None:
+            await asyncio.to_thread(self.cpu_executor.shutdown)
@@ -1,27 +1,65 @@
+import asyncio
 import json
 import logging
 import os
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Literal
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Query, Response, UploadFile
-from fastapi.responses import FileResponse
-from sqlalchemy import func, select
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
-from app.dependencies import get_db, get_pipeline
+from app.dependencies import (
+    get_db,
+    get_history_counts,
+    get_pipeline,
+    get_read_db,
+    get_response_cache,
+    get_status_registry,
+)
 from app.models.analysis import AnalysisResult, AnalysisStatus
 from app.models.label import Label
 from app.routers import ALLOWED_MIME_TYPES
-from app.routers.converters import to_response
-from app.schemas.analysis import AnalysisListResponse, AnalysisResponse, BulkDeleteRequest, BulkDeleteResponse
+from app.routers.conditional import IMMUTABLE, REVALIDATE, cache_headers, is_not_modified, make_etag, not_modified
+from app.routers.converters import (
+    SUMMARY_COLUMNS,
+    json_envelope,
+    live_response,
+    response_json,
+    summary_json,
+    to_response,
+    to_summary,
+)
+from app.schemas.analysis import (
+    AnalysisListResponse,
+    AnalysisResponse,
+    AnalysisSummaryListResponse,
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+)
+from app.services.events import Topic
+from app.services.history import encode_cursor, history_query
+from app.services.jobs import delete_jobs, enqueue
 from app.services.pipeline import AnalysisPipeline
+from app.services.scheduler import Priority, run_priority
+from app.services.status import TERMINAL_STATUSES
 from app.services.storage import save_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
+# Comment lines sent on an idle event stream so proxies don't time it out
+SSE_HEARTBEAT_SECONDS = 15.0
+
+# Pipeline runs started by ?sync=true uploads. Held here so a run that
+# outlives its request's deadline isn't garbage-collected mid-flight.
+_detached_runs: set[asyncio.Task] = set()
+
 
 async def _run_pipeline(
     analysis_id: str,
@@ -33,7 +71,8 @@ async def _run_pipeline(
     from app.dependencies import session_factory
 
     async with session_factory() as db:
-        await pipeline.run(analysis_id, label_id, image_path, db, application_details)
+        with run_priority(Priority.INTERACTIVE):
+            await pipeline.run(analysis_id, label_id, image_path, db, application_details)
 
 
 @router.post("/single")
@@ -46,6 +85,8 @@ async def analyze_single(
     net_contents: str | None = Form(None),
     bottler_name_address: str | None = Form(None),
     country_of_origin: str | None = Form(None),
+    sync: bool = Query(False, description="Run inline and return the result if it finishes within timeout_ms"),
+    timeout_ms: int = Query(5000, ge=1, le=30000, description="Deadline for sync=true before falling back to 202"),
     db: AsyncSession = Depends(get_db),
 ):
     if file.content_type not in ALLOWED_MIME_TYPES:
@@ -84,45 +125,260 @@ async def analyze_single(
         application_details=json.dumps(app_details),
     )
     db.add(analysis)
+    await db.flush()
+    if not settings.api_runs_jobs:
+        # Worker processes run the pipeline; the API only queues it
+        enqueue(db, analysis.id)
     await db.commit()
+    get_history_counts().invalidate()
+
+    analysis_id = analysis.id
+    if not settings.api_runs_jobs:
+        if not sync:
+            return {"analysis_id": analysis_id}
+        return await _await_queued(analysis_id, db, timeout_ms / 1000)
 
     pipeline = get_pipeline()
-    background_tasks.add_task(_run_pipeline, analysis.id, label.id, stored_path, pipeline, app_details)
+    if not sync:
+        background_tasks.add_task(_run_pipeline, analysis_id, label.id, stored_path, pipeline, app_details)
+        return {"analysis_id": analysis_id}
+
+    run = asyncio.ensure_future(_run_pipeline(analysis_id, label.id, stored_path, pipeline, app_details))
+    _detached_runs.add(run)
+    run.add_done_callback(_detached_runs.discard)
+    try:
+        # Shielded: missing the deadline (or the client leaving) must not stop the run
+        await asyncio.wait_for(asyncio.shield(run), timeout_ms / 1000)
+    except TimeoutError:
+        return JSONResponse(
+            status_code=202,
+            content={"analysis_id": analysis_id},
+            headers={"Location": f"/api/analysis/{analysis_id}"},
+        )
 
-    return {"analysis_id": analysis.id}
+    # The run wrote through its own session; drop this one's stale PENDING copy
+    db.expire_all()
+    current = await _read_current(analysis_id, db)
+    return Response(content=current.json(), media_type="application/json")
+
+
+async def _await_queued(analysis_id: str, db: AsyncSession, timeout: float) -> Response:
+    """The sync=true wait for an analysis a worker process will run: its result, or 202 at the deadline."""
+    read = _rereader(analysis_id, db)
+    deadline = asyncio.get_running_loop().time() + timeout
+    async with get_status_registry().events.subscribe(analysis_id) as topic:
+        version = topic.version
+        current = await read()
+        while current is not None and not current.terminal:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            changed, latest, version = await _wait_for_change(topic, version, current.etag, remaining, read)
+            if changed:
+                current = latest
+
+    if current is None or not current.terminal:
+        return JSONResponse(
+            status_code=202,
+            content={"analysis_id": analysis_id},
+            headers={"Location": f"/api/analysis/{analysis_id}"},
+        )
+    return Response(content=current.json(), media_type="application/json")
 
 
 @router.get("/{analysis_id}/image")
 async def get_analysis_image(
     analysis_id: str,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
 ):
+    # An analysis's image is stored once under a UUID name and never replaced,
+    # so a revalidation can be answered without touching the database
+    headers = cache_headers(make_etag("image", analysis_id), IMMUTABLE)
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+
     result = await db.execute(
-        select(AnalysisResult)
-        .options(selectinload(AnalysisResult.label))
+        select(Label.stored_filepath, Label.mime_type)
+        .join(AnalysisResult, AnalysisResult.label_id == Label.id)
         .where(AnalysisResult.id == analysis_id)
     )
-    analysis = result.scalar_one_or_none()
-    if not analysis or not analysis.label:
+    label = result.one_or_none()
+    if label is None:
         raise HTTPException(status_code=404, detail="Image not found")
 
     upload_dir = Path(settings.upload_dir).resolve()
-    image_path = Path(analysis.label.stored_filepath).resolve()
+    image_path = Path(label.stored_filepath).resolve()
     if not image_path.is_relative_to(upload_dir):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return FileResponse(analysis.label.stored_filepath, media_type=analysis.label.mime_type)
+    return FileResponse(label.stored_filepath, media_type=label.mime_type, headers=headers)
+
+
+@dataclass
+class _Current:
+    """One read of an analysis: its validators plus the body or model to send."""
+
+    etag: str
+    terminal: bool
+    last_modified: datetime | None = None
+    body: bytes | None = None
+    model: AnalysisResponse | None = None
+
+    def json(self) -> str:
+        return self.body.decode() if self.body is not None else self.model.model_dump_json()
+
+
+async def _read_current(analysis_id: str, db: AsyncSession) -> _Current | None:
+    # In-flight analyses are answered from the pipeline's live registry and
+    # terminal ones from the response cache; either way without a query
+    # (the session is lazy and never connects)
+    live = get_status_registry()
+    entry = live.snapshot(analysis_id)
+    if entry is not None:
+        etag = make_etag(analysis_id, entry.status, *sorted(entry.stage_timings))
+        return _Current(etag, terminal=False, model=live_response(analysis_id, entry))
+
+    cache = get_response_cache()
+    cached = cache.get(analysis_id)
+    if cached is None:
+        analysis = await db.get(AnalysisResult, analysis_id)
+        if not analysis:
+            return None
+
+        status = live.resolve(analysis.id, analysis.status)
+        etag = make_etag(analysis.id, status, analysis.updated_at.isoformat())
+        if status not in TERMINAL_STATUSES:
+            return _Current(etag, terminal=False, model=to_response(analysis, live))
+
+        if settings.fast_json_responses:
+            body = response_json(analysis)
+        else:
+            body = to_response(analysis).model_dump_json().encode()
+        cached = (body, etag, analysis.updated_at)
+        cache.set(analysis_id, cached, size=len(body))
+
+    body, etag, last_modified = cached
+    return _Current(etag, terminal=True, last_modified=last_modified, body=body)
+
+
+def _rereader(analysis_id: str, db: AsyncSession):
+    """``_read_current`` on a session that is rolled back after each read, so
+    nothing is held while waiting and the next read sees new commits."""
+    async def read() -> _Current | None:
+        current = await _read_current(analysis_id, db)
+        if db.in_transaction():
+            await db.rollback()
+        return current
+
+    return read
+
+
+async def _wait_for_change(
+    topic: Topic, version: int, etag: str, timeout: float, read,
+) -> tuple[bool, _Current | None, int]:
+    """Wait up to ``timeout`` seconds for an analysis to move past ``etag``.
+
+    Runs in this process announce each stage on ``topic``. Runs in a worker
+    process can't, so with ``api_runs_jobs`` off the row is also re-read
+    every ``status_poll_seconds``. Returns ``(changed, current, version)``;
+    ``current`` is None when the analysis has been deleted.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    poll = None if settings.api_runs_jobs else settings.status_poll_seconds
+    while (remaining := deadline - loop.time()) > 0:
+        seen = await topic.wait(version, timeout=remaining if poll is None else min(poll, remaining))
+        if seen == version and poll is None:
+            break
+        version = seen
+        current = await read()
+        if current is None or current.etag != etag:
+            return True, current, version
+    return False, None, version
 
 
 @router.get("/{analysis_id}", response_model=AnalysisResponse)
 async def get_analysis(
     analysis_id: str,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    wait: float = Query(
+        0, ge=0, le=60,
+        description="Long-poll: hold an in-flight result for up to this many seconds until its next stage",
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    analysis = await db.get(AnalysisResult, analysis_id)
-    if not analysis:
+    # Subscribe before reading so a transition between the two isn't missed
+    async with get_status_registry().events.subscribe(analysis_id) as topic:
+        version = topic.version
+        current = await _read_current(analysis_id, db)
+        if current is None:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+
+        # Wait when the caller already holds this state (If-None-Match) or
+        # sent no validator; a stale validator gets the new state at once
+        known = request.headers.get("if-none-match")
+        if wait and not current.terminal and (known is None or is_not_modified(request, current.etag)):
+            # Don't hold a pooled connection while parked
+            if db.in_transaction():
+                await db.rollback()
+            changed, latest, _ = await _wait_for_change(
+                topic, version, current.etag, wait, _rereader(analysis_id, db),
+            )
+            if changed:
+                if latest is None:
+                    raise HTTPException(status_code=404, detail="Analysis not found")
+                current = latest
+
+    if current.terminal:
+        headers = cache_headers(current.etag, IMMUTABLE, current.last_modified)
+        if is_not_modified(request, current.etag, current.last_modified):
+            return not_modified(headers)
+        return Response(content=current.body, media_type="application/json", headers=headers)
+
+    # In deferred status mode updated_at doesn't move with the live status,
+    # so in-flight results are validated by ETag only
+    headers = cache_headers(current.etag, REVALIDATE)
+    if is_not_modified(request, current.etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return current.model
+
+
+@router.get("/{analysis_id}/events")
+async def stream_analysis_events(
+    analysis_id: str,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Server-sent events: the analysis now, then again at each stage until it is final."""
+    if await _read_current(analysis_id, db) is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
-    return to_response(analysis)
+
+    async def event_generator():
+        from app.dependencies import read_session_factory
+
+        async def read() -> _Current | None:
+            async with read_session_factory() as session:
+                return await _read_current(analysis_id, session)
+
+        async with get_status_registry().events.subscribe(analysis_id) as topic:
+            version = topic.version
+            current = await read()
+            while current is not None:
+                yield f"data: {current.json()}\n\n"
+                if current.terminal:
+                    break
+                while True:
+                    changed, latest, version = await _wait_for_change(
+                        topic, version, current.etag, SSE_HEARTBEAT_SECONDS, read,
+                    )
+                    if changed:
+                        current = latest
+                        break
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
 async def _delete_one(analysis: AnalysisResult, db: AsyncSession) -> None:
@@ -134,6 +390,7 @@ async def _delete_one(analysis: AnalysisResult, db: AsyncSession) -> None:
         except FileNotFoundError:
             pass
 
+    await delete_jobs(db, analysis.id)
     await db.delete(analysis)
     if label:
         await db.delete(label)
@@ -155,6 +412,8 @@ async def delete_analysis(
 
     await _delete_one(analysis, db)
     await db.commit()
+    get_history_counts().invalidate()
+    get_response_cache().discard(analysis_id)
 
     return Response(status_code=204)
 
@@ -176,31 +435,71 @@ async def bulk_delete_analyses(
             await _delete_one(analysis, db)
             deleted += 1
     await db.commit()
+    get_history_counts().invalidate()
+    cache = get_response_cache()
+    for analysis_id in body.ids:
+        cache.discard(analysis_id)
     return BulkDeleteResponse(deleted=deleted)
 
 
-@router.get("/", response_model=AnalysisListResponse)
+@router.get("/", response_model=AnalysisListResponse | AnalysisSummaryListResponse)
 async def list_analyses(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     verdict: str | None = Query(None),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None, description="next_cursor from the previous page; takes precedence over page"),
+    exact_count: bool = Query(False, description="Count afresh instead of using the cached total"),
+    view: Literal["full", "summary"] = Query("full", description="summary returns only the history-table columns"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = select(AnalysisResult).order_by(AnalysisResult.created_at.desc())
-
-    if verdict:
-        query = query.where(AnalysisResult.overall_verdict == verdict)
-
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
-
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(query)
-    analyses = result.scalars().all()
-
+    summary = view == "summary"
+    try:
+        query = history_query(verdict, cursor, columns=SUMMARY_COLUMNS if summary else None)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor is None and page > 1:
+        # Legacy offset paging; deep pages cost O(offset), cursors don't
+        query = query.offset((page - 1) * page_size)
+
+    # One extra row tells us whether there is a next page
+    rows = (await db.execute(query.limit(page_size + 1))).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_raw, last.id if summary else last[0].id)
+
+    total, total_exact = await get_history_counts().total(db, verdict, exact=exact_count)
+    live = get_status_registry()
+
+    if settings.fast_json_responses:
+        if summary:
+            items = [summary_json(row, live) for row in rows]
+        else:
+            items = [response_json(row[0], live) for row in rows]
+        return json_envelope(
+            "items",
+            items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+            total_exact=total_exact,
+        )
+    if summary:
+        return AnalysisSummaryListResponse(
+            items=[to_summary(row, live) for row in rows],
+            total=total,
+            page=page,
+            page_size=page_size,
+            next_cursor=next_cursor,
+            total_exact=total_exact,
+        )
     return AnalysisListResponse(
-        items=[to_response(a) for a in analyses],
+        items=[to_response(row[0], live) for row in rows],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_exact=total_exact,
     )
@@ -1,85 +1,40 @@
-import asyncio
 import csv
 import io
 import json
 import logging
+from typing import Literal
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_db, get_pipeline
+from app.config import settings
+from app.dependencies import (
+    get_batch_progress,
+    get_db,
+    get_history_counts,
+    get_job_dispatcher,
+    get_read_db,
+    get_status_registry,
+)
 from app.models.analysis import AnalysisResult, AnalysisStatus
 from app.models.batch import BatchJob, BatchStatus
 from app.models.label import Label
 from app.routers import ALLOWED_MIME_TYPES
-from app.schemas.batch import BatchDetailResponse, BatchResponse
-from app.services.pipeline import AnalysisPipeline
+from app.schemas.batch import BatchDetailResponse, BatchResponse, BatchSummaryDetailResponse
+from app.services.batch_progress import FINAL_BATCH_STATUSES, progress_snapshot
+from app.services.jobs import enqueue
 from app.services.storage import save_upload
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/batch", tags=["batch"])
 
 
-MAX_CONCURRENT_ANALYSES = 5
-
-
-async def _run_batch_pipeline(batch_id: str, items: list[dict], pipeline: AnalysisPipeline) -> None:
-    from app.dependencies import session_factory
-
-    async with session_factory() as db:
-        batch = await db.get(BatchJob, batch_id)
-        if not batch:
-            return
-        batch.status = BatchStatus.PROCESSING
-        await db.commit()
-
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
-    progress_lock = asyncio.Lock()
-
-    async def _update_progress(success: bool) -> None:
-        async with progress_lock:
-            async with session_factory() as db:
-                batch = await db.get(BatchJob, batch_id)
-                if not batch:
-                    return
-                if success:
-                    batch.completed_labels += 1
-                else:
-                    batch.failed_labels += 1
-                await db.commit()
-
-    async def _process_one(item: dict) -> None:
-        async with semaphore:
-            try:
-                async with session_factory() as item_db:
-                    await pipeline.run(
-                        item["analysis_id"],
-                        item["label_id"],
-                        item["image_path"],
-                        item_db,
-                        item.get("application_details"),
-                    )
-                await _update_progress(True)
-            except Exception as exc:
-                logger.exception("Batch item failed: %s", exc)
-                await _update_progress(False)
-
-    await asyncio.gather(*[_process_one(item) for item in items])
-
-    async with session_factory() as db:
-        batch = await db.get(BatchJob, batch_id)
-        if batch:
-            batch.status = BatchStatus.COMPLETED
-            await db.commit()
-
-
 @router.post("/upload")
 async def upload_batch(
     files: list[UploadFile],
     csv_file: UploadFile,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     if not files:
@@ -109,7 +64,7 @@ async def upload_batch(
     await db.flush()
 
     skipped_files: list[str] = []
-    items = []
+    queued = 0
     for file in files:
         if file.content_type not in ALLOWED_MIME_TYPES:
             skipped_files.append(file.filename or "unknown")
@@ -139,31 +94,59 @@ async def upload_batch(
         db.add(analysis)
         await db.flush()
 
-        items.append({
-            "analysis_id": analysis.id,
-            "label_id": label.id,
-            "image_path": stored_path,
-            "application_details": app_details,
-        })
+        # Queued in the same transaction, so every stored label gets run even
+        # if this process dies before reaching it
+        enqueue(db, analysis.id, batch.id)
+        queued += 1
 
-    batch.total_labels = len(items)
+    batch.total_labels = queued
+    if not queued:
+        batch.status = BatchStatus.COMPLETED
     await db.commit()
+    get_history_counts().invalidate()
+    get_job_dispatcher().notify()
 
-    pipeline = get_pipeline()
-    background_tasks.add_task(_run_batch_pipeline, batch.id, items, pipeline)
+    return {"batch_id": batch.id, "total_labels": queued, "skipped_files": skipped_files}
 
-    return {"batch_id": batch.id, "total_labels": len(items), "skipped_files": skipped_files}
 
-
-@router.get("/{batch_id}", response_model=BatchDetailResponse)
+@router.get("/{batch_id}", response_model=BatchDetailResponse | BatchSummaryDetailResponse)
 async def get_batch(
     batch_id: str,
-    db: AsyncSession = Depends(get_db),
+    view: Literal["full", "summary"] = Query("full", description="summary returns only the results-table columns"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     batch = await db.get(BatchJob, batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
+    from app.routers.converters import (
+        SUMMARY_COLUMNS,
+        json_envelope,
+        response_json,
+        summary_json,
+        to_response,
+        to_summary,
+    )
+
+    live = get_status_registry()
+    if view == "summary":
+        rows = await db.execute(
+            select(*SUMMARY_COLUMNS)
+            .join(Label)
+            .where(Label.batch_id == batch_id)
+            .order_by(AnalysisResult.created_at)
+        )
+        if settings.fast_json_responses:
+            return json_envelope(
+                "analyses",
+                [summary_json(row, live) for row in rows],
+                batch=BatchResponse.model_validate(batch).model_dump(),
+            )
+        return BatchSummaryDetailResponse(
+            batch=BatchResponse.model_validate(batch),
+            analyses=[to_summary(row, live) for row in rows],
+        )
+
     result = await db.execute(
         select(AnalysisResult)
         .join(Label)
@@ -172,43 +155,48 @@ async def get_batch(
     )
     analyses = result.scalars().all()
 
-    from app.routers.converters import to_response
-
+    if settings.fast_json_responses:
+        return json_envelope(
+            "analyses",
+            [response_json(a, live) for a in analyses],
+            batch=BatchResponse.model_validate(batch).model_dump(),
+        )
     return BatchDetailResponse(
         batch=BatchResponse.model_validate(batch),
-        analyses=[to_response(a) for a in analyses],
+        analyses=[to_response(a, live) for a in analyses],
     )
 
 
 @router.get("/{batch_id}/stream")
 async def stream_batch_progress(
     batch_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     batch = await db.get(BatchJob, batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    async def event_generator():
-        from app.dependencies import session_factory
-
-        while True:
-            async with session_factory() as session:
-                batch = await session.get(BatchJob, batch_id)
-                if not batch:
-                    break
+    # One read for the 404 and the replay; after that, changes are pushed by
+    # the job dispatcher and all watchers of a batch share the same events.
+    # Worker processes can't push, so without one here the row is re-read
+    reread = None if settings.api_runs_jobs else _batch_rereader(batch_id)
+    stream = get_batch_progress().stream(
+        batch_id, progress_snapshot(batch), batch.status in FINAL_BATCH_STATUSES,
+        reread=reread, poll_seconds=settings.status_poll_seconds,
+    )
+    return StreamingResponse(stream, media_type="text/event-stream")
 
-                data = {
-                    "status": batch.status.value if hasattr(batch.status, "value") else batch.status,
-                    "total": batch.total_labels,
-                    "completed": batch.completed_labels,
-                    "failed": batch.failed_labels,
-                }
-                yield f"data: {json.dumps(data)}\n\n"
 
-                if batch.status in (BatchStatus.COMPLETED, BatchStatus.FAILED):
-                    break
+def _batch_rereader(batch_id: str):
+    """Reads a batch's progress in a fresh session each time; the request's
+    own session isn't held open for the life of the stream."""
+    async def read() -> tuple[dict, bool] | None:
+        from app.dependencies import read_session_factory
 
-            await asyncio.sleep(1)
+        async with read_session_factory() as db:
+            batch = await db.get(BatchJob, batch_id)
+            if batch is None:
+                return None
+            return progress_snapshot(batch), batch.status in FINAL_BATCH_STATUSES
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+    return read
@@ -0,0 +1,64 @@
+"""Conditional GET helpers: validators, 304 checks and cache headers."""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Terminal analyses and stored images never change once written
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Anything still in flight may be cached but must be revalidated every time
+REVALIDATE = "no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag from the values that determine a representation."""
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    # Stored timestamps are naive UTC (SQLite CURRENT_TIMESTAMP)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value, usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return etag in candidates
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """True when the request's validators still match (RFC 9110 13.2.2 order)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+            # A "-0000" zone parses to a naive datetime; it still means UTC
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return last_modified.replace(microsecond=0) <= since
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cache_headers(etag: str, cache_control: str, last_modified: datetime | None = None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -1,9 +1,13 @@
 import json
 import logging
 
+import orjson
+from fastapi import Response
+
 from app.models.analysis import AnalysisResult
-from app.schemas.analysis import AnalysisResponse
+from app.schemas.analysis import AnalysisResponse, AnalysisSummary
 from app.schemas.compliance import ApplicationDetails, ComplianceFinding
+from app.services.status import LiveAnalysis, StatusRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +28,35 @@ def _enum_value(field) -> str | None:
     return field.value if hasattr(field, "value") else field
 
 
-def to_response(analysis: AnalysisResult) -> AnalysisResponse:
+# Columns behind AnalysisSummary; list endpoints select only these for view=summary
+SUMMARY_COLUMNS = (
+    AnalysisResult.id,
+    AnalysisResult.label_id,
+    AnalysisResult.status,
+    AnalysisResult.overall_verdict,
+    AnalysisResult.detected_brand_name,
+    AnalysisResult.detected_beverage_type,
+    AnalysisResult.created_at,
+)
+
+
+def to_summary(row, live: StatusRegistry | None = None) -> AnalysisSummary:
+    """Build a summary from a row of ``SUMMARY_COLUMNS``; no JSON columns are touched."""
+    status = live.resolve(row.id, row.status) if live is not None else row.status
+    return AnalysisSummary(
+        id=row.id,
+        label_id=row.label_id,
+        status=_enum_value(status),
+        overall_verdict=_enum_value(row.overall_verdict),
+        detected_brand_name=row.detected_brand_name,
+        detected_beverage_type=row.detected_beverage_type,
+        created_at=row.created_at,
+    )
+
+
+def to_response(analysis: AnalysisResult, live: StatusRegistry | None = None) -> AnalysisResponse:
+    """Build the API model; ``live`` overlays in-memory status for running analyses."""
+    status = live.resolve(analysis.id, analysis.status) if live is not None else analysis.status
     findings = _parse_json(
         analysis.compliance_findings,
         lambda data: [ComplianceFinding(**f) for f in data],
@@ -37,7 +69,7 @@ def to_response(analysis: AnalysisResult) -> AnalysisResponse:
     return AnalysisResponse(
         id=analysis.id,
         label_id=analysis.label_id,
-        status=_enum_value(analysis.status),
+        status=_enum_value(status),
         extracted_text=analysis.extracted_text,
         ocr_confidence=analysis.ocr_confidence,
         ocr_duration_ms=analysis.ocr_duration_ms,
@@ -49,6 +81,116 @@ def to_response(analysis: AnalysisResult) -> AnalysisResponse:
         detected_brand_name=analysis.detected_brand_name,
         error_message=analysis.error_message,
         total_duration_ms=analysis.total_duration_ms,
+        stage_timings=_parse_json(analysis.stage_timings, dict),
         image_url=f"/api/analysis/{analysis.id}/image",
         created_at=analysis.created_at,
     )
+
+
+def live_response(analysis_id: str, entry: LiveAnalysis) -> AnalysisResponse:
+    """Response for an in-flight analysis, built from its live registry entry."""
+    return AnalysisResponse(
+        id=analysis_id,
+        label_id=entry.label_id,
+        status=_enum_value(entry.status),
+        application_details=_parse_json(entry.application_details, lambda data: ApplicationDetails(**data)),
+        stage_timings=dict(entry.stage_timings) or None,
+        image_url=f"/api/analysis/{analysis_id}/image",
+        created_at=entry.created_at,
+    )
+
+
+# --- Fast JSON path ---------------------------------------------------------
+#
+# The functions below produce the same JSON as the pydantic models above but
+# skip model construction and FastAPI's validate/serialize pass. Findings are
+# only ever written by the pipeline as compact json.dumps of ComplianceFinding
+# dumps, so the stored text is already in response shape and is spliced in
+# verbatim without being parsed; only its outer brackets are checked.
+
+_DETAIL_KEYS = tuple(ApplicationDetails.model_fields)
+
+
+def _details_dict(raw: str | None) -> dict | None:
+    # Upload forms store only the fields that were filled in; the response
+    # lists every field, so this one is re-shaped rather than spliced
+    if not raw:
+        return None
+    try:
+        data = orjson.loads(raw)
+        return {key: data.get(key) for key in _DETAIL_KEYS}
+    except Exception:
+        logger.warning("Failed to parse JSON from DB: %.200s", raw)
+        return None
+
+
+def _timings_dict(raw: str | None) -> dict | None:
+    if not raw:
+        return None
+    try:
+        return orjson.loads(raw)
+    except Exception:
+        logger.warning("Failed to parse JSON from DB: %.200s", raw)
+        return None
+
+
+def _findings_json(raw: str | None) -> bytes:
+    # A corrupt or legacy row degrades to null, as in to_response, rather
+    # than making the whole page invalid JSON
+    if not raw:
+        return b"null"
+    text = raw.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return text.encode()
+    logger.warning("Failed to parse JSON from DB: %.200s", raw)
+    return b"null"
+
+
+def response_json(analysis: AnalysisResult, live: StatusRegistry | None = None) -> bytes:
+    """``to_response(analysis, live)`` serialized, with stored findings spliced in."""
+    status = live.resolve(analysis.id, analysis.status) if live is not None else analysis.status
+    head = orjson.dumps({
+        "id": analysis.id,
+        "label_id": analysis.label_id,
+        "status": _enum_value(status),
+        "extracted_text": analysis.extracted_text,
+        "ocr_confidence": analysis.ocr_confidence,
+        "ocr_duration_ms": analysis.ocr_duration_ms,
+    })
+    tail = orjson.dumps({
+        "application_details": _details_dict(analysis.application_details),
+        "overall_verdict": _enum_value(analysis.overall_verdict),
+        "compliance_duration_ms": analysis.compliance_duration_ms,
+        "detected_beverage_type": analysis.detected_beverage_type,
+        "detected_brand_name": analysis.detected_brand_name,
+        "error_message": analysis.error_message,
+        "total_duration_ms": analysis.total_duration_ms,
+        "stage_timings": _timings_dict(analysis.stage_timings),
+        "image_url": f"/api/analysis/{analysis.id}/image",
+        "created_at": analysis.created_at,
+    })
+    findings = _findings_json(analysis.compliance_findings)
+    return head[:-1] + b',"compliance_findings":' + findings + b"," + tail[1:]
+
+
+def summary_json(row, live: StatusRegistry | None = None) -> bytes:
+    """``to_summary(row, live)`` serialized."""
+    status = live.resolve(row.id, row.status) if live is not None else row.status
+    return orjson.dumps({
+        "id": row.id,
+        "label_id": row.label_id,
+        "status": _enum_value(status),
+        "overall_verdict": _enum_value(row.overall_verdict),
+        "detected_brand_name": row.detected_brand_name,
+        "detected_beverage_type": row.detected_beverage_type,
+        "created_at": row.created_at,
+    })
+
+
+def json_envelope(list_key: str, items: list[bytes], **fields) -> Response:
+    """JSON response of ``fields`` plus ``list_key`` holding pre-serialized ``items``."""
+    head = orjson.dumps(fields)[:-1]
+    if fields:
+        head += b","
+    body = head + b'"' + list_key.encode() + b'":[' + b",".join(items) + b"]}"
+    return Response(content=body, media_type="application/json")
@@ -6,3 +6,10 @@ router = APIRouter(prefix="/api", tags=["health"])
 @router.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "LabelCheck API"}
+
+
+@router.get("/metrics")
+async def metrics():
+    from app.dependencies import get_providers
+
+    return get_providers().metrics()
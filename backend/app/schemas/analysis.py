@@ -20,17 +20,43 @@ class AnalysisResponse(BaseModel):
     detected_brand_name: str | None = None
     error_message: str | None = None
     total_duration_ms: int | None = None
+    stage_timings: dict[str, int] | None = None
     image_url: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
 
 
+class AnalysisSummary(BaseModel):
+    """History-table projection of an analysis, returned for ``view=summary``."""
+
+    id: str
+    label_id: str
+    status: str
+    overall_verdict: str | None = None
+    detected_brand_name: str | None = None
+    detected_beverage_type: str | None = None
+    created_at: datetime
+
+
 class AnalysisListResponse(BaseModel):
     items: list[AnalysisResponse]
     total: int
     page: int
     page_size: int
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: str | None = None
+    # False when total came from the short-lived count cache
+    total_exact: bool = True
+
+
+class AnalysisSummaryListResponse(BaseModel):
+    items: list[AnalysisSummary]
+    total: int
+    page: int
+    page_size: int
+    next_cursor: str | None = None
+    total_exact: bool = True
 
 
 class BulkDeleteRequest(BaseModel):
@@ -2,7 +2,7 @@ from datetime import datetime
 
 from pydantic import BaseModel
 
-from app.schemas.analysis import AnalysisResponse
+from app.schemas.analysis import AnalysisResponse, AnalysisSummary
 
 
 class BatchResponse(BaseModel):
@@ -19,3 +19,8 @@ class BatchResponse(BaseModel):
 class BatchDetailResponse(BaseModel):
     batch: BatchResponse
     analyses: list[AnalysisResponse]
+
+
+class BatchSummaryDetailResponse(BaseModel):
+    batch: BatchResponse
+    analyses: list[AnalysisSummary]
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.batch import BatchJob, BatchStatus
+from app.models.label import Label
+
+logger = logging.getLogger(__name__)
+
+FINAL_BATCH_STATUSES = (BatchStatus.COMPLETED, BatchStatus.FAILED)
+
+
+def progress_snapshot(batch) -> dict:
+    """The progress event pushed to batch watchers, from a ``BatchJob`` or a row of its columns."""
+    return {
+        "status": batch.status.value if hasattr(batch.status, "value") else batch.status,
+        "total": batch.total_labels,
+        "completed": batch.completed_labels,
+        "failed": batch.failed_labels,
+    }
+
+
+class BatchCounter:
+    """Debounces batch counter flushes over finished items.
+
+    Workers call ``record`` for every finished item; that is a plain increment,
+    so completions never wait on a lock or the database. A background task
+    calls ``flush`` once ``flush_every`` items have finished since the last
+    successful flush, or every ``flush_interval_ms`` while any are pending.
+    ``aclose`` always flushes once more.
+
+    ``flush`` writes whatever its owner has accumulated (the job dispatcher
+    keeps per-batch increments); a flush that raises is retried on the next
+    tick, so the owner must keep what it failed to write. ``completed`` and
+    ``failed`` are running totals, for metrics.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[], Awaitable[object]],
+        flush_interval_ms: float = 250.0,
+        flush_every: int = 20,
+    ) -> None:
+        self.completed = 0
+        self.failed = 0
+        self.flushes = 0
+        self._flush = flush
+        self._interval = flush_interval_ms / 1000
+        self._flush_every = max(1, flush_every)
+        self._flushed_total = 0
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def total(self) -> int:
+        return self.completed + self.failed
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def record(self, success: bool) -> None:
+        if success:
+            self.completed += 1
+        else:
+            self.failed += 1
+        if self.total - self._flushed_total >= self._flush_every:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._interval)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._closed and self.total != self._flushed_total:
+                await self._write()
+
+    async def _write(self) -> None:
+        total = self.total
+        try:
+            await self._flush()
+        except Exception:
+            logger.exception("Batch progress flush failed; retrying on the next one")
+            return
+        self.flushes += 1
+        self._flushed_total = total
+
+    async def aclose(self) -> None:
+        """Stop the flusher and flush once more."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self._write()
+
+
+def batch_counts_query(batch_id: str) -> Select:
+    """Analyses of one batch counted by status."""
+    return (
+        select(AnalysisResult.status, func.count())
+        .join(Label, Label.id == AnalysisResult.label_id)
+        .where(Label.batch_id == batch_id)
+        .group_by(AnalysisResult.status)
+    )
+
+
+async def recompute_batch_counts(db: AsyncSession, batch: BatchJob) -> None:
+    """Set a batch's counters from its analyses' stored statuses.
+
+    The batch is marked COMPLETED once every analysis has reached a terminal
+    state, and PROCESSING once any has.
+    """
+    counts = dict((await db.execute(batch_counts_query(batch.id))).all())
+    batch.completed_labels = counts.get(AnalysisStatus.COMPLETED, 0)
+    batch.failed_labels = counts.get(AnalysisStatus.FAILED, 0)
+    finished = batch.completed_labels + batch.failed_labels
+    if finished >= batch.total_labels:
+        batch.status = BatchStatus.COMPLETED
+    elif finished and batch.status == BatchStatus.PENDING:
+        batch.status = BatchStatus.PROCESSING
+
+
+async def add_batch_counts(db: AsyncSession, batch_id: str, completed: int, failed: int) -> dict | None:
+    """Add finished items to a batch's counters; returns its progress snapshot.
+
+    The UPDATE increments in place, so processes finishing items of the same
+    batch never overwrite each other's counts. Once the counters reach the
+    total, the batch is recomputed from its analyses, which marks it
+    COMPLETED and corrects an item counted twice after a retried job.
+    Returns None if the batch no longer exists.
+    """
+    row = (await db.execute(
+        update(BatchJob)
+        .where(BatchJob.id == batch_id)
+        .values(
+            completed_labels=BatchJob.completed_labels + completed,
+            failed_labels=BatchJob.failed_labels + failed,
+        )
+        .returning(BatchJob.status, BatchJob.total_labels, BatchJob.completed_labels, BatchJob.failed_labels)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if row is None:
+        return None
+    if row.completed_labels + row.failed_labels < row.total_labels:
+        return progress_snapshot(row)
+    batch = await db.get(BatchJob, batch_id, populate_existing=True)
+    await recompute_batch_counts(db, batch)
+    return progress_snapshot(batch)
+
+
+async def recover_batch_counts(session_factory: async_sessionmaker) -> int:
+    """Repair the counters of batches left unfinished by a previous process.
+
+    Counters are only flushed periodically while a batch runs, so after a
+    crash they can lag the analyses that did finish. Returns how many
+    batches were recomputed.
+    """
+    async with session_factory() as db:
+        result = await db.execute(
+            select(BatchJob).where(BatchJob.status.in_((BatchStatus.PENDING, BatchStatus.PROCESSING)))
+        )
+        batches = list(result.scalars())
+        for batch in batches:
+            await recompute_batch_counts(db, batch)
+        await db.commit()
+    return len(batches)
@@ -4,6 +4,7 @@ import re
 import cv2
 import numpy as np
 
+from app.services.image import LabelImage
 from app.services.ocr.base import OCRLine
 
 logger = logging.getLogger(__name__)
@@ -130,12 +131,22 @@ def _find_body_line(
     return None
 
 
+def _load_image(image: "str | np.ndarray | LabelImage") -> np.ndarray | None:
+    if isinstance(image, np.ndarray):
+        return image
+    if isinstance(image, str):
+        return cv2.imread(image)
+    return image.array
+
+
 def check_bold_opencv(
-    image_path: str,
+    image: "str | np.ndarray | LabelImage",
     ocr_lines: list[OCRLine],
 ) -> bool | None:
     """Check if GOVERNMENT WARNING header is bold compared to body text.
 
+    ``image`` may be a path, decoded pixels, or a shared LabelImage handle
+    (decoded lazily, only once the header and body lines are found).
     Returns True if bold, False if not bold, None if unable to determine.
     """
     header_line = _find_header_line(ocr_lines)
@@ -148,13 +159,13 @@ def check_bold_opencv(
         logger.info("Bold check: no substantive body text found after header")
         return None
 
-    image = cv2.imread(image_path)
-    if image is None:
-        logger.warning("Bold check: failed to load image %s", image_path)
+    pixels = _load_image(image)
+    if pixels is None:
+        logger.warning("Bold check: failed to load image %s", image)
         return None
 
-    header_crop = _crop_header_portion(image, header_line)
-    body_crop = _crop_line_region(image, body_line.bounding_polygon)
+    header_crop = _crop_header_portion(pixels, header_line)
+    body_crop = _crop_line_region(pixels, body_line.bounding_polygon)
 
     if header_crop is None or body_crop is None:
         logger.info("Bold check: failed to crop text regions")
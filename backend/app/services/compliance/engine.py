@@ -1,6 +1,7 @@
 import json
 import logging
 import time
+from collections.abc import Awaitable
 
 from app.schemas.compliance import ComplianceFinding, ComplianceReport, Severity
 from app.services.compliance.prompts import build_focused_prompt
@@ -8,6 +9,7 @@ from app.services.compliance.rules import (
     run_application_matching,
     run_regex_rules,
 )
+from app.services.image import LabelImage
 from app.services.llm.base import LLMServiceProtocol
 
 GOV_WARNING_RULE_IDS = {"GOV_WARNING_FORMAT", "GOV_WARNING_COMPLETE"}
@@ -75,10 +77,19 @@ class ComplianceEngine:
         self,
         text: str,
         application_details: dict | None = None,
-        image_path: str | None = None,
+        image: LabelImage | None = None,
         bold_result: bool | None = None,
+        bold_task: Awaitable[bool | None] | None = None,
+        timings: dict[str, int] | None = None,
     ) -> tuple[ComplianceReport, int]:
+        """Run the rules and, if needed, the LLM; return the report and its duration.
+
+        ``bold_task`` lets the caller run the bold check concurrently: it is
+        only awaited once the regex rules and LLM call are done. Per-step
+        durations are written into ``timings`` when given.
+        """
         start = time.perf_counter()
+        timings = timings if timings is not None else {}
 
         # Step 1: Run all regex rules (instant)
         regex_findings = run_regex_rules(text)
@@ -88,6 +99,8 @@ class ComplianceEngine:
         if application_details:
             app_findings = run_application_matching(text, application_details)
 
+        timings["rules_ms"] = int((time.perf_counter() - start) * 1000)
+
         # Step 3: Collect rules that need LLM verification
         failed_rule_ids = [
             f.rule_id for f in regex_findings
@@ -107,7 +120,9 @@ class ComplianceEngine:
         if rules_for_llm:
             logger.info("Sending rules to LLM (text-only): %s", rules_for_llm)
             prompt = build_focused_prompt(text, rules_for_llm)
+            llm_start = time.perf_counter()
             raw_response = await self._llm.analyze_compliance(text, prompt)
+            timings["llm_ms"] = int((time.perf_counter() - llm_start) * 1000)
             llm = _LLMResult(raw_response)
         else:
             logger.info("All regex rules passed — skipping LLM call")
@@ -133,6 +148,11 @@ class ComplianceEngine:
         brand_name = (llm.brand_name if llm else None) or _extract_brand_name(text)
 
         # Step 5: Append bold check finding (from parallel bold_result or LLM)
+        if bold_task is not None:
+            # Time spent here is the part of the bold check that was on the critical path
+            bold_wait_start = time.perf_counter()
+            bold_result = await bold_task
+            timings["bold_wait_ms"] = int((time.perf_counter() - bold_wait_start) * 1000)
         effective_bold = bold_result
         if effective_bold is None and llm is not None:
             effective_bold = llm.gov_warning_bold
@@ -1,3 +1,9 @@
+import hashlib
+from pathlib import Path
+
+# Changes whenever this file changes; cached LLM responses are salted with it
+PROMPTS_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
 COMPLIANCE_ANALYSIS_PROMPT = """You are an expert TTB (Alcohol and Tobacco Tax and Trade Bureau) compliance analyst. Analyze the following alcohol beverage label text and check for these mandatory elements:
 
 1. **Brand Name** — Is a brand name clearly identifiable?
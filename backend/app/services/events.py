@@ -0,0 +1,151 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
+
+class Topic:
+    """A versioned change signal: every ``publish`` bumps the version and wakes waiters.
+
+    Waiters remember the version they last saw, so a change published between
+    two waits is never missed — ``wait`` returns at once if the version has
+    already moved on.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._changed = asyncio.Event()
+
+    def publish(self) -> None:
+        self.version += 1
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, since: int, timeout: float | None = None) -> int:
+        """Wait until the version differs from ``since``; returns the current version."""
+        if self.version == since:
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except TimeoutError:
+                pass
+        return self.version
+
+
+class TopicHub:
+    """Topics keyed by id, created on first subscriber and dropped with the last.
+
+    Publishing to a key nobody is subscribed to is free, so producers can
+    publish unconditionally.
+    """
+
+    def __init__(self) -> None:
+        self._topics: dict[str, tuple[Topic, int]] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, key: str) -> AsyncIterator[Topic]:
+        topic, refs = self._topics.get(key, (None, 0))
+        if topic is None:
+            topic = Topic()
+        self._topics[key] = (topic, refs + 1)
+        try:
+            yield topic
+        finally:
+            topic, refs = self._topics[key]
+            if refs == 1:
+                del self._topics[key]
+            else:
+                self._topics[key] = (topic, refs - 1)
+
+    def publish(self, key: str) -> None:
+        entry = self._topics.get(key)
+        if entry is not None:
+            entry[0].publish()
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+
+class BatchProgressHub:
+    """Fan-out of batch progress to SSE subscribers without touching the database.
+
+    The job dispatcher publishes each counter change; the hub keeps the latest
+    state per batch as one encoded SSE event that every subscriber of that
+    batch shares. Subscribers get the current state on connect (replayed from
+    the caller-supplied row if this process isn't running the batch), then
+    each change, with comment heartbeats while nothing happens. A slow
+    subscriber skips straight to the latest state rather than queueing.
+    """
+
+    # How long a finished batch's final state stays for late subscribers
+    FINISHED_TTL_SECONDS = 60.0
+
+    def __init__(self, heartbeat_seconds: float = 15.0) -> None:
+        self._heartbeat = heartbeat_seconds
+        self._latest: dict[str, tuple[str, bool]] = {}
+        self._topics = TopicHub()
+
+    @staticmethod
+    def encode(progress: dict) -> str:
+        return f"data: {json.dumps(progress)}\n\n"
+
+    def publish(self, batch_id: str, progress: dict, final: bool = False) -> None:
+        self._latest[batch_id] = (self.encode(progress), final)
+        self._topics.publish(batch_id)
+        if final:
+            asyncio.get_running_loop().call_later(
+                self.FINISHED_TTL_SECONDS, self._forget, batch_id,
+            )
+
+    def _forget(self, batch_id: str) -> None:
+        entry = self._latest.get(batch_id)
+        if entry is not None and entry[1]:
+            del self._latest[batch_id]
+
+    def latest(self, batch_id: str) -> tuple[str, bool] | None:
+        return self._latest.get(batch_id)
+
+    async def stream(
+        self,
+        batch_id: str,
+        replay: dict,
+        replay_final: bool,
+        reread: Callable[[], Awaitable[tuple[dict, bool] | None]] | None = None,
+        poll_seconds: float | None = None,
+    ) -> AsyncIterator[str]:
+        """SSE chunks for one subscriber; ends after the final state is sent.
+
+        When the batch runs in another process nothing here publishes its
+        progress, so ``reread`` (returning ``(progress, final)``, or None once
+        the batch is gone) is called every ``poll_seconds`` without a change
+        and any new state is published to every subscriber of the batch.
+        """
+        loop = asyncio.get_running_loop()
+        wait = self._heartbeat if reread is None else min(poll_seconds or self._heartbeat, self._heartbeat)
+        async with self._topics.subscribe(batch_id) as topic:
+            version = topic.version
+            event, final = self._latest.get(batch_id) or (self.encode(replay), replay_final)
+            yield event
+            last_sent = loop.time()
+            while not final:
+                changed = await topic.wait(version, timeout=wait)
+                if changed == version and reread is not None:
+                    state = await reread()
+                    if state is None:
+                        return
+                    latest = self._latest.get(batch_id, (event,))[0]
+                    if self.encode(state[0]) != latest:
+                        self.publish(batch_id, *state)
+                    changed = topic.version
+                if changed == version:
+                    if loop.time() - last_sent >= self._heartbeat:
+                        yield ": keep-alive\n\n"
+                        last_sent = loop.time()
+                    continue
+                version = changed
+                event, final = self._latest[batch_id]
+                yield event
+                last_sent = loop.time()
+
+    def stats(self) -> dict:
+        return {"batches": len(self._latest), "subscribed_batches": len(self._topics)}
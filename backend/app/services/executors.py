@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+# Window of recent wait times used for the percentile metrics
+_WAIT_SAMPLE_SIZE = 1000
+
+
+def _timed_call(fn: Callable[..., Any], args: tuple) -> tuple[float, Any]:
+    """Runs in the worker: report when the call actually started, then run it."""
+    started = time.time()
+    return started, fn(*args)
+
+
+class CPUExecutor:
+    """Dedicated, sized pool for CPU-bound stages (the OpenCV bold check).
+
+    Kept apart from the default executor used for blocking I/O offload, so
+    CPU work never queues behind network-bound threads. ``kind="process"``
+    sidesteps the GIL; arguments and results must then be picklable.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 0) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind!r} (expected one of {EXECUTOR_KINDS})")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self._pool: Executor
+        if kind == "process":
+            # spawn: forking a process that already runs event-loop and DB threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="cpu")
+
+        self._in_flight = 0
+        self._completed = 0
+        self._waits_ms: deque[float] = deque(maxlen=_WAIT_SAMPLE_SIZE)
+        self._max_wait_ms = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self._in_flight += 1
+        try:
+            started, result = await loop.run_in_executor(self._pool, _timed_call, fn, args)
+        finally:
+            self._in_flight -= 1
+        wait_ms = max(0.0, (started - submitted) * 1000)
+        self._waits_ms.append(wait_ms)
+        self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+        self._completed += 1
+        return result
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits_ms)
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "in_flight": self._in_flight,
+            # The pool runs max_workers calls at once; anything beyond that is queued
+            "queue_depth": max(0, self._in_flight - self.max_workers),
+            "completed": self._completed,
+            "wait_ms_p50": waits[len(waits) // 2] if waits else 0.0,
+            "wait_ms_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            "wait_ms_max": self._max_wait_ms,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,96 @@
+import base64
+import json
+import time
+
+from sqlalchemy import Select, String, func, select, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analysis import AnalysisResult
+
+# created_at as the text SQLite stores. Comparing on that (not a re-bound
+# datetime, which SQLAlchemy renders with microseconds) keeps the keyset
+# condition consistent with ORDER BY for rows written by CURRENT_TIMESTAMP.
+_CREATED_RAW = type_coerce(AnalysisResult.created_at, String)
+
+
+def encode_cursor(created_raw: str, analysis_id: str) -> str:
+    raw = json.dumps([created_raw, analysis_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """Inverse of ``encode_cursor``; raises ValueError for anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, analysis_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(created_raw, str) or not isinstance(analysis_id, str):
+        raise ValueError("Invalid cursor")
+    return created_raw, analysis_id
+
+
+def history_query(
+    verdict: str | None = None,
+    cursor: str | None = None,
+    columns: tuple | None = None,
+) -> Select:
+    """Newest-first history, optionally filtered and starting after ``cursor``.
+
+    Ordered on ``(created_at, id)`` so ties within one second are stable; the
+    matching indexes on ``analysis_results`` serve both the filter and the
+    order without a sort step. Selects whole rows unless ``columns`` is given;
+    every row also carries ``created_raw`` for building the next cursor.
+    """
+    selected = columns if columns is not None else (AnalysisResult,)
+    query = select(*selected, _CREATED_RAW.label("created_raw")).order_by(
+        AnalysisResult.created_at.desc(), AnalysisResult.id.desc(),
+    )
+    if verdict:
+        query = query.where(AnalysisResult.overall_verdict == verdict)
+    if cursor:
+        created_raw, analysis_id = decode_cursor(cursor)
+        query = query.where(tuple_(_CREATED_RAW, AnalysisResult.id) < tuple_(created_raw, analysis_id))
+    return query
+
+
+def count_query(verdict: str | None = None) -> Select:
+    query = select(func.count()).select_from(AnalysisResult)
+    if verdict:
+        query = query.where(AnalysisResult.overall_verdict == verdict)
+    return query
+
+
+class CountCache:
+    """Short-lived cache of history totals, keyed by verdict filter.
+
+    An exact ``count()`` is a full index scan at hundreds of thousands of
+    rows, so pages reuse a recent total; ``invalidate`` is called when rows
+    are added or deleted.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0) -> None:
+        self._ttl = ttl_seconds
+        self._entries: dict[str | None, tuple[float, int]] = {}
+
+    def get(self, verdict: str | None) -> int | None:
+        entry = self._entries.get(verdict)
+        if entry is None or time.monotonic() - entry[0] > self._ttl:
+            return None
+        return entry[1]
+
+    def set(self, verdict: str | None, total: int) -> None:
+        self._entries[verdict] = (time.monotonic(), total)
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    async def total(self, db: AsyncSession, verdict: str | None, exact: bool = False) -> tuple[int, bool]:
+        """Return ``(total, is_exact)``; counts afresh when ``exact`` or not cached."""
+        if not exact:
+            cached = self.get(verdict)
+            if cached is not None:
+                return cached, False
+        total = (await db.execute(count_query(verdict))).scalar() or 0
+        self.set(verdict, total)
+        return total, True
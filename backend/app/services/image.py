@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import mimetypes
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+class LabelImage:
+    """One label image, read from disk once and shared by every pipeline stage.
+
+    Holds the encoded bytes (sent to OCR / the LLM) and decodes them into an
+    OpenCV array at most once, on first access to ``array``. Pickling keeps
+    only the encoded bytes, so a handle can cross into a process pool without
+    copying the decoded pixels.
+    """
+
+    def __init__(self, data: bytes, path: str = "", mime_type: str | None = None) -> None:
+        self.data = data
+        self.path = path
+        self.mime_type = mime_type or mimetypes.guess_type(path)[0] or "image/jpeg"
+        self._sha256: str | None = None
+        self._array: np.ndarray | None = None
+        self._decoded = False
+
+    @classmethod
+    def from_path(cls, path: str, mime_type: str | None = None) -> "LabelImage":
+        with open(path, "rb") as f:
+            return cls(f.read(), path=path, mime_type=mime_type)
+
+    @classmethod
+    async def load(cls, path: str, mime_type: str | None = None) -> "LabelImage":
+        return await asyncio.to_thread(cls.from_path, path, mime_type)
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    @property
+    def array(self) -> np.ndarray | None:
+        """Decoded BGR pixels, or None if the bytes are not a decodable image."""
+        if not self._decoded:
+            self._array = cv2.imdecode(np.frombuffer(self.data, np.uint8), cv2.IMREAD_COLOR)
+            self._decoded = True
+        return self._array
+
+    def release(self) -> None:
+        """Drop the decoded pixels; they are re-decoded if needed again."""
+        self._array = None
+        self._decoded = False
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_array"] = None
+        state["_decoded"] = False
+        return state
+
+    def __repr__(self) -> str:
+        return f"LabelImage(path={self.path!r}, size={self.size}, mime_type={self.mime_type!r})"
+
+
+OCR_ENCODE_FORMATS = {"jpeg": (".jpg", "image/jpeg"), "png": (".png", "image/png")}
+
+
+@dataclass
+class OCRPreprocessOptions:
+    max_side: int = 2048
+    grayscale: bool = True
+    encode_format: str = "jpeg"
+    jpeg_quality: int = 90
+
+
+@dataclass
+class NormalizedImage:
+    """Image actually sent to OCR, plus the factors to map its coordinates back."""
+
+    image: LabelImage
+    scale_x: float = 1.0
+    scale_y: float = 1.0
+
+    def to_original(self, polygon: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        if self.scale_x == 1.0 and self.scale_y == 1.0:
+            return polygon
+        return [(round(x / self.scale_x), round(y / self.scale_y)) for x, y in polygon]
+
+
+def normalize_for_ocr(image: LabelImage, options: OCRPreprocessOptions) -> NormalizedImage:
+    """Downscale, grayscale and re-encode a label so fewer bytes go to OCR.
+
+    Decodes through the handle's shared ``array``, so the bold check later
+    reuses the same pixels. Falls back to the original image when it cannot
+    be decoded or re-encoding would not make it smaller.
+    """
+    if options.encode_format not in OCR_ENCODE_FORMATS:
+        raise ValueError(f"Unknown OCR encode format: {options.encode_format!r}")
+
+    pixels = image.array
+    if pixels is None:
+        return NormalizedImage(image)
+
+    height, width = pixels.shape[:2]
+    scale = min(1.0, options.max_side / max(height, width)) if options.max_side else 1.0
+    out = pixels
+    if scale < 1.0:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        out = cv2.resize(out, size, interpolation=cv2.INTER_AREA)
+    if options.grayscale and out.ndim == 3:
+        out = cv2.cvtColor(out, cv2.COLOR_BGR2GRAY)
+
+    ext, mime_type = OCR_ENCODE_FORMATS[options.encode_format]
+    params = [cv2.IMWRITE_JPEG_QUALITY, options.jpeg_quality] if ext == ".jpg" else []
+    ok, encoded = cv2.imencode(ext, out, params)
+    if not ok or (scale == 1.0 and encoded.nbytes >= image.size):
+        return NormalizedImage(image)
+
+    new_height, new_width = out.shape[:2]
+    return NormalizedImage(
+        LabelImage(encoded.tobytes(), path=image.path, mime_type=mime_type),
+        scale_x=new_width / width,
+        scale_y=new_height / height,
+    )
@@ -0,0 +1,491 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.writer import GroupCommitWriter
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.batch import BatchJob, BatchStatus
+from app.models.job import AnalysisJob, JobStatus
+from app.models.label import Label
+from app.services.batch_progress import (
+    FINAL_BATCH_STATUSES,
+    BatchCounter,
+    add_batch_counts,
+    progress_snapshot,
+)
+from app.services.events import BatchProgressHub
+from app.services.pipeline import AnalysisPipeline
+from app.services.scheduler import Priority, run_priority
+from app.services.status import TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClaimedJob:
+    """A job this worker holds the lease on, with what the pipeline needs to run it."""
+
+    id: str
+    analysis_id: str
+    batch_id: str | None
+    attempts: int
+    label_id: str | None = None
+    image_path: str | None = None
+    application_details: dict | None = None
+    analysis_status: AnalysisStatus | None = None
+
+
+def _utcnow() -> datetime:
+    # Stored timestamps are naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def enqueue(db: AsyncSession, analysis_id: str, batch_id: str | None = None) -> AnalysisJob:
+    """Add a job for ``analysis_id`` to the caller's transaction."""
+    job = AnalysisJob(analysis_id=analysis_id, batch_id=batch_id)
+    db.add(job)
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        AnalysisJob.status == JobStatus.QUEUED,
+        and_(AnalysisJob.status == JobStatus.RUNNING, AnalysisJob.lease_expires_at < now),
+    )
+
+
+async def claim_jobs(
+    db: AsyncSession, worker_id: str, limit: int, lease_seconds: float, interactive_only: bool = False,
+) -> list[ClaimedJob]:
+    """Lease up to ``limit`` jobs to ``worker_id``: single uploads first, then oldest first.
+
+    The claimable condition is checked again in the UPDATE itself, so when
+    several workers race for the same rows each job goes to exactly one.
+    ``interactive_only`` skips batch items.
+    """
+    now = _utcnow()
+    candidates = select(AnalysisJob.id).where(_claimable(now))
+    if interactive_only:
+        candidates = candidates.where(AnalysisJob.batch_id.is_(None))
+    candidates = candidates.order_by(
+        AnalysisJob.batch_id.is_not(None), AnalysisJob.created_at, AnalysisJob.id,
+    ).limit(limit)
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id.in_(candidates), _claimable(now))
+        .values(
+            status=JobStatus.RUNNING,
+            claimed_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=AnalysisJob.attempts + 1,
+        )
+        .returning(AnalysisJob.id, AnalysisJob.analysis_id, AnalysisJob.batch_id, AnalysisJob.attempts)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = {row.analysis_id: ClaimedJob(row.id, row.analysis_id, row.batch_id, row.attempts) for row in result}
+    if not jobs:
+        return []
+
+    rows = await db.execute(
+        select(
+            AnalysisResult.id,
+            AnalysisResult.status,
+            AnalysisResult.label_id,
+            AnalysisResult.application_details,
+            Label.stored_filepath,
+        )
+        .join(Label, Label.id == AnalysisResult.label_id)
+        .where(AnalysisResult.id.in_(jobs))
+    )
+    for row in rows:
+        job = jobs[row.id]
+        job.analysis_status = row.status
+        job.label_id = row.label_id
+        job.image_path = row.stored_filepath
+        if row.application_details:
+            try:
+                job.application_details = json.loads(row.application_details)
+            except ValueError:
+                pass
+    return list(jobs.values())
+
+
+async def start_batches(db: AsyncSession, batch_ids: set[str]) -> list[tuple[str, dict]]:
+    """Move still-PENDING batches to PROCESSING; returns the progress of each one moved.
+
+    Called with the batches of newly claimed jobs, so a batch shows as in
+    progress from its first claimed item rather than its first finished one.
+    """
+    if not batch_ids:
+        return []
+    result = await db.execute(
+        update(BatchJob)
+        .where(BatchJob.id.in_(batch_ids), BatchJob.status == BatchStatus.PENDING)
+        .values(status=BatchStatus.PROCESSING)
+        .returning(
+            BatchJob.id, BatchJob.status, BatchJob.total_labels, BatchJob.completed_labels, BatchJob.failed_labels,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return [(row.id, progress_snapshot(row)) for row in result]
+
+
+async def renew_leases(db: AsyncSession, worker_id: str, job_ids: list[str], lease_seconds: float) -> None:
+    await db.execute(
+        update(AnalysisJob)
+        .where(
+            AnalysisJob.id.in_(job_ids),
+            AnalysisJob.claimed_by == worker_id,
+            AnalysisJob.status == JobStatus.RUNNING,
+        )
+        .values(lease_expires_at=_utcnow() + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def finish_job(db: AsyncSession, job_id: str, worker_id: str, status: JobStatus) -> None:
+    """Settle a job this worker still holds; a job reclaimed by another worker is left alone."""
+    await db.execute(
+        update(AnalysisJob)
+        .where(
+            AnalysisJob.id == job_id,
+            AnalysisJob.claimed_by == worker_id,
+            AnalysisJob.status == JobStatus.RUNNING,
+        )
+        .values(status=status, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def release_job(db: AsyncSession, job_id: str, worker_id: str, refund_attempt: bool = False) -> None:
+    """Put a held job back in the queue, optionally without counting the attempt."""
+    values: dict[str, Any] = {"status": JobStatus.QUEUED, "claimed_by": None, "lease_expires_at": None}
+    if refund_attempt:
+        values["attempts"] = AnalysisJob.attempts - 1
+    await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id, AnalysisJob.claimed_by == worker_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def delete_jobs(db: AsyncSession, analysis_id: str) -> None:
+    await db.execute(delete(AnalysisJob).where(AnalysisJob.analysis_id == analysis_id))
+
+
+async def sweep_jobs(session_factory: async_sessionmaker) -> tuple[int, int]:
+    """Startup sweep: requeue jobs whose lease lapsed, and queue orphaned batch items.
+
+    Orphans are unfinished analyses of a batch that have no job row at all,
+    e.g. batches uploaded before the job queue existed. Returns
+    ``(reclaimed, queued)``.
+    """
+    async with session_factory() as db:
+        reclaimed = await db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.status == JobStatus.RUNNING, AnalysisJob.lease_expires_at < _utcnow())
+            .values(status=JobStatus.QUEUED, claimed_by=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        orphans = (
+            select(AnalysisResult.id, Label.batch_id)
+            .join(Label, Label.id == AnalysisResult.label_id)
+            .outerjoin(AnalysisJob, AnalysisJob.analysis_id == AnalysisResult.id)
+            .where(
+                Label.batch_id.is_not(None),
+                AnalysisResult.status.not_in(TERMINAL_STATUSES),
+                AnalysisJob.id.is_(None),
+            )
+        )
+        orphan_rows = (await db.execute(orphans)).all()
+        if orphan_rows:
+            await db.execute(
+                insert(AnalysisJob),
+                [{"analysis_id": row.id, "batch_id": row.batch_id} for row in orphan_rows],
+            )
+        await db.commit()
+    return reclaimed.rowcount or 0, len(orphan_rows)
+
+
+class JobDispatcher:
+    """Claims queued analysis jobs from the database and runs them through the pipeline.
+
+    Jobs are claimed in bulk, up to the free ``concurrency`` slots, under a
+    lease of ``lease_seconds`` that is renewed while they run; a job whose
+    worker dies is picked up again once its lease lapses. A job that has
+    already been attempted ``max_attempts`` times is given up on and its
+    analysis marked FAILED, so a label that kills the process can't loop
+    forever.
+
+    Batch counters are not written per item: finished items are counted in
+    memory per batch and a debounced flush adds them with one atomic
+    increment per batch, which stays correct when several workers share a
+    batch. ``notify`` wakes the claim loop early after an enqueue.
+
+    Single uploads run at ``Priority.INTERACTIVE`` and batch items at
+    ``Priority.BATCH``. When every slot is busy the dispatcher still claims
+    up to ``interactive_reserve`` more single uploads, so one doesn't wait
+    behind a long batch for a slot.
+    """
+
+    def __init__(
+        self,
+        pipeline: AnalysisPipeline,
+        progress: BatchProgressHub | None = None,
+        writer: GroupCommitWriter | None = None,
+        *,
+        worker_id: str | None = None,
+        concurrency: int = 5,
+        interactive_reserve: int = 2,
+        claim_size: int = 20,
+        lease_seconds: float = 120.0,
+        max_attempts: int = 3,
+        poll_interval: float = 2.0,
+        flush_interval_ms: float = 250.0,
+        flush_every: int = 20,
+    ) -> None:
+        self.worker_id = worker_id or default_worker_id()
+        self._pipeline = pipeline
+        self._progress = progress
+        self._writer = writer
+        self._concurrency = max(1, concurrency)
+        self._interactive_reserve = max(0, interactive_reserve)
+        self._claim_size = max(1, claim_size)
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+        self._poll_interval = poll_interval
+        self._session_factory: async_sessionmaker | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Finished items per batch not yet added to its counters: [completed, failed]
+        self._batch_counts: dict[str, list[int]] = {}
+        self._flush_interval_ms = flush_interval_ms
+        self._flush_every = flush_every
+        self._outcomes = BatchCounter(self._flush_batches, flush_interval_ms, flush_every)
+        self._wake = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._stopping = False
+        self._tasks: list[asyncio.Task] = []
+        self._claimed = 0
+        self._gave_up = 0
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self._stopping
+
+    def start(self, session_factory: async_sessionmaker) -> None:
+        """Start claiming with ``session_factory``; a no-op once running."""
+        if self.running:
+            return
+        self._session_factory = session_factory
+        self._stopping = False
+        self._stopped = asyncio.Event()
+        self._outcomes = BatchCounter(self._flush_batches, self._flush_interval_ms, self._flush_every)
+        self._outcomes.start()
+        self._tasks = [asyncio.create_task(self._claim_loop()), asyncio.create_task(self._renew_loop())]
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    async def stop(self, drain_seconds: float = 30.0) -> None:
+        """Stop claiming, let in-flight jobs finish, and flush batch counters.
+
+        Jobs still running after ``drain_seconds`` are cancelled and handed
+        back to the queue.
+        """
+        if not self._tasks:
+            return
+        # The loops finish their current step rather than being cancelled
+        # mid-query, which would leave a pooled connection half reset
+        self._stopping = True
+        self._stopped.set()
+        self._wake.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        inflight = dict(self._inflight)
+        if inflight:
+            _, pending = await asyncio.wait(inflight.values(), timeout=drain_seconds)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for job_id, task in inflight.items():
+                if task not in pending:
+                    continue
+                # Shutting down isn't the job's fault, so the attempt doesn't count
+                try:
+                    await self._submit(
+                        lambda db, job_id=job_id: release_job(db, job_id, self.worker_id, refund_attempt=True)
+                    )
+                except Exception:
+                    logger.exception("Releasing analysis job %s failed; its lease will lapse", job_id)
+        await self._outcomes.aclose()
+
+    async def _submit(self, op: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        if self._writer is not None:
+            return await self._writer.submit(op)
+        async with self._session_factory() as db:
+            result = await op(db)
+            await db.commit()
+        return result
+
+    async def _claim_loop(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            free = min(self._concurrency - len(self._inflight), self._claim_size)
+            interactive_only = free <= 0
+            if interactive_only:
+                free = self._concurrency + self._interactive_reserve - len(self._inflight)
+            claimed: list[ClaimedJob] = []
+            if free > 0:
+                try:
+                    claimed, started = await self._submit(
+                        lambda db: self._claim(db, free, interactive_only)
+                    )
+                except Exception:
+                    logger.exception("Claiming analysis jobs failed")
+                else:
+                    self._publish(started)
+            for job in claimed:
+                self._inflight[job.id] = asyncio.create_task(self._execute(job))
+            self._claimed += len(claimed)
+            if claimed and len(self._inflight) < self._concurrency:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._poll_interval)
+            except TimeoutError:
+                pass
+
+    async def _claim(
+        self, db: AsyncSession, limit: int, interactive_only: bool,
+    ) -> tuple[list[ClaimedJob], list[tuple[str, dict]]]:
+        claimed = await claim_jobs(db, self.worker_id, limit, self._lease_seconds, interactive_only)
+        started = await start_batches(db, {job.batch_id for job in claimed if job.batch_id is not None})
+        return claimed, started
+
+    async def _renew_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self._lease_seconds / 3)
+                return
+            except TimeoutError:
+                pass
+            job_ids = list(self._inflight)
+            if not job_ids:
+                continue
+            try:
+                await self._submit(lambda db: renew_leases(db, self.worker_id, job_ids, self._lease_seconds))
+            except Exception:
+                logger.exception("Renewing job leases failed")
+
+    async def _execute(self, job: ClaimedJob) -> None:
+        try:
+            if job.label_id is None:
+                # The analysis was deleted while queued
+                status = None
+            elif job.analysis_status in TERMINAL_STATUSES:
+                # Finished before the previous worker could settle the job
+                status = job.analysis_status
+            elif job.attempts > self._max_attempts:
+                await self._give_up(job)
+                return
+            else:
+                priority = Priority.BATCH if job.batch_id else Priority.INTERACTIVE
+                with run_priority(priority):
+                    async with self._session_factory() as db:
+                        status = await self._pipeline.run(
+                            job.analysis_id, job.label_id, job.image_path, db, job.application_details,
+                        )
+            await self._submit(lambda db: finish_job(db, job.id, self.worker_id, JobStatus.DONE))
+            if status is not None:
+                self._record(job, status == AnalysisStatus.COMPLETED)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Analysis job %s failed; returning it to the queue", job.id)
+            try:
+                await self._submit(lambda db: release_job(db, job.id, self.worker_id))
+            except Exception:
+                logger.exception("Releasing analysis job %s failed; its lease will lapse", job.id)
+        finally:
+            self._inflight.pop(job.id, None)
+            self._wake.set()
+
+    async def _give_up(self, job: ClaimedJob) -> None:
+        logger.error("Analysis %s gave up after %d attempts", job.analysis_id, job.attempts - 1)
+
+        async def _op(db: AsyncSession) -> None:
+            analysis = await db.get(AnalysisResult, job.analysis_id)
+            if analysis is not None:
+                analysis.status = AnalysisStatus.FAILED
+                analysis.error_message = f"Gave up after {job.attempts - 1} attempts"
+            await finish_job(db, job.id, self.worker_id, JobStatus.FAILED)
+
+        await self._submit(_op)
+        self._gave_up += 1
+        self._record(job, False)
+
+    def _record(self, job: ClaimedJob, success: bool) -> None:
+        if job.batch_id is not None:
+            counts = self._batch_counts.setdefault(job.batch_id, [0, 0])
+            counts[0 if success else 1] += 1
+        self._outcomes.record(success)
+
+    async def _flush_batches(self) -> None:
+        pending = {batch_id: tuple(counts) for batch_id, counts in self._batch_counts.items()}
+        if not pending:
+            return
+
+        async def _op(db: AsyncSession) -> list[tuple[str, dict]]:
+            snapshots = []
+            for batch_id, (batch_completed, batch_failed) in pending.items():
+                progress = await add_batch_counts(db, batch_id, batch_completed, batch_failed)
+                if progress is not None:
+                    snapshots.append((batch_id, progress))
+            return snapshots
+
+        snapshots = await self._submit(_op)
+        # Items finished while the write was in flight stay for the next flush
+        for batch_id, (batch_completed, batch_failed) in pending.items():
+            counts = self._batch_counts[batch_id]
+            counts[0] -= batch_completed
+            counts[1] -= batch_failed
+            if counts == [0, 0]:
+                del self._batch_counts[batch_id]
+        self._publish(snapshots)
+
+    def _publish(self, snapshots: list[tuple[str, dict]]) -> None:
+        if self._progress is None:
+            return
+        for batch_id, progress in snapshots:
+            final = progress["status"] in {s.value for s in FINAL_BATCH_STATUSES}
+            self._progress.publish(batch_id, progress, final=final)
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "in_flight": len(self._inflight),
+            "claimed": self._claimed,
+            "completed": self._outcomes.completed,
+            "failed": self._outcomes.failed,
+            "gave_up": self._gave_up,
+        }
@@ -1,44 +1,84 @@
 import base64
-import mimetypes
 from urllib.parse import urlparse
 
 from openai import AsyncAzureOpenAI
 
+from app.services.image import LabelImage
+
 
 class AzureOpenAILLMService:
+    """Compliance prompts on the async Azure OpenAI client.
+
+    The client is built on first use: the SDK refuses to construct one
+    without credentials, and a missing key should fail analyses, not stop
+    the whole API from starting.
+    """
+
     def __init__(
-        self, endpoint: str, key: str, deployment: str, api_version: str
+        self,
+        endpoint: str,
+        key: str,
+        deployment: str,
+        api_version: str,
+        temperature: float = 0.1,
     ) -> None:
         parsed = urlparse(endpoint)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-
-        self._client = AsyncAzureOpenAI(
-            azure_endpoint=base_url,
-            api_key=key,
-            api_version=api_version,
-        )
+        self._base_url = f"{parsed.scheme}://{parsed.netloc}"
+        self._key = key
+        self._api_version = api_version
+        self._client: AsyncAzureOpenAI | None = None
         self._deployment = deployment
+        self._temperature = temperature
+
+    def _get_client(self) -> AsyncAzureOpenAI:
+        if self._client is None:
+            self._client = AsyncAzureOpenAI(
+                azure_endpoint=self._base_url,
+                api_key=self._key,
+                api_version=self._api_version,
+            )
+        return self._client
+
+    @property
+    def deployment(self) -> str:
+        return self._deployment
+
+    @property
+    def temperature(self) -> float:
+        return self._temperature
+
+    async def warmup(self) -> None:
+        """Open a pooled connection (DNS + TLS) before the first real request."""
+        # Missing credentials raise here, for Providers.warmup to log
+        client = self._get_client().with_options(max_retries=0, timeout=5.0)
+        try:
+            await client.models.list()
+        except Exception:
+            # An error response still leaves a warm connection in the pool
+            pass
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
 
     async def analyze_compliance(
-        self, text: str, prompt: str, image_path: str | None = None,
+        self, text: str, prompt: str, image: LabelImage | None = None,
     ) -> str:
-        if image_path:
+        if image:
             content: list[dict] = [{"type": "text", "text": prompt}]
-            with open(image_path, "rb") as f:
-                b64 = base64.b64encode(f.read()).decode()
-            mime = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+            b64 = base64.b64encode(image.data).decode()
             content.append({
                 "type": "image_url",
-                "image_url": {"url": f"data:{mime};base64,{b64}"},
+                "image_url": {"url": f"data:{image.mime_type};base64,{b64}"},
             })
             messages = [{"role": "user", "content": content}]
         else:
             messages = [{"role": "user", "content": prompt}]
 
-        response = await self._client.chat.completions.create(
+        response = await self._get_client().chat.completions.create(
             model=self._deployment,
             messages=messages,
             response_format={"type": "json_object"},
-            temperature=0.1,
+            temperature=self._temperature,
         )
         return response.choices[0].message.content or ""
@@ -1,7 +1,9 @@
 from typing import Protocol
 
+from app.services.image import LabelImage
+
 
 class LLMServiceProtocol(Protocol):
     async def analyze_compliance(
-        self, text: str, prompt: str, image_path: str | None = None,
+        self, text: str, prompt: str, image: LabelImage | None = None,
     ) -> str: ...
@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import json
+import logging
+
+from app.services.cache import DiskLRUCache
+from app.services.compliance.prompts import PROMPTS_VERSION
+from app.services.image import LabelImage
+from app.services.llm.base import LLMServiceProtocol
+
+logger = logging.getLogger(__name__)
+
+
+class CachedLLMService:
+    """Response cache around any LLM service.
+
+    Keyed on prompt-template version, deployment, temperature and the prompt
+    hash (the focused prompt already embeds the label text and the failing
+    rule set), plus the image hash when an image is attached. Editing
+    ``prompts.py`` changes ``PROMPTS_VERSION`` and so orphans every older
+    entry.
+    """
+
+    def __init__(
+        self,
+        inner: LLMServiceProtocol,
+        cache: DiskLRUCache,
+        deployment: str,
+        temperature: float,
+        ttl_seconds: float | None = None,
+        version: str = PROMPTS_VERSION,
+    ) -> None:
+        self._inner = inner
+        self._cache = cache
+        self._deployment = deployment
+        self._temperature = temperature
+        self._ttl_seconds = ttl_seconds
+        self._version = version
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def _key(self, prompt: str, image: LabelImage | None) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+        image_hash = image.sha256 if image else ""
+        raw = f"{self._version}\0{self._deployment}\0{self._temperature!r}\0{prompt_hash}\0{image_hash}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def analyze_compliance(
+        self, text: str, prompt: str, image: LabelImage | None = None,
+    ) -> str:
+        key = self._key(prompt, image)
+        cached = await asyncio.to_thread(self._cache.get, key)
+        if cached is not None:
+            return cached.decode()
+
+        response = await self._inner.analyze_compliance(text, prompt, image=image)
+
+        # Only keep well-formed answers; a bad one would be replayed until TTL
+        try:
+            json.loads(response)
+        except ValueError:
+            logger.warning("Not caching invalid LLM JSON response")
+            return response
+        await asyncio.to_thread(self._cache.set, key, response.encode(), self._ttl_seconds)
+        return response
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    async def warmup(self) -> None:
+        warmup = getattr(self._inner, "warmup", None)
+        if warmup is not None:
+            await warmup()
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._inner, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        self._cache.close()
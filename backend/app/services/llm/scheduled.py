@@ -0,0 +1,31 @@
+from app.services.image import LabelImage
+from app.services.llm.base import LLMServiceProtocol
+from app.services.scheduler import StageScheduler
+
+
+class ScheduledLLMService:
+    """Takes an ``llm`` slot of the process-wide scheduler around every call.
+
+    Wraps the network client itself, beneath the cache, so only real
+    round trips count against the limit.
+    """
+
+    def __init__(self, inner: LLMServiceProtocol, scheduler: StageScheduler) -> None:
+        self._inner = inner
+        self._scheduler = scheduler
+
+    async def analyze_compliance(
+        self, text: str, prompt: str, image: LabelImage | None = None,
+    ) -> str:
+        async with self._scheduler.slot("llm"):
+            return await self._inner.analyze_compliance(text, prompt, image=image)
+
+    async def warmup(self) -> None:
+        warmup = getattr(self._inner, "warmup", None)
+        if warmup is not None:
+            await warmup()
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._inner, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -1,34 +1,43 @@
-import asyncio
 import time
 
-from azure.ai.vision.imageanalysis import ImageAnalysisClient
+from azure.ai.vision.imageanalysis.aio import ImageAnalysisClient
 from azure.ai.vision.imageanalysis.models import VisualFeatures
 from azure.core.credentials import AzureKeyCredential
+from azure.core.rest import HttpRequest
 
+from app.services.image import LabelImage
 from app.services.ocr.base import OCRLine, OCRResult
 
 
 class AzureVisionOCRService:
+    """OCR on the SDK's async (aiohttp) client.
+
+    Requests are awaited on the event loop, so in-flight OCR holds no
+    executor thread — the default executor stays free for CPU work.
+    """
+
     def __init__(self, endpoint: str, key: str) -> None:
+        self._endpoint = endpoint
         self._client = ImageAnalysisClient(
             endpoint=endpoint,
             credential=AzureKeyCredential(key),
         )
 
-    def _extract_sync(self, image_data: bytes) -> object:
-        result = self._client.analyze(
-            image_data=image_data,
-            visual_features=[VisualFeatures.READ],
-        )
-        return result
+    async def warmup(self) -> None:
+        """Open a pooled connection (DNS + TLS) before the first real request."""
+        # Any response opens the pooled connection; the status code is irrelevant
+        await self._client.send_request(HttpRequest("HEAD", self._endpoint))
 
-    async def extract_text(self, image_path: str) -> OCRResult:
-        start = time.perf_counter()
+    async def aclose(self) -> None:
+        await self._client.close()
 
-        with open(image_path, "rb") as f:
-            image_data = f.read()
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        start = time.perf_counter()
 
-        result = await asyncio.to_thread(self._extract_sync, image_data)
+        result = await self._client.analyze(
+            image_data=image.data,
+            visual_features=[VisualFeatures.READ],
+        )
 
         text_lines: list[str] = []
         confidences: list[float] = []
@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from typing import Protocol
 
+from app.services.image import LabelImage
+
 
 @dataclass
 class OCRLine:
@@ -17,4 +19,4 @@ class OCRResult:
 
 
 class OCRServiceProtocol(Protocol):
-    async def extract_text(self, image_path: str) -> OCRResult: ...
+    async def extract_text(self, image: LabelImage) -> OCRResult: ...
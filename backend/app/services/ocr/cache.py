@@ -0,0 +1,84 @@
+import asyncio
+import json
+import logging
+import time
+
+from app.services.cache import DiskLRUCache
+from app.services.image import LabelImage
+from app.services.ocr.base import OCRLine, OCRResult, OCRServiceProtocol
+
+logger = logging.getLogger(__name__)
+
+
+def _dump(result: OCRResult) -> bytes:
+    return json.dumps({
+        "text": result.text,
+        "confidence": result.confidence,
+        "duration_ms": result.duration_ms,
+        "lines": [
+            {"text": line.text, "polygon": line.bounding_polygon}
+            for line in result.lines
+        ],
+    }).encode()
+
+
+def _load(raw: bytes, duration_ms: int) -> OCRResult:
+    data = json.loads(raw)
+    return OCRResult(
+        text=data["text"],
+        confidence=data["confidence"],
+        duration_ms=duration_ms,
+        lines=[
+            OCRLine(text=line["text"], bounding_polygon=[tuple(pt) for pt in line["polygon"]])
+            for line in data["lines"]
+        ],
+    )
+
+
+class CachedOCRService:
+    """Content-addressed cache around any OCR service.
+
+    Results are keyed by the SHA-256 of the image bytes, so a re-uploaded
+    label skips the OCR round trip no matter what filename it arrives under.
+    """
+
+    def __init__(self, inner: OCRServiceProtocol, cache: DiskLRUCache) -> None:
+        self._inner = inner
+        self._cache = cache
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        start = time.perf_counter()
+        key = image.sha256
+
+        raw = await asyncio.to_thread(self._cache.get, key)
+        if raw is not None:
+            try:
+                return _load(raw, int((time.perf_counter() - start) * 1000))
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Discarding corrupt OCR cache entry %s", key)
+
+        result = await self._inner.extract_text(image)
+        await asyncio.to_thread(self._cache.set, key, _dump(result))
+        return result
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+    async def warmup(self) -> None:
+        warmup = getattr(self._inner, "warmup", None)
+        if warmup is not None:
+            await warmup()
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._inner, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        self._cache.close()
@@ -0,0 +1,29 @@
+from app.services.image import LabelImage
+from app.services.ocr.base import OCRResult, OCRServiceProtocol
+from app.services.scheduler import StageScheduler
+
+
+class ScheduledOCRService:
+    """Takes an ``ocr`` slot of the process-wide scheduler around every call.
+
+    Wraps the network client itself, beneath the cache, so only real
+    round trips count against the limit.
+    """
+
+    def __init__(self, inner: OCRServiceProtocol, scheduler: StageScheduler) -> None:
+        self._inner = inner
+        self._scheduler = scheduler
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        async with self._scheduler.slot("ocr"):
+            return await self._inner.extract_text(image)
+
+    async def warmup(self) -> None:
+        warmup = getattr(self._inner, "warmup", None)
+        if warmup is not None:
+            await warmup()
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._inner, "aclose", None)
+        if aclose is not None:
+            await aclose()
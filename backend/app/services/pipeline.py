@@ -1,26 +1,267 @@
 import asyncio
+import hashlib
 import json
 import logging
 import time
+from collections.abc import Callable
+from dataclasses import dataclass
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.writer import GroupCommitWriter
 from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.schemas.compliance import ComplianceReport
 from app.services.compliance.bold_check import check_bold_opencv
 from app.services.compliance.engine import ComplianceEngine
-from app.services.ocr.base import OCRServiceProtocol
+from app.services.executors import CPUExecutor
+from app.services.image import (
+    LabelImage,
+    NormalizedImage,
+    OCRPreprocessOptions,
+    normalize_for_ocr,
+)
+from app.services.ocr.base import OCRLine, OCRResult, OCRServiceProtocol
+from app.services.scheduler import RunPriority, StageScheduler, current_priority, run_priority
+from app.services.status import StatusRegistry
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _AnalysisOutcome:
+    ocr_result: OCRResult
+    report: ComplianceReport
+    compliance_duration_ms: int
+    stage_timings: dict[str, int]
+
+
+class _SharedAnalysis:
+    """One OCR/bold/compliance computation shared by concurrent identical runs."""
+
+    def __init__(self, priority: RunPriority) -> None:
+        self.ocr_done = asyncio.Event()
+        # Filled in stage by stage; live registry entries point at this dict
+        self.timings: dict[str, int] = {}
+        # The most urgent of the joined runs; the computation's stage slots
+        # are requested at this priority
+        self.priority = priority
+        self.task: asyncio.Task[_AnalysisOutcome] | None = None
+
+
+def _to_original_coordinates(result: OCRResult, normalized: NormalizedImage) -> OCRResult:
+    """Map OCR polygons from the normalized image back onto the original pixels."""
+    if normalized.scale_x == 1.0 and normalized.scale_y == 1.0:
+        return result
+    result.lines = [
+        OCRLine(text=line.text, bounding_polygon=normalized.to_original(line.bounding_polygon))
+        for line in result.lines
+    ]
+    return result
+
+
+def _flight_key(image: LabelImage, application_details: dict | None) -> str:
+    """Identity of a computation: image content plus the details it is matched against."""
+    details = json.dumps(application_details or {}, sort_keys=True)
+    return hashlib.sha256(f"{image.sha256}\0{details}".encode()).hexdigest()
+
+
 class AnalysisPipeline:
     def __init__(
         self,
         ocr_service: OCRServiceProtocol,
         compliance_engine: ComplianceEngine,
+        cpu_executor: CPUExecutor | None = None,
+        ocr_preprocess: OCRPreprocessOptions | None = None,
+        status_registry: StatusRegistry | None = None,
+        writer: GroupCommitWriter | None = None,
+        defer_status: bool = False,
+        scheduler: StageScheduler | None = None,
     ) -> None:
         self._ocr = ocr_service
         self._compliance = compliance_engine
+        self._cpu = cpu_executor
+        # CPU-bound steps take a "cpu" slot; OCR/LLM slots are taken by the
+        # scheduled service wrappers, beneath their caches
+        self._scheduler = scheduler
+        # None disables the pre-OCR downscale/re-encode stage
+        self._ocr_preprocess = ocr_preprocess
+        # Stage transitions and partial timings are published to the registry
+        # for readers; with defer_status the PROCESSING_* states stay there
+        # and only the terminal state is committed. With a writer, commits
+        # are grouped with other analyses' writes.
+        self._status = status_registry
+        self._writer = writer
+        self._defer_status = defer_status and status_registry is not None
+        # Single-flight registry: byte-identical submissions in flight at the
+        # same time await one computation and then each write their own row
+        self._in_flight: dict[str, _SharedAnalysis] = {}
+        self.coalesced_runs = 0
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._in_flight), "coalesced_runs": self.coalesced_runs}
+
+    def _join(
+        self,
+        key: str,
+        analysis_id: str,
+        image: LabelImage,
+        application_details: dict | None,
+    ) -> _SharedAnalysis:
+        shared = self._in_flight.get(key)
+        if shared is not None:
+            self.coalesced_runs += 1
+            logger.info("Analysis %s joined an in-flight identical analysis", analysis_id)
+            # A single upload joining a batch item's flight mustn't wait in the batch lane
+            shared.priority.promote(current_priority())
+            return shared
+
+        shared = _SharedAnalysis(RunPriority(current_priority()))
+        with run_priority(shared.priority):
+            # The task copies the context here, so its slots use the shared priority
+            shared.task = asyncio.ensure_future(
+                self._analyze(shared, analysis_id, image, application_details)
+            )
+        self._in_flight[key] = shared
+
+        def _forget(_: asyncio.Task) -> None:
+            if self._in_flight.get(key) is shared:
+                del self._in_flight[key]
+
+        shared.task.add_done_callback(_forget)
+        return shared
+
+    async def _run_cpu(self, fn, *args):
+        if self._scheduler is None:
+            return await self._run_cpu_now(fn, *args)
+        async with self._scheduler.slot("cpu"):
+            return await self._run_cpu_now(fn, *args)
+
+    async def _run_cpu_now(self, fn, *args):
+        if self._cpu is None:
+            return await asyncio.to_thread(fn, *args)
+        return await self._cpu.run(fn, *args)
+
+    async def _bold_check(
+        self,
+        analysis_id: str,
+        image: LabelImage,
+        ocr_result: OCRResult,
+        timings: dict[str, int],
+    ) -> bool | None:
+        bold_start = time.perf_counter()
+        try:
+            bold_result = await self._run_cpu(check_bold_opencv, image, ocr_result.lines)
+        finally:
+            # The decoded pixels are only needed by the bold check
+            image.release()
+        timings["bold_ms"] = int((time.perf_counter() - bold_start) * 1000)
+        logger.info(
+            "Analysis %s bold check: %dms (result=%s)",
+            analysis_id, timings["bold_ms"], bold_result,
+        )
+        return bold_result
+
+    async def _analyze(
+        self,
+        shared: _SharedAnalysis,
+        analysis_id: str,
+        image: LabelImage,
+        application_details: dict | None,
+    ) -> _AnalysisOutcome:
+        """Run the stage graph for one image.
+
+            preprocess? -> OCR -+-> bold check ---------------+-> report
+                                +-> rules -> LLM (if needed) -+
+
+        Only the final GOV_WARNING_BOLD finding depends on the bold check, so
+        it runs alongside the rules and LLM call instead of ahead of them.
+        """
+        timings = shared.timings
+
+        # Stage 0 (optional): shrink the upload sent to OCR
+        normalized = NormalizedImage(image)
+        if self._ocr_preprocess is not None:
+            preprocess_start = time.perf_counter()
+            normalized = await self._run_cpu(normalize_for_ocr, image, self._ocr_preprocess)
+            timings["preprocess_ms"] = int((time.perf_counter() - preprocess_start) * 1000)
+            logger.info(
+                "Analysis %s OCR preprocessing: %dms (%d -> %d bytes)",
+                analysis_id, timings["preprocess_ms"], image.size, normalized.image.size,
+            )
+
+        # Stage 1: OCR
+        ocr_start = time.perf_counter()
+        ocr_result = await self._ocr.extract_text(normalized.image)
+        ocr_result = _to_original_coordinates(ocr_result, normalized)
+        timings["ocr_ms"] = int((time.perf_counter() - ocr_start) * 1000)
+        logger.info(
+            "Analysis %s OCR completed: %dms",
+            analysis_id, ocr_result.duration_ms,
+        )
+        shared.ocr_done.set()
+
+        # Stage 2a: OpenCV bold check on the dedicated CPU pool, in parallel with 2b
+        bold_task = asyncio.ensure_future(
+            self._bold_check(analysis_id, image, ocr_result, timings)
+        )
+
+        # Stage 2b: rules + LLM; the engine awaits the bold task last
+        compliance_start = time.perf_counter()
+        try:
+            report, compliance_duration_ms = await self._compliance.analyze(
+                ocr_result.text, application_details, image=image,
+                bold_task=bold_task, timings=timings,
+            )
+        finally:
+            # Only left pending if the engine failed; collect it so errors aren't lost
+            if not bold_task.done():
+                bold_task.cancel()
+            await asyncio.gather(bold_task, return_exceptions=True)
+        timings["compliance_ms"] = int((time.perf_counter() - compliance_start) * 1000)
+        logger.info(
+            "Analysis %s compliance stage: %dms (engine=%dms, stages=%s)",
+            analysis_id, timings["compliance_ms"], compliance_duration_ms, timings,
+        )
+
+        return _AnalysisOutcome(ocr_result, report, compliance_duration_ms, timings)
+
+    async def _transition(self, db: AsyncSession, analysis_id: str, status: AnalysisStatus) -> None:
+        if self._status is not None:
+            self._status.set(analysis_id, status)
+        if self._defer_status:
+            # Nothing to commit: end the read transaction so this run doesn't
+            # hold a pooled connection while OCR and the LLM are awaited
+            if db.in_transaction():
+                await db.rollback()
+            return
+
+        def _set_status(analysis: AnalysisResult) -> None:
+            analysis.status = status
+
+        await self._write(db, analysis_id, _set_status)
+
+    async def _write(
+        self,
+        db: AsyncSession,
+        analysis_id: str,
+        apply: Callable[[AnalysisResult], None],
+    ) -> None:
+        """Apply and commit a change to the row, through the group-commit writer if any."""
+        if self._writer is not None:
+            async def _op(session: AsyncSession) -> None:
+                analysis = await session.get(AnalysisResult, analysis_id)
+                if analysis:
+                    apply(analysis)
+
+            # The row is written elsewhere; don't keep this session's read open
+            if db.in_transaction():
+                await db.rollback()
+            await self._writer.submit(_op)
+            return
+        analysis = await db.get(AnalysisResult, analysis_id)
+        if analysis:
+            apply(analysis)
+            await db.commit()
 
     async def run(
         self,
@@ -29,81 +270,79 @@ class AnalysisPipeline:
         image_path: str,
         db: AsyncSession,
         application_details: dict | None = None,
-    ) -> None:
+    ) -> AnalysisStatus | None:
+        """Run one analysis to its terminal state and return it (None if the row is gone)."""
         total_start = time.perf_counter()
 
         try:
-            # Stage 1: OCR
             analysis = await db.get(AnalysisResult, analysis_id)
             if not analysis:
                 logger.error("Analysis %s not found", analysis_id)
                 return
+            if self._status is not None:
+                self._status.track(analysis)
 
-            analysis.status = AnalysisStatus.PROCESSING_OCR
-            await db.commit()
+            await self._transition(db, analysis_id, AnalysisStatus.PROCESSING_OCR)
 
-            ocr_result = await self._ocr.extract_text(image_path)
+            # Read the file once; OCR, bold check and LLM all share this handle
+            image = await LabelImage.load(image_path)
+            key = _flight_key(image, application_details)
+            shared = self._join(key, analysis_id, image, application_details)
+            if self._status is not None:
+                self._status.attach_timings(analysis_id, shared.timings)
 
-            logger.info(
-                "Analysis %s OCR completed: %dms",
-                analysis_id, ocr_result.duration_ms,
-            )
-
-            analysis.extracted_text = ocr_result.text
-            analysis.ocr_confidence = ocr_result.confidence
-            analysis.ocr_duration_ms = ocr_result.duration_ms
-
-            # Stage 2: OpenCV bold check (sync, <100ms)
-            bold_start = time.perf_counter()
-            bold_result = await asyncio.to_thread(check_bold_opencv, image_path, ocr_result.lines)
-            bold_ms = int((time.perf_counter() - bold_start) * 1000)
+            ocr_wait = asyncio.ensure_future(shared.ocr_done.wait())
+            await asyncio.wait({ocr_wait, shared.task}, return_when=asyncio.FIRST_COMPLETED)
+            ocr_wait.cancel()
+            if shared.ocr_done.is_set():
+                await self._transition(db, analysis_id, AnalysisStatus.PROCESSING_COMPLIANCE)
 
-            logger.info(
-                "Analysis %s bold check: %dms (result=%s)",
-                analysis_id, bold_ms, bold_result,
-            )
+            # Shielded so a cancelled caller doesn't abort the computation for the others
+            outcome = await asyncio.shield(shared.task)
+            total_duration_ms = int((time.perf_counter() - total_start) * 1000)
 
-            # Stage 3: Compliance (text-only, bold already resolved)
-            analysis.status = AnalysisStatus.PROCESSING_COMPLIANCE
-            await db.commit()
+            def _complete(analysis: AnalysisResult) -> None:
+                ocr_result, report = outcome.ocr_result, outcome.report
+                analysis.extracted_text = ocr_result.text
+                analysis.ocr_confidence = ocr_result.confidence
+                analysis.ocr_duration_ms = ocr_result.duration_ms
 
-            compliance_start = time.perf_counter()
-            report, compliance_duration_ms = await self._compliance.analyze(
-                ocr_result.text, application_details, image_path=image_path,
-                bold_result=bold_result,
-            )
-            compliance_wall_ms = int((time.perf_counter() - compliance_start) * 1000)
+                # Compact, as the history API splices this text into responses as-is
+                analysis.compliance_findings = json.dumps(
+                    [f.model_dump() for f in report.findings], separators=(",", ":"), ensure_ascii=False
+                )
+                analysis.overall_verdict = report.overall_verdict
+                analysis.compliance_duration_ms = outcome.compliance_duration_ms
+                analysis.stage_timings = json.dumps(outcome.stage_timings)
+                analysis.detected_beverage_type = report.beverage_type
+                analysis.detected_brand_name = report.brand_name
 
-            logger.info(
-                "Analysis %s compliance stage: %dms (engine=%dms)",
-                analysis_id, compliance_wall_ms, compliance_duration_ms,
-            )
+                # Done
+                analysis.status = AnalysisStatus.COMPLETED
+                analysis.total_duration_ms = total_duration_ms
 
-            analysis.compliance_findings = json.dumps(
-                [f.model_dump() for f in report.findings]
-            )
-            analysis.overall_verdict = report.overall_verdict
-            analysis.compliance_duration_ms = compliance_duration_ms
-            analysis.detected_beverage_type = report.beverage_type
-            analysis.detected_brand_name = report.brand_name
-
-            # Done
-            analysis.status = AnalysisStatus.COMPLETED
-            analysis.total_duration_ms = int((time.perf_counter() - total_start) * 1000)
-            await db.commit()
+            await self._write(db, analysis_id, _complete)
 
             logger.info(
                 "Analysis %s completed in %dms (verdict: %s)",
                 analysis_id,
-                analysis.total_duration_ms,
-                analysis.overall_verdict,
+                total_duration_ms,
+                outcome.report.overall_verdict,
             )
+            return AnalysisStatus.COMPLETED
 
         except Exception as exc:
             logger.exception("Analysis %s failed: %s", analysis_id, exc)
-            analysis = await db.get(AnalysisResult, analysis_id)
-            if analysis:
+            error_message = str(exc)
+            total_duration_ms = int((time.perf_counter() - total_start) * 1000)
+
+            def _fail(analysis: AnalysisResult) -> None:
                 analysis.status = AnalysisStatus.FAILED
-                analysis.error_message = str(exc)
-                analysis.total_duration_ms = int((time.perf_counter() - total_start) * 1000)
-                await db.commit()
+                analysis.error_message = error_message
+                analysis.total_duration_ms = total_duration_ms
+
+            await self._write(db, analysis_id, _fail)
+            return AnalysisStatus.FAILED
+        finally:
+            if self._status is not None:
+                self._status.discard(analysis_id)
@@ -0,0 +1,224 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+STAGES = ("ocr", "llm", "cpu")
+
+# Window of recent wait times used for the percentile metrics
+_WAIT_SAMPLE_SIZE = 1000
+
+
+class Priority(IntEnum):
+    """Admission class of a pipeline run; lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+class RunPriority:
+    """The priority of one run, raised in place by ``promote``.
+
+    A computation shared by several runs (the pipeline's single-flight
+    coalescing) holds one of these for all its callers: when an interactive
+    run joins a batch run's flight, promoting it moves the flight's queued
+    slot requests, and every slot it asks for later, to the interactive lane.
+    """
+
+    def __init__(self, priority: Priority) -> None:
+        self.priority = priority
+        # Slot requests of this run currently queued, with their limiter
+        self._queued: dict[_Waiter, StageLimiter] = {}
+
+    def promote(self, priority: Priority) -> None:
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        for waiter, limiter in list(self._queued.items()):
+            limiter._requeue(waiter, priority)
+
+
+# Set around a pipeline run; tasks it spawns inherit it with the context
+_priority: ContextVar[RunPriority | None] = ContextVar("analysis_priority", default=None)
+
+
+def current_priority() -> Priority:
+    run = _priority.get()
+    return Priority.BATCH if run is None else run.priority
+
+
+@contextmanager
+def run_priority(priority: Priority | RunPriority) -> Iterator[None]:
+    """Admit every stage slot taken inside the block at ``priority``."""
+    token = _priority.set(priority if isinstance(priority, RunPriority) else RunPriority(priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _percentile(waits: list[float], q: float) -> float:
+    return waits[min(int(len(waits) * q), len(waits) - 1)] if waits else 0.0
+
+
+class _Waiter:
+    __slots__ = ("future", "since", "priority")
+
+    def __init__(self, future: asyncio.Future, since: float, priority: Priority) -> None:
+        self.future = future
+        self.since = since
+        self.priority = priority
+
+
+class _Lane:
+    def __init__(self) -> None:
+        self.waiters: deque[_Waiter] = deque()
+        self.admitted = 0
+        self.waits_ms: deque[float] = deque(maxlen=_WAIT_SAMPLE_SIZE)
+
+    def stats(self) -> dict:
+        waits = sorted(self.waits_ms)
+        return {
+            "queue_depth": len(self.waiters),
+            "admitted": self.admitted,
+            "wait_ms_p50": _percentile(waits, 0.5),
+            "wait_ms_p95": _percentile(waits, 0.95),
+        }
+
+
+class StageLimiter:
+    """Admission to one stage, at most ``limit`` at a time, by priority.
+
+    A released slot is handed straight to a waiter, so a newcomer can't
+    overtake the queue. Interactive waiters go ahead of batch ones, first
+    come first served within each lane; once the oldest batch waiter has
+    waited ``batch_max_wait_ms`` it takes the next slot regardless, so a
+    steady stream of single uploads can't starve a batch. ``limit <= 0``
+    admits everything at once (the stage is still counted).
+    """
+
+    def __init__(self, limit: int, batch_max_wait_ms: float = 2000.0) -> None:
+        self.limit = limit
+        self._batch_max_wait = batch_max_wait_ms / 1000
+        self._active = 0
+        self._lanes = {priority: _Lane() for priority in Priority}
+        self._queued = 0
+        self._aged = 0
+        self._waits_ms: deque[float] = deque(maxlen=_WAIT_SAMPLE_SIZE)
+        self._max_wait_ms = 0.0
+
+    def _has_room(self) -> bool:
+        return self.limit <= 0 or self._active < self.limit
+
+    def _queue_depth(self) -> int:
+        return sum(len(lane.waiters) for lane in self._lanes.values())
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        run = _priority.get()
+        priority = Priority.BATCH if run is None else run.priority
+        start = time.perf_counter()
+        if self._has_room() and not self._queue_depth():
+            self._active += 1
+        else:
+            self._queued += 1
+            waiter = _Waiter(asyncio.get_running_loop().create_future(), start, priority)
+            self._lanes[priority].waiters.append(waiter)
+            if run is not None:
+                run._queued[waiter] = self
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # The slot was handed over just as we were cancelled
+                    self._release()
+                elif waiter in self._lanes[waiter.priority].waiters:
+                    # (A release may already have skipped past it)
+                    self._lanes[waiter.priority].waiters.remove(waiter)
+                raise
+            finally:
+                if run is not None:
+                    run._queued.pop(waiter, None)
+            # Counted in the lane it was admitted from
+            priority = waiter.priority
+        lane = self._lanes[priority]
+        wait_ms = (time.perf_counter() - start) * 1000
+        self._waits_ms.append(wait_ms)
+        lane.waits_ms.append(wait_ms)
+        self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+        lane.admitted += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _requeue(self, waiter: _Waiter, priority: Priority) -> None:
+        """Move a queued waiter to another lane, in arrival order."""
+        lane = self._lanes[waiter.priority].waiters
+        if waiter not in lane:
+            return
+        lane.remove(waiter)
+        waiter.priority = priority
+        target = self._lanes[priority].waiters
+        index = next((i for i, queued in enumerate(target) if queued.since > waiter.since), len(target))
+        target.insert(index, waiter)
+
+    def _next_lane(self) -> _Lane | None:
+        interactive, batch = self._lanes[Priority.INTERACTIVE], self._lanes[Priority.BATCH]
+        if batch.waiters and (
+            not interactive.waiters or time.perf_counter() - batch.waiters[0].since >= self._batch_max_wait
+        ):
+            if interactive.waiters:
+                self._aged += 1
+            return batch
+        return interactive if interactive.waiters else None
+
+    def _release(self) -> None:
+        while (lane := self._next_lane()) is not None:
+            waiter = lane.waiters.popleft()
+            if not waiter.future.done():
+                # Hand the slot over; the active count stays the same
+                waiter.future.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits_ms)
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "queue_depth": self._queue_depth(),
+            "admitted": sum(lane.admitted for lane in self._lanes.values()),
+            "queued": self._queued,
+            "aged": self._aged,
+            "wait_ms_p50": _percentile(waits, 0.5),
+            "wait_ms_p95": _percentile(waits, 0.95),
+            "wait_ms_max": self._max_wait_ms,
+            "lanes": {priority.name.lower(): lane.stats() for priority, lane in self._lanes.items()},
+        }
+
+
+class StageScheduler:
+    """Process-wide concurrency limits for the pipeline's external and CPU stages.
+
+    Every OCR call, LLM call and CPU-bound step (bold check, OCR
+    preprocessing) in the process takes a slot of its stage first, however
+    many batches and single uploads are running. The OCR and LLM slots are
+    taken beneath the response caches, so cache hits never wait for Azure
+    capacity. Slots are admitted by the ``Priority`` of the calling run
+    (see ``run_priority`` and ``RunPriority``).
+    """
+
+    def __init__(self, ocr: int = 8, llm: int = 4, cpu: int = 0, batch_max_wait_ms: float = 2000.0) -> None:
+        self._stages = {
+            stage: StageLimiter(limit, batch_max_wait_ms) for stage, limit in zip(STAGES, (ocr, llm, cpu))
+        }
+
+    def slot(self, stage: str):
+        return self._stages[stage].slot()
+
+    def stats(self) -> dict:
+        return {stage: limiter.stats() for stage, limiter in self._stages.items()}
@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.services.events import TopicHub
+
+STATUS_MODES = ("durable", "deferred")
+
+TERMINAL_STATUSES = {AnalysisStatus.COMPLETED, AnalysisStatus.FAILED}
+
+
+@dataclass
+class LiveAnalysis:
+    """What is known about a running analysis without reading its row.
+
+    The row fields are filled in when the pipeline picks the analysis up;
+    ``stage_timings`` is the pipeline's own timings dict, so stages appear in
+    it as they finish.
+    """
+
+    status: AnalysisStatus
+    label_id: str | None = None
+    created_at: datetime | None = None
+    application_details: str | None = None
+    stage_timings: dict[str, int] = field(default_factory=dict)
+
+
+class StatusRegistry:
+    """In-memory status of analyses that are still running.
+
+    The pipeline publishes every stage transition here. Read paths answer
+    in-flight analyses from these entries instead of the database, and in
+    ``deferred`` status mode the PROCESSING_* transitions are not committed
+    at all, so this is the only place they exist. Entries are dropped once
+    the terminal state has been written.
+
+    Each transition, and the final discard, is published on ``events`` under
+    the analysis id, so readers can wait for the next stage instead of polling.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, LiveAnalysis] = {}
+        self.events = TopicHub()
+
+    def track(self, analysis: AnalysisResult) -> None:
+        """Start answering for ``analysis`` from memory, seeded from its row."""
+        self._entries[analysis.id] = LiveAnalysis(
+            status=analysis.status,
+            label_id=analysis.label_id,
+            created_at=analysis.created_at,
+            application_details=analysis.application_details,
+        )
+
+    def set(self, analysis_id: str, status: AnalysisStatus) -> None:
+        entry = self._entries.get(analysis_id)
+        if entry is None:
+            self._entries[analysis_id] = LiveAnalysis(status=status)
+        else:
+            entry.status = status
+        self.events.publish(analysis_id)
+
+    def attach_timings(self, analysis_id: str, timings: dict[str, int]) -> None:
+        entry = self._entries.get(analysis_id)
+        if entry is not None:
+            entry.stage_timings = timings
+
+    def get(self, analysis_id: str) -> AnalysisStatus | None:
+        entry = self._entries.get(analysis_id)
+        return entry.status if entry is not None else None
+
+    def snapshot(self, analysis_id: str) -> LiveAnalysis | None:
+        """The live entry, if it holds enough to answer a read without the row."""
+        entry = self._entries.get(analysis_id)
+        if entry is None or entry.label_id is None:
+            return None
+        return entry
+
+    def discard(self, analysis_id: str) -> None:
+        if self._entries.pop(analysis_id, None) is not None:
+            self.events.publish(analysis_id)
+
+    def resolve(self, analysis_id: str, stored: AnalysisStatus | str) -> AnalysisStatus | str:
+        """Status to report for a row: the live one, unless the row is already final."""
+        if stored in TERMINAL_STATUSES:
+            return stored
+        entry = self._entries.get(analysis_id)
+        return entry.status if entry is not None else stored
+
+    def __len__(self) -> int:
+        return len(self._entries)
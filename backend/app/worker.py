@@ -0,0 +1,70 @@
+"""Standalone analysis worker: claims queued jobs from the database and runs them.
+
+Run one or more next to the API (on this host or any other sharing the
+database and upload directory); row leases split the queue between them:
+
+    cd backend
+    python -m app.worker --concurrency 8
+
+Set ``API_RUNS_JOBS=false`` on the API to leave all pipeline work to workers.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from app import dependencies
+from app.config import settings
+from app.db.init_db import create_all_tables
+from app.db.session import engine
+from app.providers import Providers
+from app.services.jobs import sweep_jobs
+
+logger = logging.getLogger("app.worker")
+
+
+async def run_worker(concurrency: int | None = None, worker_id: str | None = None) -> None:
+    from app.models import analysis, batch, job, label  # noqa: F401
+
+    await create_all_tables(engine)
+    job_options = {}
+    if concurrency is not None:
+        job_options["concurrency"] = concurrency
+    if worker_id is not None:
+        job_options["worker_id"] = worker_id
+    providers = Providers.from_settings(settings, job_overrides=job_options)
+    if settings.provider_warmup:
+        await providers.warmup()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    reclaimed, queued = await sweep_jobs(dependencies.session_factory)
+    if reclaimed or queued:
+        logger.info("Requeued %d jobs with lapsed leases and %d orphaned batch items", reclaimed, queued)
+
+    providers.jobs.start(dependencies.session_factory)
+    logger.info("Worker %s running (concurrency %d)", providers.jobs.worker_id, providers.jobs.concurrency)
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Worker %s draining", providers.jobs.worker_id)
+        await providers.aclose()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=None, help="jobs run at once (default: JOB_CONCURRENCY)")
+    parser.add_argument("--worker-id", default=None, help="name recorded on claimed jobs (default: host:pid:random)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.log_level.upper())
+    asyncio.run(run_worker(args.concurrency, args.worker_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Pre-OCR normalization on the fixture corpus: bytes sent, OCR latency, verdict parity.
+
+Offline it reports upload bytes and preprocessing time per label. With
+``--live`` it also OCRs the original and the normalized image against the
+configured Azure Vision resource, and compares the regex-rule verdicts and
+the bold check (run on original pixels with mapped-back polygons).
+
+    cd backend
+    python -m benchmarks.bench_preprocess --max-side 2048
+    python -m benchmarks.bench_preprocess --live
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import time
+
+from app.config import settings
+from app.services.compliance.bold_check import check_bold_opencv
+from app.services.compliance.rules import run_regex_rules
+from app.services.image import LabelImage, NormalizedImage, OCRPreprocessOptions, normalize_for_ocr
+from app.services.ocr.azure_vision import AzureVisionOCRService
+from app.services.pipeline import _to_original_coordinates
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures")
+
+
+def _corpus() -> list[str]:
+    return sorted(
+        glob.glob(os.path.join(FIXTURES_DIR, "*.png"))
+        + glob.glob(os.path.join(FIXTURES_DIR, "generated", "*.png"))
+    )
+
+
+def _verdicts(text: str) -> dict[str, str]:
+    return {finding.rule_id: finding.severity.value for finding in run_regex_rules(text)}
+
+
+async def _ocr_parity(
+    ocr: AzureVisionOCRService, image: LabelImage, normalized: NormalizedImage,
+) -> tuple[int, int, bool]:
+    original = await ocr.extract_text(image)
+    reduced = _to_original_coordinates(await ocr.extract_text(normalized.image), normalized)
+    same = (
+        _verdicts(original.text) == _verdicts(reduced.text)
+        and check_bold_opencv(image, original.lines) == check_bold_opencv(image, reduced.lines)
+    )
+    return original.duration_ms, reduced.duration_ms, same
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-side", type=int, default=settings.ocr_max_side)
+    parser.add_argument("--format", choices=("jpeg", "png"), default=settings.ocr_encode_format)
+    parser.add_argument("--jpeg-quality", type=int, default=settings.ocr_jpeg_quality)
+    parser.add_argument("--color", action="store_true", help="keep colour instead of grayscale")
+    parser.add_argument("--live", action="store_true",
+                        help="also OCR both versions against the configured Azure Vision resource")
+    args = parser.parse_args()
+
+    options = OCRPreprocessOptions(
+        max_side=args.max_side,
+        grayscale=not args.color,
+        encode_format=args.format,
+        jpeg_quality=args.jpeg_quality,
+    )
+    ocr = AzureVisionOCRService(settings.azure_vision_endpoint, settings.azure_vision_key) if args.live else None
+
+    before_total = after_total = 0
+    prep_ms, ocr_before, ocr_after, mismatches = [], [], [], []
+    try:
+        for path in _corpus():
+            image = LabelImage.from_path(path)
+            start = time.perf_counter()
+            normalized = normalize_for_ocr(image, options)
+            prep_ms.append((time.perf_counter() - start) * 1000)
+            before_total += image.size
+            after_total += normalized.image.size
+            line = f"{os.path.basename(path):<40} {image.size / 1024:8.1f}KB -> {normalized.image.size / 1024:8.1f}KB"
+
+            if ocr is not None:
+                before_ms, after_ms, same = await _ocr_parity(ocr, image, normalized)
+                ocr_before.append(before_ms)
+                ocr_after.append(after_ms)
+                if not same:
+                    mismatches.append(os.path.basename(path))
+                line += f"  ocr {before_ms:5d}ms -> {after_ms:5d}ms  {'parity' if same else 'DIFFERS'}"
+            print(line)
+    finally:
+        if ocr is not None:
+            await ocr.aclose()
+
+    print(
+        f"\nbytes sent: {before_total / 1024:.1f}KB -> {after_total / 1024:.1f}KB "
+        f"({100 * (1 - after_total / before_total):.1f}% less)  "
+        f"preprocess p50={statistics.median(prep_ms):.1f}ms max={max(prep_ms):.1f}ms"
+    )
+    if ocr is None:
+        print("OCR latency and verdict parity need Azure credentials; rerun with --live")
+    else:
+        print(
+            f"ocr p50: {statistics.median(ocr_before):.0f}ms -> {statistics.median(ocr_after):.0f}ms  "
+            f"verdict mismatches: {len(mismatches)} {mismatches or ''}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
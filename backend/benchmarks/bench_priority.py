@@ -0,0 +1,189 @@
+"""Single-label latency while a batch runs, with and without priority lanes.
+
+Runs the app, job dispatcher and stage scheduler in one process against a
+file-backed SQLite database, with a fake OCR that sleeps under a scheduler
+limit the way Azure's rate limit does. Single uploads are posted to
+``/api/analysis/single?sync=true`` one after another, as an agent at the
+counter would, in three scenarios:
+
+    idle      no batch running
+    fifo      a batch is queued and the limiters admit strictly by arrival
+    priority  the route's Priority.INTERACTIVE lane goes ahead of batch items
+
+Priority removes the wait behind queued batch items, not behind work batch
+items already hold. A single still waits for the next OCR slot to free up,
+up to one OCR call (``--ocr-delay-ms``; the "ocr wait p95" column), and
+shares the event loop, CPU and SQLite writer with the ``--job-concurrency``
+batch items in flight. So with a batch running its latency stays bounded
+but sits above idle rather than matching it; fewer batch items in flight
+narrow the gap.
+
+    cd backend
+    python -m benchmarks.bench_priority --batch 400 --singles 20 --ocr-delay-ms 100
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app import dependencies
+from app.config import settings
+from app.db.session import create_engines
+from app.db.writer import GroupCommitWriter
+from app.main import app
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.base import Base
+from app.models.batch import BatchJob, BatchStatus
+from app.models.label import Label
+from app.providers import Providers
+from app.services.image import LabelImage
+from app.services.jobs import enqueue
+from app.services.ocr.base import OCRResult
+from app.services.ocr.scheduled import ScheduledOCRService
+from app.services.scheduler import StageLimiter, StageScheduler
+
+SCENARIOS = ("idle", "fifo", "priority")
+
+LABEL_TEXT = "OLD TOM DISTILLERY\nKentucky Straight Bourbon Whiskey\n45% Alc./Vol.\n750 mL"
+
+
+class _DelayedOCR:
+    def __init__(self, delay_ms: float) -> None:
+        self._delay = delay_ms / 1000
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        await asyncio.sleep(self._delay)
+        return OCRResult(text=LABEL_TEXT, confidence=0.99, duration_ms=int(self._delay * 1000))
+
+
+class _FifoLimiter(StageLimiter):
+    """Admits the oldest waiter whatever its lane, as before priority lanes."""
+
+    def _next_lane(self):
+        lanes = [lane for lane in self._lanes.values() if lane.waiters]
+        return min(lanes, key=lambda lane: lane.waiters[0].since, default=None)
+
+
+class _InstantLLM:
+    async def analyze_compliance(self, text: str, prompt: str, image: LabelImage | None = None) -> str:
+        return '{"findings": []}'
+
+
+async def _seed_batch(factory, image_path: str, n: int) -> None:
+    async with factory() as db:
+        job = BatchJob(status=BatchStatus.PROCESSING, total_labels=n)
+        db.add(job)
+        await db.flush()
+        for i in range(n):
+            label = Label(
+                original_filename="label.png", stored_filepath=image_path,
+                file_size_bytes=0, mime_type="image/png", batch_id=job.id,
+            )
+            db.add(label)
+            await db.flush()
+            # Distinct details so identical images aren't coalesced
+            analysis = AnalysisResult(
+                label_id=label.id, status=AnalysisStatus.PENDING,
+                application_details=f'{{"brand_name": "batch {i}"}}',
+            )
+            db.add(analysis)
+            await db.flush()
+            enqueue(db, analysis.id, job.id)
+        await db.commit()
+
+
+def _percentile(latencies: list[float], q: float) -> float:
+    ordered = sorted(latencies)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def _bench(scenario: str, args, image: bytes, workdir: str) -> tuple[list[float], float]:
+    # The SQLite profile, as a single-host deployment runs: WAL, busy timeout, one writer
+    config = settings.model_copy(update={
+        "database_url": f"sqlite+aiosqlite:///{os.path.join(workdir, scenario)}.db",
+        "sqlite_profile_enabled": True,
+    })
+    engine, read_engine = create_engines(config)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    read_factory = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    if scenario != "idle":
+        await _seed_batch(factory, os.path.join(workdir, "label.png"), args.batch)
+
+    scheduler = StageScheduler(ocr=args.ocr_limit)
+    if scenario == "fifo":
+        scheduler._stages = {stage: _FifoLimiter(limiter.limit) for stage, limiter in scheduler._stages.items()}
+    providers = Providers(
+        ScheduledOCRService(_DelayedOCR(args.ocr_delay_ms), scheduler), _InstantLLM(),
+        writer=GroupCommitWriter(factory),
+        scheduler=scheduler,
+        job_options={"concurrency": args.job_concurrency, "poll_interval": 0.05},
+    )
+    dependencies.providers = providers
+    dependencies.session_factory, dependencies.read_session_factory = factory, read_factory
+    providers.jobs.start(factory)
+    # Let the batch fill the OCR queue first
+    await asyncio.sleep(0.5)
+
+    latencies = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(args.singles):
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/analysis/single", params={"sync": "true"},
+                files={"file": ("label.png", image, "image/png")},
+                # Distinct details so singles aren't coalesced with each other
+                data={"brand_name": f"single {i}"},
+            )
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(args.gap_ms / 1000)
+
+    # Time singles spent queued for an OCR slot, i.e. behind calls already running
+    ocr_wait_ms = scheduler.stats()["ocr"]["lanes"]["interactive"]["wait_ms_p95"]
+    await providers.jobs.stop(drain_seconds=0)
+    await providers.aclose()
+    await engine.dispose()
+    await read_engine.dispose()
+    return latencies, ocr_wait_ms
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=400, help="batch items queued behind the singles")
+    parser.add_argument("--singles", type=int, default=20)
+    parser.add_argument("--ocr-delay-ms", type=float, default=100.0)
+    parser.add_argument("--ocr-limit", type=int, default=4, help="SCHEDULER_OCR_CONCURRENCY")
+    parser.add_argument("--job-concurrency", type=int, default=40, help="batch items in flight")
+    parser.add_argument("--gap-ms", type=float, default=50.0, help="pause between single uploads")
+    args = parser.parse_args()
+    # Per-analysis INFO lines from the pipeline would drown the table
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        settings.upload_dir = os.path.join(workdir, "uploads")
+        settings.api_runs_jobs = True
+        image = cv2.imencode(".png", np.full((400, 600, 3), 255, np.uint8))[1].tobytes()
+        with open(os.path.join(workdir, "label.png"), "wb") as f:
+            f.write(image)
+
+        print(f"{'scenario':<9} {'p50 ms':>8}  {'p95 ms':>8}  {'max ms':>8}  {'ocr wait p95':>12}")
+        for scenario in SCENARIOS:
+            latencies, ocr_wait_ms = await _bench(scenario, args, image, workdir)
+            print(
+                f"{scenario:<9} {_percentile(latencies, 0.5):>8.0f}  "
+                f"{_percentile(latencies, 0.95):>8.0f}  {max(latencies):>8.0f}  {ocr_wait_ms:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Per-request provider latency: fresh clients per request vs app-scoped clients.
+
+Runs the real Azure SDK clients against a local fake endpoint, so the numbers
+isolate client construction and connection setup from Azure's own latency.
+
+    cd backend
+    python -m benchmarks.bench_providers --requests 50 --connect-delay-ms 30
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from app.config import Settings
+from app.providers import Providers
+from app.services.image import LabelImage
+from benchmarks.fake_azure import FakeAzureServer
+
+SAMPLE_LABEL = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "river_vodka.png")
+
+
+def _settings(url: str) -> Settings:
+    return Settings(
+        azure_vision_endpoint=url,
+        azure_vision_key="bench",
+        azure_openai_endpoint=url,
+        azure_openai_key="bench",
+        ocr_cache_enabled=False,
+        llm_cache_enabled=False,
+    )
+
+
+async def _one_request(providers: Providers) -> float:
+    start = time.perf_counter()
+    result = await providers.ocr.extract_text(LabelImage.from_path(SAMPLE_LABEL))
+    await providers.llm.analyze_compliance(result.text, "bench prompt")
+    return (time.perf_counter() - start) * 1000
+
+
+async def _per_request(settings: Settings, n: int) -> list[float]:
+    """Old behaviour: a new container (new SDK clients) for every request."""
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        providers = Providers.from_settings(settings)
+        await _one_request(providers)
+        timings.append((time.perf_counter() - start) * 1000)
+        await providers.aclose()
+    return timings
+
+
+async def _app_scoped(settings: Settings, n: int) -> list[float]:
+    providers = Providers.from_settings(settings)
+    await providers.warmup()
+    try:
+        return [await _one_request(providers) for _ in range(n)]
+    finally:
+        await providers.aclose()
+
+
+def _report(name: str, timings: list[float], connections: int) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(
+        f"{name:<14} mean={statistics.mean(timings):7.2f}ms  "
+        f"p50={statistics.median(timings):7.2f}ms  p95={p95:7.2f}ms  "
+        f"connections={connections}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--connect-delay-ms", type=float, default=30.0,
+                        help="simulated DNS+TLS cost per new connection")
+    args = parser.parse_args()
+
+    for name, runner in (("per-request", _per_request), ("app-scoped", _app_scoped)):
+        with FakeAzureServer(connect_delay_ms=args.connect_delay_ms) as server:
+            timings = await runner(_settings(server.url), args.requests)
+            _report(name, timings, server.connections)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
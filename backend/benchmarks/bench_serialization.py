@@ -0,0 +1,112 @@
+"""Serialization cost of a 100-item history page: pydantic models vs the orjson path.
+
+The pydantic path is what FastAPI does with a response model: build the models
+in ``to_response``, validate them against the response field, dump to JSON.
+The orjson path serializes rows directly and splices the stored findings text,
+written compactly by the pipeline, so its pages are no larger than pydantic's.
+
+    cd backend
+    python -m benchmarks.bench_serialization --pages 200
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from app.models import batch as _batch  # noqa: F401  (register mapped relationships)
+from app.models import label as _label  # noqa: F401
+from app.models.analysis import AnalysisResult, AnalysisStatus, OverallVerdict
+from app.routers.converters import json_envelope, response_json, summary_json, to_response, to_summary
+from app.schemas.analysis import AnalysisListResponse, AnalysisSummaryListResponse
+from app.schemas.compliance import ComplianceFinding, Severity
+from app.services.status import StatusRegistry
+
+PAGE_SIZE = 100
+
+
+def _rows(n: int, findings_per_row: int) -> list[AnalysisResult]:
+    findings = json.dumps([
+        ComplianceFinding(
+            rule_id=f"rule_{i}", rule_name=f"Rule {i}", severity=Severity.WARNING,
+            message="Government warning text does not match the required wording " * 2,
+            extracted_value="GOVERNMENT WARNING: (1) According to the Surgeon General...",
+            regulation_reference="27 CFR 16.21",
+        ).model_dump()
+        for i in range(findings_per_row)
+    ], separators=(",", ":"), ensure_ascii=False)  # as the pipeline stores them
+    start = datetime(2025, 1, 1)
+    return [
+        AnalysisResult(
+            id=f"analysis-{i:05d}", label_id=f"label-{i:05d}", status=AnalysisStatus.COMPLETED,
+            extracted_text="OLD TOM DISTILLERY\nKentucky Straight Bourbon Whiskey\n45% Alc./Vol.\n750 mL" * 4,
+            ocr_confidence=0.97, ocr_duration_ms=800, compliance_findings=findings,
+            application_details=json.dumps({"brand_name": "OLD TOM DISTILLERY", "net_contents": "750 mL"}),
+            overall_verdict=OverallVerdict.WARNINGS, compliance_duration_ms=35,
+            detected_beverage_type="spirits", detected_brand_name="OLD TOM DISTILLERY",
+            total_duration_ms=900, stage_timings=json.dumps({"ocr_ms": 800, "rules_ms": 4, "llm_ms": 30}),
+            created_at=start + timedelta(seconds=i),
+        )
+        for i in range(n)
+    ]
+
+
+def _summary_rows(rows: list[AnalysisResult]) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=r.id, label_id=r.label_id, status=r.status, overall_verdict=r.overall_verdict,
+            detected_brand_name=r.detected_brand_name, detected_beverage_type=r.detected_beverage_type,
+            created_at=r.created_at,
+        )
+        for r in rows
+    ]
+
+
+def _time(fn, pages: int) -> tuple[float, int]:
+    size = len(fn())
+    start = time.perf_counter()
+    for _ in range(pages):
+        fn()
+    return (time.perf_counter() - start) * 1000 / pages, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--findings", type=int, default=12, help="findings stored per analysis")
+    args = parser.parse_args()
+
+    rows = _rows(PAGE_SIZE, args.findings)
+    summaries = _summary_rows(rows)
+    live = StatusRegistry()
+    meta = {"total": 5000, "page": 1, "page_size": PAGE_SIZE, "next_cursor": "abc", "total_exact": True}
+    full_adapter = TypeAdapter(AnalysisListResponse)
+    summary_adapter = TypeAdapter(AnalysisSummaryListResponse)
+
+    def full_pydantic() -> bytes:
+        page = AnalysisListResponse(items=[to_response(r, live) for r in rows], **meta)
+        return full_adapter.dump_json(full_adapter.validate_python(page, from_attributes=True))
+
+    def full_orjson() -> bytes:
+        return json_envelope("items", [response_json(r, live) for r in rows], **meta).body
+
+    def summary_pydantic() -> bytes:
+        page = AnalysisSummaryListResponse(items=[to_summary(r, live) for r in summaries], **meta)
+        return summary_adapter.dump_json(summary_adapter.validate_python(page, from_attributes=True))
+
+    def summary_orjson() -> bytes:
+        return json_envelope("items", [summary_json(r, live) for r in summaries], **meta).body
+
+    print(f"{'view':<8} {'path':<9} {'ms/page':>8} {'bytes':>8} {'speedup':>8}")
+    for view, slow, fast in (("full", full_pydantic, full_orjson), ("summary", summary_pydantic, summary_orjson)):
+        base_ms, base_size = _time(slow, args.pages)
+        fast_ms, fast_size = _time(fast, args.pages)
+        print(f"{view:<8} {'pydantic':<9} {base_ms:>8.2f} {base_size:>8} {'':>8}")
+        print(f"{view:<8} {'orjson':<9} {fast_ms:>8.2f} {fast_size:>8} {base_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
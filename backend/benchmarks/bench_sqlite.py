@@ -0,0 +1,148 @@
+"""Mixed read/write load on SQLite: default engine vs the SQLite performance profile.
+
+Writers mimic pipeline status updates (three commits per analysis); readers
+mimic history pages and polling GETs. The default profile shares one
+rollback-journal engine; the SQLite profile uses WAL, a query-only reader
+pool and the group-commit writer task.
+
+    cd backend
+    python -m benchmarks.bench_sqlite --seconds 5 --writers 20 --readers 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import Settings
+from app.db.session import create_engines
+from app.db.writer import GroupCommitWriter
+from app.models import batch as _batch  # noqa: F401  (registers batch_jobs for the labels FK)
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.base import Base
+from app.models.label import Label
+
+STATUS_STEPS = (AnalysisStatus.PROCESSING_OCR, AnalysisStatus.PROCESSING_COMPLIANCE, AnalysisStatus.COMPLETED)
+
+
+async def _seed(factory, n: int) -> list[str]:
+    async with factory() as db:
+        ids = []
+        for _ in range(n):
+            label = Label(
+                original_filename="label.png", stored_filepath="/dev/null",
+                file_size_bytes=0, mime_type="image/png",
+            )
+            db.add(label)
+            await db.flush()
+            analysis = AnalysisResult(label_id=label.id, status=AnalysisStatus.PENDING)
+            db.add(analysis)
+            await db.flush()
+            ids.append(analysis.id)
+        await db.commit()
+        return ids
+
+
+async def _run_profile(profile: bool, args, workdir: str) -> dict:
+    db_path = os.path.join(workdir, f"{'profile' if profile else 'default'}.db")
+    engine, read_engine = create_engines(Settings(
+        database_url=f"sqlite+aiosqlite:///{db_path}", sqlite_profile_enabled=profile,
+    ))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    read_factory = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    ids = await _seed(factory, args.rows)
+    writer = GroupCommitWriter(factory, max_delay_ms=args.group_delay_ms) if profile else None
+
+    deadline = time.perf_counter() + args.seconds
+    read_ms: list[float] = []
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+
+    async def _set_status(analysis_id: str, status: AnalysisStatus) -> None:
+        async def _op(db: AsyncSession) -> None:
+            (await db.get(AnalysisResult, analysis_id)).status = status
+
+        if writer is not None:
+            await writer.submit(_op)
+            return
+        async with factory() as db:
+            await _op(db)
+            await db.commit()
+
+    async def _write_loop() -> None:
+        while time.perf_counter() < deadline:
+            analysis_id = random.choice(ids)
+            for status in STATUS_STEPS:
+                try:
+                    await _set_status(analysis_id, status)
+                    counts["writes"] += 1
+                except OperationalError:
+                    counts["errors"] += 1
+                await asyncio.sleep(args.write_gap_ms / 1000)
+
+    async def _read_loop() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with read_factory() as db:
+                    await db.execute(
+                        select(AnalysisResult).order_by(AnalysisResult.created_at.desc()).limit(20)
+                    )
+                    await db.get(AnalysisResult, random.choice(ids))
+                counts["reads"] += 1
+                read_ms.append((time.perf_counter() - start) * 1000)
+            except OperationalError:
+                counts["errors"] += 1
+
+    await asyncio.gather(
+        *[_write_loop() for _ in range(args.writers)],
+        *[_read_loop() for _ in range(args.readers)],
+    )
+    if writer is not None:
+        await writer.aclose()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+    ordered = sorted(read_ms) or [0.0]
+    return {
+        "writes/s": counts["writes"] / args.seconds,
+        "reads/s": counts["reads"] / args.seconds,
+        "read p50": statistics.median(ordered),
+        "read p95": ordered[int(len(ordered) * 0.95)],
+        "errors": counts["errors"],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--group-delay-ms", type=float, default=1.0,
+                        help="how long the writer task waits to fill a group")
+    parser.add_argument("--write-gap-ms", type=float, default=5.0,
+                        help="pause between one writer's status updates")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'profile':<8} {'writes/s':>9} {'reads/s':>9} {'read p50':>9} {'read p95':>9} {'errors':>7}")
+        for profile in (False, True):
+            r = await _run_profile(profile, args, workdir)
+            print(
+                f"{'sqlite' if profile else 'default':<8} {r['writes/s']:>9.1f} {r['reads/s']:>9.1f} "
+                f"{r['read p50']:>7.2f}ms {r['read p95']:>7.2f}ms {r['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
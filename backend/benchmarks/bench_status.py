@@ -0,0 +1,130 @@
+"""Pipeline throughput vs status-tracking mode at 5, 20 and 50 concurrent analyses.
+
+Runs the real pipeline and a file-backed SQLite database with fake OCR/LLM
+services, so the numbers isolate the cost of status commits:
+
+    durable   commit on every transition (PROCESSING_OCR, _COMPLIANCE, final)
+    deferred  in-progress states in memory, one commit per analysis
+    grouped   deferred + final states group-committed across analyses
+
+    cd backend
+    python -m benchmarks.bench_status --analyses 200 --ocr-delay-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.writer import GroupCommitWriter
+from app.models import batch as _batch  # noqa: F401  (registers batch_jobs for the labels FK)
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.base import Base
+from app.models.label import Label
+from app.services.compliance.engine import ComplianceEngine
+from app.services.image import LabelImage
+from app.services.ocr.base import OCRResult
+from app.services.pipeline import AnalysisPipeline
+from app.services.status import StatusRegistry
+
+CONCURRENCY_LEVELS = (5, 20, 50)
+MODES = ("durable", "deferred", "grouped")
+
+LABEL_TEXT = "OLD TOM DISTILLERY\nKentucky Straight Bourbon Whiskey\n45% Alc./Vol.\n750 mL"
+
+
+class _DelayedOCR:
+    def __init__(self, delay_ms: float) -> None:
+        self._delay = delay_ms / 1000
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        await asyncio.sleep(self._delay)
+        return OCRResult(text=LABEL_TEXT, confidence=0.99, duration_ms=int(self._delay * 1000))
+
+
+class _InstantLLM:
+    async def analyze_compliance(self, text: str, prompt: str, image: LabelImage | None = None) -> str:
+        return '{"findings": []}'
+
+
+async def _seed(factory, image_path: str, n: int) -> list[str]:
+    async with factory() as db:
+        ids = []
+        for _ in range(n):
+            label = Label(
+                original_filename="label.png", stored_filepath=image_path,
+                file_size_bytes=0, mime_type="image/png",
+            )
+            db.add(label)
+            await db.flush()
+            analysis = AnalysisResult(label_id=label.id, status=AnalysisStatus.PENDING)
+            db.add(analysis)
+            await db.flush()
+            ids.append(analysis.id)
+        await db.commit()
+        return ids
+
+
+async def _bench(mode: str, concurrency: int, args, image_path: str, workdir: str) -> tuple[float, int]:
+    db_path = os.path.join(workdir, f"{mode}_{concurrency}.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    ids = await _seed(factory, image_path, args.analyses)
+
+    commits = [0]
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def _on_commit(conn):
+        commits[0] += 1
+
+    writer = GroupCommitWriter(factory) if mode == "grouped" else None
+    pipeline = AnalysisPipeline(
+        _DelayedOCR(args.ocr_delay_ms), ComplianceEngine(_InstantLLM()),
+        status_registry=StatusRegistry(),
+        writer=writer,
+        defer_status=mode != "durable",
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(i: int, analysis_id: str) -> None:
+        async with semaphore:
+            async with factory() as db:
+                # Distinct details so identical images aren't coalesced
+                await pipeline.run(analysis_id, "label", image_path, db, {"brand_name": str(i)})
+
+    start = time.perf_counter()
+    await asyncio.gather(*[_one(i, analysis_id) for i, analysis_id in enumerate(ids)])
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        await writer.aclose()
+    await engine.dispose()
+    return args.analyses / elapsed, commits[0]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyses", type=int, default=200)
+    parser.add_argument("--ocr-delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        image_path = os.path.join(workdir, "label.png")
+        cv2.imwrite(image_path, np.full((400, 600, 3), 255, np.uint8))
+
+        print(f"{'concurrency':>11}  {'mode':<9} {'analyses/s':>10}  {'commits':>7}")
+        for concurrency in CONCURRENCY_LEVELS:
+            for mode in MODES:
+                throughput, commits = await _bench(mode, concurrency, args, image_path, workdir)
+                print(f"{concurrency:>11}  {mode:<9} {throughput:>10.1f}  {commits:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
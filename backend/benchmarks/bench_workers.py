@@ -0,0 +1,164 @@
+"""Queue throughput vs number of `app.worker` processes sharing one database.
+
+Seeds a file-backed SQLite database with queued jobs, then starts 1, 2 and 4
+worker processes (the same JobDispatcher `python -m app.worker` runs) with
+fake OCR/LLM services. OCR is an async sleep standing in for Azure; the bold
+check decodes and crops a real, full-size label image, which is the CPU work
+that one event loop can't spread across cores.
+
+    cd backend
+    python -m benchmarks.bench_workers --jobs 400 --concurrency 5 --ocr-delay-ms 50
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models import batch as _batch  # noqa: F401  (registers batch_jobs for the labels FK)
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.base import Base
+from app.models.job import AnalysisJob, JobStatus
+from app.models.label import Label
+from app.providers import Providers
+from app.services.image import LabelImage
+from app.services.jobs import enqueue
+from app.services.ocr.base import OCRLine, OCRResult
+
+WORKER_COUNTS = (1, 2, 4)
+
+IMAGE_SIZE = (2400, 1800)  # width, height
+HEADER_BOX = [(100, 1500), (900, 1500), (900, 1560), (100, 1560)]
+BODY_BOX = [(100, 1580), (2200, 1580), (2200, 1630), (100, 1630)]
+LABEL_TEXT = (
+    "OLD TOM DISTILLERY\nKentucky Straight Bourbon Whiskey\n45% Alc./Vol.\n750 mL\n"
+    "GOVERNMENT WARNING: (1) According to the Surgeon General, women should not drink "
+    "alcoholic beverages during pregnancy because of the risk of birth defects."
+)
+
+
+class _DelayedOCR:
+    def __init__(self, delay_ms: float) -> None:
+        self._delay = delay_ms / 1000
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        await asyncio.sleep(self._delay)
+        lines = [
+            OCRLine("GOVERNMENT WARNING:", HEADER_BOX),
+            OCRLine("(1) According to the Surgeon General, women should not drink alcoholic beverages", BODY_BOX),
+        ]
+        return OCRResult(text=LABEL_TEXT, confidence=0.99, duration_ms=int(self._delay * 1000), lines=lines)
+
+
+class _InstantLLM:
+    async def analyze_compliance(self, text: str, prompt: str, image: LabelImage | None = None) -> str:
+        return '{"findings": []}'
+
+
+def _write_label(path: str) -> None:
+    width, height = IMAGE_SIZE
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(180, 255, (height, width, 3), dtype=np.uint8)
+    cv2.putText(pixels, "GOVERNMENT WARNING:", (100, 1550), cv2.FONT_HERSHEY_SIMPLEX, 1.8, (0, 0, 0), 6)
+    cv2.putText(pixels, "(1) According to the Surgeon General, women should not drink alcoholic beverages",
+                (100, 1620), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    cv2.imwrite(path, pixels)
+
+
+async def _seed(db_path: str, image_path: str, n: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        for i in range(n):
+            label = Label(
+                original_filename="label.png", stored_filepath=image_path,
+                file_size_bytes=0, mime_type="image/png",
+            )
+            db.add(label)
+            await db.flush()
+            # Distinct details so identical images aren't coalesced
+            analysis = AnalysisResult(
+                label_id=label.id, status=AnalysisStatus.PENDING, application_details=f'{{"brand_name": "{i}"}}',
+            )
+            db.add(analysis)
+            await db.flush()
+            enqueue(db, analysis.id)
+        await db.commit()
+    await engine.dispose()
+
+
+async def _work(db_path: str, concurrency: int, ocr_delay_ms: float, start: mp.Barrier) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", connect_args={"timeout": 30})
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    providers = Providers(
+        _DelayedOCR(ocr_delay_ms), _InstantLLM(),
+        job_options={"concurrency": concurrency, "poll_interval": 0.05},
+    )
+    await asyncio.to_thread(start.wait)
+    providers.jobs.start(factory)
+    # Stop once nothing is left to claim; a real worker keeps polling
+    while True:
+        await asyncio.sleep(0.05)
+        async with factory() as db:
+            remaining = await db.scalar(
+                select(func.count()).select_from(AnalysisJob).where(AnalysisJob.status != JobStatus.DONE)
+            )
+        if remaining == 0:
+            break
+    await providers.aclose()
+    await engine.dispose()
+
+
+def _worker_process(db_path: str, concurrency: int, ocr_delay_ms: float, start: mp.Barrier) -> None:
+    asyncio.run(_work(db_path, concurrency, ocr_delay_ms, start))
+
+
+def _bench(workers: int, args, image_path: str, workdir: str) -> float:
+    db_path = os.path.join(workdir, f"workers_{workers}.db")
+    asyncio.run(_seed(db_path, image_path, args.jobs))
+
+    ctx = mp.get_context("spawn")
+    start = ctx.Barrier(workers + 1)
+    processes = [
+        ctx.Process(target=_worker_process, args=(db_path, args.concurrency, args.ocr_delay_ms, start))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    start.wait()
+    began = time.perf_counter()
+    for process in processes:
+        process.join()
+    return args.jobs / (time.perf_counter() - began)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=5, help="jobs each worker runs at once")
+    parser.add_argument("--ocr-delay-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        image_path = os.path.join(workdir, "label.png")
+        _write_label(image_path)
+
+        print(f"{'workers':>7}  {'jobs/s':>8}  {'speedup':>7}")
+        baseline = None
+        for workers in WORKER_COUNTS:
+            throughput = _bench(workers, args, image_path, workdir)
+            baseline = baseline or throughput
+            print(f"{workers:>7}  {throughput:>8.1f}  {throughput / baseline:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
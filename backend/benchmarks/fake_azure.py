@@ -0,0 +1,116 @@
+"""Local fake of the Azure Vision and Azure OpenAI HTTP endpoints for benchmarks.
+
+Speaks just enough of both REST APIs for the real SDK clients to parse the
+responses. ``connect_delay_ms`` is charged once per new TCP connection to
+stand in for the DNS + TLS handshake a real Azure endpoint costs.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+OCR_LINES = [
+    "RIVERSTONE",
+    "Premium Vodka",
+    "40% Alc./Vol.",
+    "750 mL",
+    "GOVERNMENT WARNING: (1) ACCORDING TO THE SURGEON GENERAL, WOMEN SHOULD NOT",
+    "DRINK ALCOHOLIC BEVERAGES DURING PREGNANCY BECAUSE OF THE RISK OF BIRTH DEFECTS.",
+]
+
+
+def _vision_body() -> bytes:
+    lines = []
+    for i, text in enumerate(OCR_LINES):
+        y = 20 + i * 30
+        polygon = [{"x": 10, "y": y}, {"x": 400, "y": y}, {"x": 400, "y": y + 20}, {"x": 10, "y": y + 20}]
+        words = [
+            {"text": word, "boundingPolygon": polygon, "confidence": 0.98}
+            for word in text.split()
+        ]
+        lines.append({"text": text, "boundingPolygon": polygon, "words": words})
+    return json.dumps({
+        "modelVersion": "2023-10-01",
+        "metadata": {"width": 500, "height": 400},
+        "readResult": {"blocks": [{"lines": lines}]},
+    }).encode()
+
+
+def _chat_body() -> bytes:
+    return json.dumps({
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4o-mini",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": '{"findings": []}'},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }).encode()
+
+
+class FakeAzureServer:
+    def __init__(self, connect_delay_ms: float = 0.0, response_delay_ms: float = 0.0) -> None:
+        self.connections = 0
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                server.connections += 1
+                if connect_delay_ms:
+                    time.sleep(connect_delay_ms / 1000)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+            def _reply(self, body: bytes, status: int = 200) -> None:
+                if response_delay_ms:
+                    time.sleep(response_delay_ms / 1000)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_HEAD(self) -> None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self) -> None:
+                self._reply(b'{"data": []}')
+
+            def do_POST(self) -> None:
+                server.requests += 1
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                if "imageanalysis:analyze" in self.path:
+                    self._reply(_vision_body())
+                elif "chat/completions" in self.path:
+                    self._reply(_chat_body())
+                else:
+                    self._reply(b'{"error": "not found"}', status=404)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self) -> "FakeAzureServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -7,7 +7,34 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.models.base import Base
-from app.models import label as _l, analysis as _a, batch as _b  # noqa: F401
+from app.models import label as _l, analysis as _a, batch as _b, job as _j  # noqa: F401
+from app.providers import Providers
+from app.services.image import LabelImage
+from app.services.ocr.base import OCRResult
+
+
+class FakeOCRService:
+    """OCR stand-in that returns fixed text without any network I/O."""
+
+    def __init__(self, text: str = "TEST BRAND\nVodka\n40% Alc./Vol.\n750 mL") -> None:
+        self.text = text
+        self.calls = 0
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        self.calls += 1
+        return OCRResult(text=self.text, confidence=0.99, duration_ms=1)
+
+
+class FakeLLMService:
+    """LLM stand-in that returns an empty findings payload."""
+
+    def __init__(self, response: str = '{"findings": []}') -> None:
+        self.response = response
+        self.calls = 0
+
+    async def analyze_compliance(self, text: str, prompt: str, image: LabelImage | None = None) -> str:
+        self.calls += 1
+        return self.response
 
 
 @pytest.fixture(scope="session")
@@ -18,8 +45,11 @@ def event_loop():
 
 
 @pytest_asyncio.fixture
-async def db_engine():
-    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+async def db_engine(tmp_path):
+    # A file database, so concurrent sessions (request handlers, background
+    # runs, job dispatchers) get their own connections and transactions as
+    # they do in production; an in-memory engine shares a single connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", echo=False)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield engine
@@ -35,29 +65,44 @@ async def db_session(db_engine) -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@pytest.fixture
+def fake_providers() -> Providers:
+    return Providers(FakeOCRService(), FakeLLMService())
+
+
 @pytest_asyncio.fixture
-async def client(db_engine) -> AsyncGenerator[AsyncClient, None]:
+async def client(db_engine, fake_providers) -> AsyncGenerator[AsyncClient, None]:
     # Create a fresh session factory for this test
     test_session_factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
 
     from app.main import app
     from app import dependencies
-    from app.dependencies import get_db
+    from app.dependencies import get_db, get_read_db
 
     # Override both the DI dependency and the module-level session_factory
     # (background tasks use session_factory directly, not the DI system)
     original_factory = dependencies.session_factory
+    original_read_factory = dependencies.read_session_factory
     dependencies.session_factory = test_session_factory
+    dependencies.read_session_factory = test_session_factory
+
+    # Swap the app-scoped OCR/LLM providers for fakes (no Azure calls)
+    original_providers = dependencies.providers
+    dependencies.providers = fake_providers
 
     async def override_get_db():
         async with test_session_factory() as session:
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
+    await fake_providers.jobs.stop()
     app.dependency_overrides.clear()
     dependencies.session_factory = original_factory
+    dependencies.read_session_factory = original_read_factory
+    dependencies.providers = original_providers
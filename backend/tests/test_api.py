@@ -1,9 +1,15 @@
+import asyncio
 import io
+import json
+import time
+from datetime import datetime
 
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 
+from app.models.analysis import AnalysisResult, AnalysisStatus
+
 
 PNG_BYTES = (
     b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01"
@@ -61,6 +67,82 @@ async def test_upload_single_with_all_application_details(client: AsyncClient):
     assert "analysis_id" in data
 
 
+@pytest.mark.asyncio
+async def test_upload_sync_returns_full_result(client: AsyncClient):
+    response = await client.post(
+        "/api/analysis/single",
+        params={"sync": "true", "timeout_ms": 5000},
+        files={"file": ("test_label.png", io.BytesIO(PNG_BYTES), "image/png")},
+        data={"brand_name": "Test Brand"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] in ("completed", "failed")
+    assert data["application_details"]["brand_name"] == "Test Brand"
+
+
+@pytest.mark.asyncio
+async def test_upload_sync_past_deadline_returns_202(client: AsyncClient, fake_providers):
+    release = asyncio.Event()
+    extract_text = fake_providers.ocr.extract_text
+
+    async def _slow_extract(image):
+        await release.wait()
+        return await extract_text(image)
+
+    fake_providers.ocr.extract_text = _slow_extract
+    response = await client.post(
+        "/api/analysis/single",
+        params={"sync": "true", "timeout_ms": 50},
+        files={"file": ("test_label.png", io.BytesIO(PNG_BYTES), "image/png")},
+    )
+    assert response.status_code == 202
+    analysis_id = response.json()["analysis_id"]
+    assert response.headers["location"] == f"/api/analysis/{analysis_id}"
+
+    # The run carries on after the response
+    release.set()
+    result = await client.get(f"/api/analysis/{analysis_id}", params={"wait": 5})
+    if result.json()["status"] not in ("completed", "failed"):
+        result = await client.get(f"/api/analysis/{analysis_id}", params={"wait": 5})
+    assert result.json()["status"] in ("completed", "failed")
+
+
+@pytest.mark.asyncio
+async def test_upload_only_enqueues_when_workers_run_jobs(client: AsyncClient, fake_providers, monkeypatch):
+    from app import dependencies
+    from app.config import settings
+    from app.providers import Providers
+    from tests.conftest import FakeLLMService, FakeOCRService
+
+    monkeypatch.setattr(settings, "api_runs_jobs", False)
+    monkeypatch.setattr(settings, "status_poll_seconds", 0.02)
+    response = await client.post(
+        "/api/analysis/single",
+        params={"sync": "true", "timeout_ms": 100},
+        files={"file": ("test_label.png", io.BytesIO(PNG_BYTES), "image/png")},
+    )
+    assert response.status_code == 202
+    analysis_id = response.json()["analysis_id"]
+    assert fake_providers.ocr.calls == 0
+    assert not fake_providers.jobs.running
+
+    # A separate worker shares only the database, so the API learns of the
+    # result by re-reading the row rather than from its own live registry
+    worker = Providers(FakeOCRService(), FakeLLMService())
+    worker.jobs.start(dependencies.session_factory)
+    try:
+        seen = []
+        while not seen or seen[-1] not in ("completed", "failed"):
+            assert len(seen) < 5
+            result = await client.get(f"/api/analysis/{analysis_id}", params={"wait": 5})
+            seen.append(result.json()["status"])
+    finally:
+        await worker.jobs.stop()
+    assert seen[-1] == "completed"
+    assert worker.ocr.calls == 1 and fake_providers.ocr.calls == 0
+
+
 @pytest.mark.asyncio
 async def test_upload_rejects_non_image(client: AsyncClient):
     response = await client.post(
@@ -86,6 +168,65 @@ async def test_list_analyses_empty(client: AsyncClient):
     assert data["total"] == 0
 
 
+@pytest.mark.asyncio
+async def test_list_analyses_cursor_pages(client: AsyncClient):
+    uploaded = set()
+    for i in range(5):
+        resp = await client.post(
+            "/api/analysis/single",
+            files={"file": (f"label{i}.png", io.BytesIO(PNG_BYTES), "image/png")},
+        )
+        uploaded.add(resp.json()["analysis_id"])
+
+    seen: list[str] = []
+    params = {"page_size": 2}
+    while True:
+        data = (await client.get("/api/analysis/", params=params)).json()
+        assert data["total"] == 5
+        seen.extend(item["id"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+
+    assert len(seen) == 5
+    assert set(seen) == uploaded
+
+
+@pytest.mark.asyncio
+async def test_list_analyses_summary_view(client: AsyncClient):
+    for i in range(3):
+        await client.post(
+            "/api/analysis/single",
+            files={"file": (f"label{i}.png", io.BytesIO(PNG_BYTES), "image/png")},
+        )
+
+    data = (await client.get("/api/analysis/", params={"view": "summary", "page_size": 2})).json()
+    assert len(data["items"]) == 2
+    assert data["next_cursor"] is not None
+    item = data["items"][0]
+    assert set(item) == {
+        "id", "label_id", "status", "overall_verdict",
+        "detected_brand_name", "detected_beverage_type", "created_at",
+    }
+
+    rest = (await client.get(
+        "/api/analysis/", params={"view": "summary", "cursor": data["next_cursor"]},
+    )).json()
+    assert len(rest["items"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_analyses_rejects_unknown_view(client: AsyncClient):
+    response = await client.get("/api/analysis/", params={"view": "compact"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_list_analyses_rejects_bad_cursor(client: AsyncClient):
+    response = await client.get("/api/analysis/", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_get_analysis_after_upload(client: AsyncClient):
     upload_resp = await client.post(
@@ -119,6 +260,194 @@ async def test_delete_analysis(client: AsyncClient):
     assert get_resp.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_get_terminal_analysis_is_conditional(client: AsyncClient):
+    upload_resp = await client.post(
+        "/api/analysis/single",
+        files={"file": ("label.png", io.BytesIO(PNG_BYTES), "image/png")},
+    )
+    analysis_id = upload_resp.json()["analysis_id"]
+
+    first = await client.get(f"/api/analysis/{analysis_id}")
+    assert first.json()["status"] in ("completed", "failed")
+    assert "immutable" in first.headers["cache-control"]
+    etag = first.headers["etag"]
+
+    revalidated = await client.get(f"/api/analysis/{analysis_id}", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    by_date = await client.get(
+        f"/api/analysis/{analysis_id}", headers={"If-Modified-Since": first.headers["last-modified"]},
+    )
+    assert by_date.status_code == 304
+
+    # RFC 5322 "-0000" (UTC, source unknown) parses to a naive datetime
+    minus_zero = first.headers["last-modified"].replace("GMT", "-0000")
+    by_naive_date = await client.get(f"/api/analysis/{analysis_id}", headers={"If-Modified-Since": minus_zero})
+    assert by_naive_date.status_code == 304
+
+    stale = await client.get(f"/api/analysis/{analysis_id}", headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_in_flight_analysis_answered_from_live_registry(client: AsyncClient, fake_providers):
+    # Not in the database at all: only the registry can answer for it
+    fake_providers.status.track(AnalysisResult(
+        id="in-flight", label_id="label-1", status=AnalysisStatus.PENDING,
+        application_details='{"brand_name": "Test Brand"}', created_at=datetime(2025, 1, 1),
+    ))
+    fake_providers.status.set("in-flight", AnalysisStatus.PROCESSING_COMPLIANCE)
+    fake_providers.status.attach_timings("in-flight", {"ocr_ms": 812})
+
+    resp = await client.get("/api/analysis/in-flight")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["status"] == "processing_compliance"
+    assert data["stage_timings"] == {"ocr_ms": 812}
+    assert data["application_details"]["brand_name"] == "Test Brand"
+    assert resp.headers["cache-control"] == "no-cache"
+
+    fake_providers.status.discard("in-flight")
+    assert (await client.get("/api/analysis/in-flight")).status_code == 404
+
+
+async def _track_as_in_flight(client: AsyncClient, providers) -> str:
+    """Upload (which completes), then re-register the analysis as still running."""
+    resp = await client.post(
+        "/api/analysis/single",
+        files={"file": ("label.png", io.BytesIO(PNG_BYTES), "image/png")},
+    )
+    analysis_id = resp.json()["analysis_id"]
+    stored = (await client.get(f"/api/analysis/{analysis_id}")).json()
+    providers.responses.clear()
+    providers.status.track(AnalysisResult(
+        id=analysis_id, label_id=stored["label_id"], status=AnalysisStatus.PROCESSING_OCR,
+        created_at=datetime.fromisoformat(stored["created_at"]),
+    ))
+    return analysis_id
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_on_next_stage(client: AsyncClient, fake_providers):
+    analysis_id = await _track_as_in_flight(client, fake_providers)
+    first = await client.get(f"/api/analysis/{analysis_id}")
+    assert first.json()["status"] == "processing_ocr"
+
+    async def _advance() -> None:
+        await asyncio.sleep(0.05)
+        fake_providers.status.set(analysis_id, AnalysisStatus.PROCESSING_COMPLIANCE)
+
+    advance = asyncio.ensure_future(_advance())
+    start = time.perf_counter()
+    resp = await client.get(
+        f"/api/analysis/{analysis_id}", params={"wait": 10}, headers={"If-None-Match": first.headers["etag"]},
+    )
+    await advance
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "processing_compliance"
+    assert time.perf_counter() - start < 5
+
+    # Nothing changes: the caller gets 304 after the wait
+    unchanged = await client.get(
+        f"/api/analysis/{analysis_id}", params={"wait": 0.05}, headers={"If-None-Match": resp.headers["etag"]},
+    )
+    assert unchanged.status_code == 304
+    fake_providers.status.discard(analysis_id)
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_terminal_state_from_database(client: AsyncClient, fake_providers):
+    analysis_id = await _track_as_in_flight(client, fake_providers)
+
+    async def _finish() -> None:
+        await asyncio.sleep(0.05)
+        fake_providers.status.discard(analysis_id)
+
+    finish = asyncio.ensure_future(_finish())
+    resp = await client.get(f"/api/analysis/{analysis_id}", params={"wait": 10})
+    await finish
+    assert resp.json()["status"] in ("completed", "failed")
+    assert "immutable" in resp.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_event_stream_sends_each_stage_until_final(client: AsyncClient, fake_providers):
+    analysis_id = await _track_as_in_flight(client, fake_providers)
+
+    async def _advance() -> None:
+        await asyncio.sleep(0.05)
+        fake_providers.status.set(analysis_id, AnalysisStatus.PROCESSING_COMPLIANCE)
+        await asyncio.sleep(0.05)
+        fake_providers.status.discard(analysis_id)
+
+    advance = asyncio.ensure_future(_advance())
+    resp = await client.get(f"/api/analysis/{analysis_id}/events")
+    await advance
+
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line.removeprefix("data: "))
+        for line in resp.text.splitlines() if line.startswith("data: ")
+    ]
+    assert [e["status"] for e in events][:2] == ["processing_ocr", "processing_compliance"]
+    assert events[-1]["status"] in ("completed", "failed")
+
+
+@pytest.mark.asyncio
+async def test_event_stream_not_found(client: AsyncClient):
+    assert (await client.get("/api/analysis/missing/events")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_terminal_analysis_served_from_response_cache(client: AsyncClient):
+    ids = []
+    for i in range(2):
+        resp = await client.post(
+            "/api/analysis/single",
+            files={"file": (f"label{i}.png", io.BytesIO(PNG_BYTES), "image/png")},
+        )
+        ids.append(resp.json()["analysis_id"])
+
+    first = await client.get(f"/api/analysis/{ids[0]}")
+    second = await client.get(f"/api/analysis/{ids[0]}")
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+    await client.get(f"/api/analysis/{ids[1]}")
+
+    stats = (await client.get("/api/metrics")).json()["response_cache"]
+    assert stats["hits"] == 1
+    assert stats["entries"] == 2
+    assert stats["bytes"] > 0
+
+    # Deletes must not leave a cached copy behind
+    await client.delete(f"/api/analysis/{ids[0]}")
+    assert (await client.get(f"/api/analysis/{ids[0]}")).status_code == 404
+    await client.post("/api/analysis/bulk-delete", json={"ids": [ids[1]]})
+    assert (await client.get(f"/api/analysis/{ids[1]}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_analysis_image_is_conditional(client: AsyncClient):
+    upload_resp = await client.post(
+        "/api/analysis/single",
+        files={"file": ("label.png", io.BytesIO(PNG_BYTES), "image/png")},
+    )
+    analysis_id = upload_resp.json()["analysis_id"]
+
+    first = await client.get(f"/api/analysis/{analysis_id}/image")
+    assert first.status_code == 200
+    assert first.content == PNG_BYTES
+    assert "immutable" in first.headers["cache-control"]
+
+    revalidated = await client.get(
+        f"/api/analysis/{analysis_id}/image", headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert revalidated.status_code == 304
+
+
 @pytest.mark.asyncio
 async def test_delete_analysis_not_found(client: AsyncClient):
     resp = await client.delete("/api/analysis/nonexistent-id")
@@ -195,3 +524,73 @@ async def test_batch_upload_with_csv(client: AsyncClient):
     data = response.json()
     assert "batch_id" in data
     assert data["total_labels"] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_batch_summary_view(client: AsyncClient):
+    upload = await client.post(
+        "/api/batch/upload",
+        files=[
+            ("files", ("label1.png", io.BytesIO(PNG_BYTES), "image/png")),
+            ("files", ("label2.png", io.BytesIO(PNG_BYTES), "image/png")),
+            ("csv_file", ("details.csv", io.BytesIO(b"filename,brand_name\n"), "text/csv")),
+        ],
+    )
+    batch_id = upload.json()["batch_id"]
+
+    data = (await client.get(f"/api/batch/{batch_id}", params={"view": "summary"})).json()
+    assert data["batch"]["id"] == batch_id
+    assert len(data["analyses"]) == 2
+    assert "extracted_text" not in data["analyses"][0]
+    assert "findings" not in data["analyses"][0]
+
+
+@pytest.mark.asyncio
+async def test_batch_stream_replays_final_state(client: AsyncClient):
+    upload = await client.post(
+        "/api/batch/upload",
+        files=[
+            ("files", ("label1.png", io.BytesIO(PNG_BYTES), "image/png")),
+            ("csv_file", ("details.csv", io.BytesIO(b"filename,brand_name\n"), "text/csv")),
+        ],
+    )
+    batch_id = upload.json()["batch_id"]
+
+    resp = await client.get(f"/api/batch/{batch_id}/stream")
+    events = [json.loads(line.removeprefix("data: ")) for line in resp.text.splitlines() if line.startswith("data: ")]
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["completed"] + events[-1]["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_stream_rereads_progress_when_workers_run_jobs(client: AsyncClient, monkeypatch):
+    from app import dependencies
+    from app.config import settings
+    from app.models.batch import BatchJob, BatchStatus
+
+    monkeypatch.setattr(settings, "api_runs_jobs", False)
+    monkeypatch.setattr(settings, "status_poll_seconds", 0.02)
+    upload = await client.post(
+        "/api/batch/upload",
+        files=[
+            ("files", ("label1.png", io.BytesIO(PNG_BYTES), "image/png")),
+            ("csv_file", ("details.csv", io.BytesIO(b"filename,brand_name\n"), "text/csv")),
+        ],
+    )
+    batch_id = upload.json()["batch_id"]
+
+    async def _finish_elsewhere() -> None:
+        # What a worker process does; nothing is published in this process
+        await asyncio.sleep(0.05)
+        async with dependencies.session_factory() as db:
+            batch = await db.get(BatchJob, batch_id)
+            batch.status = BatchStatus.COMPLETED
+            batch.completed_labels = 1
+            await db.commit()
+
+    worker = asyncio.ensure_future(_finish_elsewhere())
+    resp = await asyncio.wait_for(client.get(f"/api/batch/{batch_id}/stream"), timeout=5)
+    await worker
+    events = [json.loads(line.removeprefix("data: ")) for line in resp.text.splitlines() if line.startswith("data: ")]
+    assert events[0]["status"] != "completed"
+    assert events[-1]["status"] == "completed" and events[-1]["completed"] == 1
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.batch import BatchJob, BatchStatus
+from app.models.label import Label
+from app.services.batch_progress import BatchCounter, add_batch_counts, batch_counts_query, recover_batch_counts
+
+
+class _Owner:
+    """The flush side of a counter: keeps unwritten items and writes them on flush."""
+
+    def __init__(self, fail_times: int = 0) -> None:
+        self.pending = 0
+        self.writes: list[int] = []
+        self._fail_times = fail_times
+
+    def finish(self, counter: BatchCounter, success: bool = True) -> None:
+        self.pending += 1
+        counter.record(success)
+
+    async def flush(self) -> None:
+        if self._fail_times:
+            self._fail_times -= 1
+            raise RuntimeError("database is locked")
+        if self.pending:
+            self.writes.append(self.pending)
+            self.pending = 0
+
+
+@pytest.mark.asyncio
+async def test_counter_flushes_once_at_close_when_within_limits():
+    owner = _Owner()
+    counter = BatchCounter(owner.flush, flush_interval_ms=60_000, flush_every=100)
+    counter.start()
+    for i in range(10):
+        owner.finish(counter, i % 3 != 0)
+    await asyncio.sleep(0.01)
+    assert owner.writes == []
+    await counter.aclose()
+    assert owner.writes == [10]
+    assert (counter.completed, counter.failed) == (6, 4)
+
+
+@pytest.mark.asyncio
+async def test_counter_flushes_every_n_items():
+    owner = _Owner()
+    counter = BatchCounter(owner.flush, flush_interval_ms=60_000, flush_every=5)
+    counter.start()
+    for _ in range(12):
+        owner.finish(counter)
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    assert owner.writes and owner.writes[0] >= 5
+    await counter.aclose()
+    assert sum(owner.writes) == 12
+    assert len(owner.writes) < 12
+
+
+@pytest.mark.asyncio
+async def test_counter_flushes_on_interval_and_skips_idle_ticks():
+    owner = _Owner()
+    counter = BatchCounter(owner.flush, flush_interval_ms=10, flush_every=100)
+    counter.start()
+    owner.finish(counter, False)
+    await asyncio.sleep(0.05)
+    assert owner.writes == [1] and counter.flushes == 1
+    await counter.aclose()
+    assert owner.writes == [1]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_on_the_next_tick():
+    owner = _Owner(fail_times=1)
+    counter = BatchCounter(owner.flush, flush_interval_ms=10, flush_every=1)
+    counter.start()
+    owner.finish(counter)
+    await asyncio.sleep(0.005)
+    # The first flush failed; the retry writes what it left behind
+    await asyncio.sleep(0.02)
+    assert owner.writes == [1]
+    owner.finish(counter)
+    await counter.aclose()
+    assert sum(owner.writes) == 2
+
+
+async def _seed_batch(factory, statuses: list[AnalysisStatus]) -> str:
+    async with factory() as db:
+        batch = BatchJob(status=BatchStatus.PROCESSING, total_labels=len(statuses))
+        db.add(batch)
+        await db.flush()
+        for status in statuses:
+            label = Label(original_filename="x.png", stored_filepath="/tmp/x.png", file_size_bytes=1,
+                          mime_type="image/png", batch_id=batch.id)
+            db.add(label)
+            await db.flush()
+            db.add(AnalysisResult(label_id=label.id, status=status))
+        await db.commit()
+        return batch.id
+
+
+@pytest.mark.asyncio
+async def test_counts_from_separate_processes_add_up_then_complete(db_engine):
+    factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    batch_id = await _seed_batch(factory, [AnalysisStatus.COMPLETED, AnalysisStatus.FAILED, AnalysisStatus.PENDING])
+
+    # Two workers flush what each finished, with no read-modify-write between them
+    async with factory() as first, factory() as second:
+        assert await add_batch_counts(first, batch_id, 1, 0) == {
+            "status": "processing", "total": 3, "completed": 1, "failed": 0,
+        }
+        await first.commit()
+        progress = await add_batch_counts(second, batch_id, 0, 1)
+        await second.commit()
+    assert (progress["completed"], progress["failed"], progress["status"]) == (1, 1, "processing")
+
+    async with factory() as db:
+        analysis = (await db.execute(
+            select(AnalysisResult).where(AnalysisResult.status == AnalysisStatus.PENDING)
+        )).scalar_one()
+        analysis.status = AnalysisStatus.COMPLETED
+        # Counted twice, as after a retried job; reaching the total recomputes
+        progress = await add_batch_counts(db, batch_id, 2, 0)
+        assert await add_batch_counts(db, "missing", 1, 0) is None
+        await db.commit()
+    assert progress == {"status": "completed", "total": 3, "completed": 2, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_batch_counts_look_up_labels_by_batch_index(db_engine):
+    sql = str(batch_counts_query("b1").compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    async with db_engine.connect() as conn:
+        plan = "\n".join(row[-1] for row in (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all())
+    assert "ix_labels_batch_id" in plan
+    assert "SCAN analysis_results" not in plan
+
+
+@pytest.mark.asyncio
+async def test_recover_recomputes_unfinished_batches(db_engine):
+    factory = async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        running = BatchJob(status=BatchStatus.PROCESSING, total_labels=3, completed_labels=0)
+        finished = BatchJob(status=BatchStatus.PROCESSING, total_labels=2)
+        done = BatchJob(status=BatchStatus.COMPLETED, total_labels=1, completed_labels=1)
+        db.add_all([running, finished, done])
+        await db.flush()
+        for batch, statuses in (
+            (running, [AnalysisStatus.COMPLETED, AnalysisStatus.FAILED, AnalysisStatus.PROCESSING_OCR]),
+            (finished, [AnalysisStatus.COMPLETED, AnalysisStatus.COMPLETED]),
+        ):
+            for status in statuses:
+                label = Label(original_filename="x.png", stored_filepath="/tmp/x.png", file_size_bytes=1,
+                              mime_type="image/png", batch_id=batch.id)
+                db.add(label)
+                await db.flush()
+                db.add(AnalysisResult(label_id=label.id, status=status))
+        await db.commit()
+        ids = running.id, finished.id, done.id
+
+    assert await recover_batch_counts(factory) == 2
+
+    async with factory() as db:
+        running, finished, done = [await db.get(BatchJob, batch_id) for batch_id in ids]
+        assert (running.status, running.completed_labels, running.failed_labels) == (BatchStatus.PROCESSING, 1, 1)
+        assert (finished.status, finished.completed_labels, finished.failed_labels) == (BatchStatus.COMPLETED, 2, 0)
+        assert done.completed_labels == 1
@@ -0,0 +1,246 @@
+import time
+
+import pytest
+
+from app.services.cache import DiskLRUCache, MemoryLRUCache
+from app.services.image import LabelImage
+from app.services.llm.cache import CachedLLMService
+from app.services.ocr.base import OCRLine, OCRResult
+from app.services.ocr.cache import CachedOCRService
+from tests.test_api import PNG_BYTES
+
+
+class _CountingOCR:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        self.calls += 1
+        return OCRResult(
+            text="GOVERNMENT WARNING:\nbody text here",
+            confidence=0.93,
+            duration_ms=1500,
+            lines=[
+                OCRLine(text="GOVERNMENT WARNING:", bounding_polygon=[(1, 2), (30, 2), (30, 12), (1, 12)]),
+                OCRLine(text="body text here", bounding_polygon=[(1, 20), (40, 20), (40, 30), (1, 30)]),
+            ],
+        )
+
+
+@pytest.fixture
+def image():
+    return LabelImage(PNG_BYTES, path="label.png")
+
+
+# --- DiskLRUCache ---
+
+class TestDiskLRUCache:
+    def test_get_set_and_stats(self, tmp_path):
+        cache = DiskLRUCache(str(tmp_path / "c.sqlite3"), max_bytes=1024)
+        assert cache.get("a") is None
+        cache.set("a", b"value")
+        assert cache.get("a") == b"value"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes"] == 5
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = DiskLRUCache(str(tmp_path / "c.sqlite3"), max_bytes=30)
+        cache.set("a", b"x" * 10)
+        time.sleep(0.01)
+        cache.set("b", b"x" * 10)
+        time.sleep(0.01)
+        cache.get("a")  # a is now more recent than b
+        time.sleep(0.01)
+        cache.set("c", b"x" * 15)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] <= 30
+
+    def test_ttl_expires_entries(self, tmp_path):
+        cache = DiskLRUCache(str(tmp_path / "c.sqlite3"), max_bytes=1024)
+        cache.set("a", b"value", ttl_seconds=0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "c.sqlite3")
+        cache = DiskLRUCache(path, max_bytes=1024)
+        cache.set("a", b"value")
+        cache.close()
+
+        reopened = DiskLRUCache(path, max_bytes=1024)
+        assert reopened.get("a") == b"value"
+        assert reopened.stats()["bytes"] == 5
+
+
+# --- MemoryLRUCache ---
+
+class TestMemoryLRUCache:
+    def test_get_set_and_stats(self):
+        cache = MemoryLRUCache(max_bytes=1024)
+        assert cache.get("a") is None
+        cache.set("a", b"value")
+        assert cache.get("a") == b"value"
+        assert cache.stats() == {
+            "hits": 1, "misses": 1, "hit_ratio": 0.5, "entries": 1, "bytes": 5, "max_bytes": 1024,
+        }
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = MemoryLRUCache(max_bytes=30)
+        cache.set("a", b"x" * 10)
+        cache.set("b", b"x" * 10)
+        cache.get("a")
+        cache.set("c", b"x" * 15)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["bytes"] == 25
+
+    def test_explicit_size_and_oversized_values(self):
+        cache = MemoryLRUCache(max_bytes=100)
+        cache.set("a", ("body", "etag"), size=60)
+        cache.set("huge", b"x" * 101)
+        assert cache.get("a") == ("body", "etag")
+        assert cache.get("huge") is None
+        cache.set("a", b"short")
+        assert cache.stats()["bytes"] == 5
+
+    def test_discard(self):
+        cache = MemoryLRUCache(max_bytes=100)
+        cache.set("a", b"value")
+        cache.discard("a")
+        cache.discard("missing")
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 0
+
+
+# --- CachedOCRService ---
+
+class TestCachedOCRService:
+    @pytest.mark.asyncio
+    async def test_hit_skips_inner_service(self, tmp_path, image):
+        inner = _CountingOCR()
+        ocr = CachedOCRService(inner, DiskLRUCache(str(tmp_path / "ocr.sqlite3"), max_bytes=1 << 20))
+
+        first = await ocr.extract_text(image)
+        second = await ocr.extract_text(image)
+
+        assert inner.calls == 1
+        assert ocr.hits == 1 and ocr.misses == 1
+        assert second.text == first.text
+        assert second.confidence == first.confidence
+        assert second.lines == first.lines
+        assert second.duration_ms < first.duration_ms
+
+    @pytest.mark.asyncio
+    async def test_keyed_by_content_not_filename(self, tmp_path, image):
+        inner = _CountingOCR()
+        ocr = CachedOCRService(inner, DiskLRUCache(str(tmp_path / "ocr.sqlite3"), max_bytes=1 << 20))
+
+        await ocr.extract_text(image)
+        await ocr.extract_text(LabelImage(PNG_BYTES, path="renamed.png"))
+
+        assert inner.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_different_content_misses(self, tmp_path, image):
+        inner = _CountingOCR()
+        ocr = CachedOCRService(inner, DiskLRUCache(str(tmp_path / "ocr.sqlite3"), max_bytes=1 << 20))
+
+        await ocr.extract_text(image)
+        await ocr.extract_text(LabelImage(PNG_BYTES + b"\x00", path="other.png"))
+
+        assert inner.calls == 2
+
+
+# --- CachedLLMService ---
+
+class _CountingLLM:
+    def __init__(self, response: str = '{"findings": []}') -> None:
+        self.response = response
+        self.calls = 0
+
+    async def analyze_compliance(self, text: str, prompt: str, image: LabelImage | None = None) -> str:
+        self.calls += 1
+        return self.response
+
+
+def _llm_cache(tmp_path, inner, **kwargs) -> CachedLLMService:
+    cache = DiskLRUCache(str(tmp_path / "llm.sqlite3"), max_bytes=1 << 20)
+    return CachedLLMService(inner, cache, deployment="gpt-4o-mini", temperature=0.1, **kwargs)
+
+
+class TestCachedLLMService:
+    @pytest.mark.asyncio
+    async def test_identical_prompt_hits_cache(self, tmp_path):
+        inner = _CountingLLM()
+        llm = _llm_cache(tmp_path, inner)
+
+        first = await llm.analyze_compliance("text", "prompt")
+        second = await llm.analyze_compliance("text", "prompt")
+
+        assert first == second == inner.response
+        assert inner.calls == 1
+        assert llm.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_key_includes_deployment_and_temperature(self, tmp_path):
+        inner = _CountingLLM()
+        cache = DiskLRUCache(str(tmp_path / "llm.sqlite3"), max_bytes=1 << 20)
+        a = CachedLLMService(inner, cache, deployment="gpt-4o-mini", temperature=0.1)
+        b = CachedLLMService(inner, cache, deployment="gpt-4o", temperature=0.1)
+        c = CachedLLMService(inner, cache, deployment="gpt-4o-mini", temperature=0.7)
+
+        for llm in (a, b, c):
+            await llm.analyze_compliance("text", "prompt")
+
+        assert inner.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_version_salt_invalidates(self, tmp_path):
+        inner = _CountingLLM()
+        path = str(tmp_path / "llm.sqlite3")
+        old = CachedLLMService(inner, DiskLRUCache(path, 1 << 20), "gpt-4o-mini", 0.1, version="v1")
+        await old.analyze_compliance("text", "prompt")
+        new = CachedLLMService(inner, DiskLRUCache(path, 1 << 20), "gpt-4o-mini", 0.1, version="v2")
+        await new.analyze_compliance("text", "prompt")
+
+        assert inner.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry_refetches(self, tmp_path):
+        inner = _CountingLLM()
+        llm = _llm_cache(tmp_path, inner, ttl_seconds=0.01)
+
+        await llm.analyze_compliance("text", "prompt")
+        time.sleep(0.02)
+        await llm.analyze_compliance("text", "prompt")
+
+        assert inner.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_attached_image_is_part_of_key(self, tmp_path):
+        inner = _CountingLLM()
+        llm = _llm_cache(tmp_path, inner)
+
+        await llm.analyze_compliance("text", "prompt", image=LabelImage(b"a", path="a.png"))
+        await llm.analyze_compliance("text", "prompt", image=LabelImage(b"a", path="copy.png"))
+        await llm.analyze_compliance("text", "prompt", image=LabelImage(b"b", path="b.png"))
+        await llm.analyze_compliance("text", "prompt")
+
+        assert inner.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_invalid_json_not_cached(self, tmp_path):
+        inner = _CountingLLM(response="not json")
+        llm = _llm_cache(tmp_path, inner)
+
+        await llm.analyze_compliance("text", "prompt")
+        await llm.analyze_compliance("text", "prompt")
+
+        assert inner.calls == 2
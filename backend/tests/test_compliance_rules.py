@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 from unittest.mock import AsyncMock
@@ -9,6 +10,7 @@ import pytest
 from app.schemas.compliance import Severity
 from app.services.compliance.bold_check import check_bold_opencv
 from app.services.compliance.engine import ComplianceEngine
+from app.services.image import LabelImage
 from app.services.ocr.base import OCRLine
 from app.services.compliance.rules import (
     check_alcohol_content,
@@ -655,12 +657,13 @@ Kentucky Straight Bourbon Whiskey
 Product of USA"""
 
         engine = ComplianceEngine(mock_llm)
-        await engine.analyze(text, image_path="/tmp/label.jpg", bold_result=True)
+        image = LabelImage(b"jpeg bytes", path="/tmp/label.jpg")
+        await engine.analyze(text, image=image, bold_result=True)
 
-        # LLM called for text-only check — should NOT include image_path
+        # LLM called for text-only check — should NOT include the image
         mock_llm.analyze_compliance.assert_called_once()
         _, kwargs = mock_llm.analyze_compliance.call_args
-        assert "image_path" not in kwargs or kwargs.get("image_path") is None
+        assert "image" not in kwargs or kwargs.get("image") is None
 
     @pytest.mark.asyncio
     async def test_includes_application_matching(self):
@@ -716,3 +719,28 @@ Artisanal Spirit 2024
         assert duration_ms < 1000, (
             f"Compliance engine took {duration_ms}ms with mocked LLM — too slow"
         )
+
+    @pytest.mark.asyncio
+    async def test_llm_runs_before_bold_task_resolves(self):
+        """The bold check is awaited last, so the LLM call doesn't wait on it."""
+        bold = asyncio.get_running_loop().create_future()
+        mock_llm = AsyncMock()
+
+        async def _analyze(text, prompt, image=None):
+            # Still pending: the engine reached the LLM without waiting for bold
+            assert not bold.done()
+            bold.set_result(True)
+            return _make_llm_response()
+
+        mock_llm.analyze_compliance.side_effect = _analyze
+        # Missing name/address forces an LLM call
+        text = COMPLETE_LABEL_WITH_WARNING.replace("Distilled by", "")
+
+        timings: dict[str, int] = {}
+        engine = ComplianceEngine(mock_llm)
+        report, _ = await engine.analyze(text, bold_task=bold, timings=timings)
+
+        mock_llm.analyze_compliance.assert_called_once()
+        bold_finding = next(f for f in report.findings if f.rule_id == "GOV_WARNING_BOLD")
+        assert bold_finding.severity == Severity.PASS
+        assert {"rules_ms", "llm_ms", "bold_wait_ms"} <= timings.keys()
@@ -0,0 +1,97 @@
+"""The orjson response path must match what the pydantic models serialize to."""
+
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from app.models.analysis import AnalysisResult, AnalysisStatus, OverallVerdict
+from app.routers.converters import (
+    json_envelope,
+    response_json,
+    summary_json,
+    to_response,
+    to_summary,
+)
+from app.schemas.compliance import ComplianceFinding, Severity
+from app.services.status import StatusRegistry
+
+
+def _analysis(**overrides) -> AnalysisResult:
+    findings = [
+        ComplianceFinding(rule_id="brand_name", rule_name="Brand Name", severity=Severity.PASS, message="ok"),
+        ComplianceFinding(
+            rule_id="abv", rule_name="Alcohol Content", severity=Severity.FAIL,
+            message="missing", extracted_value=None, regulation_reference="27 CFR 5.65",
+        ),
+    ]
+    fields = dict(
+        id="a1",
+        label_id="l1",
+        status=AnalysisStatus.COMPLETED,
+        extracted_text="OLD TOM DISTILLERY\n45% Alc./Vol.",
+        ocr_confidence=0.9731,
+        ocr_duration_ms=812,
+        compliance_findings=json.dumps([f.model_dump() for f in findings], separators=(",", ":")),
+        application_details=json.dumps({"brand_name": "OLD TOM DISTILLERY"}),
+        overall_verdict=OverallVerdict.FAIL,
+        compliance_duration_ms=40,
+        detected_beverage_type="spirits",
+        detected_brand_name="OLD TOM DISTILLERY",
+        total_duration_ms=901,
+        stage_timings=json.dumps({"ocr_ms": 812, "rules_ms": 3}),
+        created_at=datetime(2025, 3, 1, 12, 30, 5, 120000),
+    )
+    fields.update(overrides)
+    return AnalysisResult(**fields)
+
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"status": AnalysisStatus.PENDING, "compliance_findings": None, "overall_verdict": None,
+     "stage_timings": None, "application_details": None},
+    {"application_details": "{not json", "created_at": datetime(2025, 3, 1, 12, 30, 5)},
+    {"compliance_findings": '[{"rule_id": "brand_name", "rule_na'},
+    {"compliance_findings": '{"findings": []}'},
+])
+def test_response_json_matches_model(overrides):
+    analysis = _analysis(**overrides)
+    expected = to_response(analysis).model_dump(mode="json")
+    assert orjson.loads(response_json(analysis)) == expected
+
+
+def test_response_json_splices_stored_findings():
+    analysis = _analysis()
+    body = response_json(analysis)
+    assert analysis.compliance_findings.encode() in body
+    assert len(body) <= len(to_response(analysis).model_dump_json())
+
+
+def test_envelope_stays_valid_json_with_a_corrupt_findings_row():
+    rows = [_analysis(), _analysis(id="a2", compliance_findings="[{truncated")]
+    body = orjson.loads(json_envelope("items", [response_json(a) for a in rows], total=2).body)
+    assert [item["compliance_findings"] is None for item in body["items"]] == [False, True]
+
+
+def test_response_json_overlays_live_status():
+    live = StatusRegistry()
+    live.set("a1", AnalysisStatus.PROCESSING_OCR)
+    analysis = _analysis(status=AnalysisStatus.PENDING)
+    assert orjson.loads(response_json(analysis, live))["status"] == "processing_ocr"
+
+
+def test_summary_json_matches_model():
+    row = SimpleNamespace(
+        id="a1", label_id="l1", status=AnalysisStatus.COMPLETED, overall_verdict=OverallVerdict.PASS,
+        detected_brand_name="X", detected_beverage_type="wine", created_at=datetime(2025, 3, 1),
+    )
+    assert orjson.loads(summary_json(row)) == to_summary(row).model_dump(mode="json")
+
+
+def test_json_envelope():
+    response = json_envelope("items", [b'{"id":"a"}', b'{"id":"b"}'], total=2, next_cursor=None)
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {"total": 2, "next_cursor": None, "items": [{"id": "a"}, {"id": "b"}]}
+    assert orjson.loads(json_envelope("items", []).body) == {"items": []}
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.events import BatchProgressHub, Topic, TopicHub
+
+
+@pytest.mark.asyncio
+async def test_wait_wakes_on_publish():
+    topic = Topic()
+    waiter = asyncio.ensure_future(topic.wait(topic.version, timeout=5))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    topic.publish()
+    assert await asyncio.wait_for(waiter, timeout=1) == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_at_once_for_a_missed_change():
+    topic = Topic()
+    seen = topic.version
+    topic.publish()
+    assert await asyncio.wait_for(topic.wait(seen, timeout=5), timeout=0.1) == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_unchanged():
+    topic = Topic()
+    assert await topic.wait(0, timeout=0.01) == 0
+
+
+@pytest.mark.asyncio
+async def test_hub_shares_topics_and_drops_them_with_the_last_subscriber():
+    hub = TopicHub()
+    hub.publish("a")  # no subscribers: nothing is created
+    assert len(hub) == 0
+
+    async with hub.subscribe("a") as first:
+        async with hub.subscribe("a") as second:
+            assert first is second
+            hub.publish("a")
+            assert first.version == 1
+        assert len(hub) == 1
+    assert len(hub) == 0
+
+
+async def _collect(stream, into: list[str]) -> None:
+    async for chunk in stream:
+        into.append(chunk)
+
+
+async def _collect_all(stream) -> list[str]:
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+async def test_batch_hub_replays_then_pushes_until_final():
+    hub = BatchProgressHub(heartbeat_seconds=5)
+    replay = {"status": "processing", "total": 2, "completed": 0, "failed": 0}
+    first, second = [], []
+    watchers = [
+        asyncio.ensure_future(_collect(hub.stream("b1", replay, False), first)),
+        asyncio.ensure_future(_collect(hub.stream("b1", replay, False), second)),
+    ]
+    await asyncio.sleep(0.01)
+
+    hub.publish("b1", {**replay, "completed": 1})
+    await asyncio.sleep(0.01)
+    hub.publish("b1", {**replay, "status": "completed", "completed": 2}, final=True)
+    await asyncio.wait_for(asyncio.gather(*watchers), timeout=1)
+
+    assert first == second
+    states = [json.loads(chunk.removeprefix("data: ")) for chunk in first]
+    assert [s["completed"] for s in states] == [0, 1, 2]
+    assert states[-1]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_batch_hub_heartbeats_while_idle():
+    hub = BatchProgressHub(heartbeat_seconds=0.01)
+    replay = {"status": "processing", "total": 1, "completed": 0, "failed": 0}
+    stream = hub.stream("b1", replay, False)
+    assert (await anext(stream)).startswith("data: ")
+    assert await anext(stream) == ": keep-alive\n\n"
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_batch_hub_prefers_live_state_and_ends_on_final_replay():
+    hub = BatchProgressHub()
+    hub.publish("b1", {"status": "completed", "total": 1, "completed": 1, "failed": 0}, final=True)
+    stale = {"status": "processing", "total": 1, "completed": 0, "failed": 0}
+    chunks = [chunk async for chunk in hub.stream("b1", stale, False)]
+    assert len(chunks) == 1
+    assert json.loads(chunks[0].removeprefix("data: "))["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_batch_hub_polls_reread_and_shares_changes():
+    hub = BatchProgressHub(heartbeat_seconds=5)
+    replay = {"status": "processing", "total": 1, "completed": 0, "failed": 0}
+    states = [(replay, False), ({**replay, "status": "completed", "completed": 1}, True)]
+    reads = []
+
+    async def reread():
+        reads.append(1)
+        return states[min(len(reads), len(states) - 1)]
+
+    chunks = await asyncio.wait_for(
+        _collect_all(hub.stream("b1", replay, False, reread=reread, poll_seconds=0.01)), timeout=1,
+    )
+    assert [json.loads(c.removeprefix("data: "))["completed"] for c in chunks] == [0, 1]
+    assert hub.latest("b1")[1] is True
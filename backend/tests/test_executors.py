@@ -0,0 +1,62 @@
+import asyncio
+import math
+import threading
+import time
+
+import pytest
+
+from app.services.executors import CPUExecutor
+
+
+def _blocking(seconds: float) -> str:
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+class TestCPUExecutor:
+    @pytest.mark.asyncio
+    async def test_runs_on_dedicated_threads(self):
+        executor = CPUExecutor("thread", max_workers=2)
+        try:
+            name = await executor.run(_blocking, 0)
+        finally:
+            executor.shutdown()
+        assert name.startswith("cpu")
+        assert executor.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reports_queue_depth_and_wait_time(self):
+        executor = CPUExecutor("thread", max_workers=1)
+        try:
+            tasks = [asyncio.ensure_future(executor.run(_blocking, 0.05)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            assert executor.stats()["queue_depth"] == 2
+            await asyncio.gather(*tasks)
+        finally:
+            executor.shutdown()
+
+        stats = executor.stats()
+        assert stats["in_flight"] == 0
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 3
+        # The last call queued behind two 50ms calls
+        assert stats["wait_ms_max"] >= 80
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self):
+        executor = CPUExecutor("process", max_workers=1)
+        try:
+            assert await executor.run(math.factorial, 10) == 3628800
+        finally:
+            executor.shutdown()
+
+    def test_rejects_unknown_kind(self):
+        with pytest.raises(ValueError):
+            CPUExecutor("gpu")
+
+    def test_defaults_to_core_count(self):
+        executor = CPUExecutor("thread")
+        try:
+            assert executor.max_workers >= 1
+        finally:
+            executor.shutdown()
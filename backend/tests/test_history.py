@@ -0,0 +1,118 @@
+"""History listing at scale: keyset pages and query plans over a seeded table."""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.init_db import create_all_tables
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.label import Label
+from app.services.history import CountCache, count_query, decode_cursor, encode_cursor, history_query
+
+SEED_ROWS = 20_000
+VERDICTS = ("pass", "fail", "warnings")
+
+
+@pytest_asyncio.fixture(scope="module")
+async def seeded_engine(tmp_path_factory):
+    path = tmp_path_factory.mktemp("history") / "history.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    await create_all_tables(engine)
+
+    start = datetime(2025, 1, 1)
+    label_id = str(uuid.uuid4())
+    async with engine.begin() as conn:
+        await conn.execute(insert(Label.__table__), [{
+            "id": label_id, "original_filename": "l.png", "stored_filepath": "/dev/null",
+            "file_size_bytes": 0, "mime_type": "image/png",
+            "created_at": start, "updated_at": start,
+        }])
+        await conn.execute(insert(AnalysisResult.__table__), [
+            {
+                "id": str(uuid.uuid4()),
+                "label_id": label_id,
+                "status": AnalysisStatus.COMPLETED,
+                "overall_verdict": VERDICTS[i % 3],
+                # Ten rows per second, so keyset ties on created_at are common
+                "created_at": start + timedelta(seconds=i // 10),
+                "updated_at": start,
+            }
+            for i in range(SEED_ROWS)
+        ])
+        await conn.exec_driver_sql("ANALYZE")
+    yield engine
+    await engine.dispose()
+
+
+async def _plan(engine, query) -> str:
+    sql = str(query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    async with engine.connect() as conn:
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def _deep_cursor() -> str:
+    return encode_cursor("2025-01-01 00:10:00.000000", "zzzzzzzz")
+
+
+@pytest.mark.asyncio
+async def test_unfiltered_page_uses_created_at_index(seeded_engine):
+    plan = await _plan(seeded_engine, history_query(cursor=_deep_cursor()).limit(21))
+    assert "ix_analysis_results_created_at_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_verdict_page_uses_verdict_index(seeded_engine):
+    plan = await _plan(seeded_engine, history_query("fail", _deep_cursor()).limit(21))
+    assert "ix_analysis_results_verdict_created_at_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_counts_use_an_index(seeded_engine):
+    assert "INDEX" in await _plan(seeded_engine, count_query())
+    assert "ix_analysis_results_verdict_created_at_id" in await _plan(seeded_engine, count_query("pass"))
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_row_once(seeded_engine):
+    factory = async_sessionmaker(seeded_engine, class_=AsyncSession, expire_on_commit=False)
+    seen: list[str] = []
+    cursor = None
+    async with factory() as db:
+        while True:
+            rows = (await db.execute(history_query("warnings", cursor).limit(501))).all()
+            page, more = rows[:500], len(rows) > 500
+            seen.extend(row[0].id for row in page)
+            if not more:
+                break
+            cursor = encode_cursor(page[-1].created_raw, page[-1][0].id)
+        total, exact = await CountCache().total(db, "warnings")
+
+    assert len(seen) == len(set(seen)) == total
+    assert exact is True
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    cursor = encode_cursor("2025-01-01 00:00:00", "abc")
+    assert decode_cursor(cursor) == ("2025-01-01 00:00:00", "abc")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_count_cache_serves_until_invalidated(seeded_engine):
+    cache = CountCache(ttl_seconds=60)
+    factory = async_sessionmaker(seeded_engine, class_=AsyncSession)
+    async with factory() as db:
+        assert await cache.total(db, None) == (SEED_ROWS, True)
+        assert await cache.total(db, None) == (SEED_ROWS, False)
+        assert await cache.total(db, None, exact=True) == (SEED_ROWS, True)
+        cache.invalidate()
+        assert cache.get(None) is None
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import pickle
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.compliance.bold_check import check_bold_opencv
+from app.services.image import LabelImage, NormalizedImage, OCRPreprocessOptions, normalize_for_ocr
+from app.services.ocr.base import OCRLine, OCRResult
+from app.services.pipeline import _to_original_coordinates
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+SAMPLE_LABEL = os.path.join(FIXTURES_DIR, "river_vodka.png")
+
+RIVER_VODKA_LINES = [
+    OCRLine(text="GOVERNMENT WARNING: (1) ACCORDING TO THE SURGEON GENERAL, WOMEN",
+            bounding_polygon=[(116, 1228), (746, 1228), (746, 1249), (116, 1249)]),
+    OCRLine(text="SHOULD NOT DRINK ALCOHOLIC BEVERAGES DURING PREGNANCY BECAUSE OF THE",
+            bounding_polygon=[(116, 1265), (851, 1265), (851, 1285), (116, 1285)]),
+]
+
+
+class TestLabelImage:
+    def test_loads_bytes_and_metadata(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        with open(SAMPLE_LABEL, "rb") as f:
+            raw = f.read()
+        assert image.data == raw
+        assert image.size == len(raw)
+        assert image.mime_type == "image/png"
+        assert image.sha256 == hashlib.sha256(raw).hexdigest()
+
+    def test_decodes_once_and_matches_imread(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        first = image.array
+        assert first is image.array
+        assert np.array_equal(first, cv2.imread(SAMPLE_LABEL))
+
+    def test_undecodable_bytes_give_none(self):
+        assert LabelImage(b"not an image", path="x.png").array is None
+
+    def test_pickle_drops_decoded_pixels(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        assert image.array is not None
+        clone = pickle.loads(pickle.dumps(image))
+        assert clone._array is None
+        assert clone.data == image.data
+        assert clone.array.shape == image.array.shape
+
+    def test_bold_check_accepts_handle(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        assert check_bold_opencv(image, RIVER_VODKA_LINES) == check_bold_opencv(SAMPLE_LABEL, RIVER_VODKA_LINES)
+
+    def test_bold_check_skips_decode_without_header(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        assert check_bold_opencv(image, []) is None
+        assert image._decoded is False
+
+
+class TestNormalizeForOCR:
+    def test_caps_longest_side_and_shrinks_bytes(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        normalized = normalize_for_ocr(image, OCRPreprocessOptions(max_side=1024))
+        pixels = cv2.imdecode(np.frombuffer(normalized.image.data, np.uint8), cv2.IMREAD_UNCHANGED)
+        assert max(pixels.shape[:2]) == 1024
+        assert pixels.ndim == 2
+        assert normalized.image.mime_type == "image/jpeg"
+        assert normalized.image.size < image.size
+        assert normalized.scale_x == pytest.approx(pixels.shape[1] / image.array.shape[1])
+
+    def test_small_image_keeps_size(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        normalized = normalize_for_ocr(image, OCRPreprocessOptions(max_side=10_000))
+        assert (normalized.scale_x, normalized.scale_y) == (1.0, 1.0)
+
+    def test_undecodable_bytes_pass_through(self):
+        image = LabelImage(b"not an image", path="x.png")
+        assert normalize_for_ocr(image, OCRPreprocessOptions()).image is image
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            normalize_for_ocr(LabelImage.from_path(SAMPLE_LABEL), OCRPreprocessOptions(encode_format="webp"))
+
+    def test_polygons_map_back_for_bold_check(self):
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        normalized = normalize_for_ocr(image, OCRPreprocessOptions(max_side=1024))
+        # What OCR would report on the downscaled image
+        scaled_lines = [
+            OCRLine(text=line.text, bounding_polygon=[
+                (round(x * normalized.scale_x), round(y * normalized.scale_y))
+                for x, y in line.bounding_polygon
+            ])
+            for line in RIVER_VODKA_LINES
+        ]
+        result = OCRResult(text="", confidence=1.0, duration_ms=0, lines=scaled_lines)
+        mapped = _to_original_coordinates(result, normalized).lines
+
+        for original, restored in zip(RIVER_VODKA_LINES, mapped):
+            for (x0, y0), (x1, y1) in zip(original.bounding_polygon, restored.bounding_polygon):
+                assert abs(x0 - x1) <= 2 and abs(y0 - y1) <= 2
+        assert check_bold_opencv(image, mapped) == check_bold_opencv(image, RIVER_VODKA_LINES)
+
+    def test_unscaled_result_untouched(self):
+        result = OCRResult(text="", confidence=1.0, duration_ms=0, lines=list(RIVER_VODKA_LINES))
+        image = LabelImage.from_path(SAMPLE_LABEL)
+        assert _to_original_coordinates(result, NormalizedImage(image)).lines == RIVER_VODKA_LINES
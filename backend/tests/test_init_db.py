@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.init_db import create_all_tables
+
+
+@pytest.mark.asyncio
+async def test_adds_columns_missing_from_existing_table(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    # A table created before stage_timings existed
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE analysis_results (id VARCHAR PRIMARY KEY, label_id VARCHAR NOT NULL, "
+            "status VARCHAR NOT NULL, created_at DATETIME, updated_at DATETIME)"
+        ))
+
+    await create_all_tables(engine)
+
+    async with engine.connect() as conn:
+        columns = await conn.run_sync(
+            lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("analysis_results")}
+        )
+    await engine.dispose()
+    assert {"stage_timings", "total_duration_ms", "extracted_text"} <= columns
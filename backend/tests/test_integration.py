@@ -50,8 +50,10 @@ async def test_real_ocr_extracts_text():
     """Azure Vision OCR reads text from a real vodka label image."""
     from app.services.ocr.azure_vision import AzureVisionOCRService
 
+    from app.services.image import LabelImage
+
     ocr = AzureVisionOCRService(settings.azure_vision_endpoint, settings.azure_vision_key)
-    result = await ocr.extract_text(SAMPLE_LABEL)
+    result = await ocr.extract_text(LabelImage.from_path(SAMPLE_LABEL))
 
     assert len(result.text) > 50, f"OCR returned too little text: {result.text!r}"
     assert result.confidence > 0.5
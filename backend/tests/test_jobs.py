@@ -0,0 +1,234 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.batch import BatchJob, BatchStatus
+from app.models.job import AnalysisJob, JobStatus
+from app.models.label import Label
+from app.services.batch_progress import recover_batch_counts
+from app.services.events import BatchProgressHub
+from app.services.jobs import (
+    JobDispatcher,
+    _utcnow,
+    claim_jobs,
+    enqueue,
+    finish_job,
+    start_batches,
+    sweep_jobs,
+)
+
+
+class _RecordingPipeline:
+    """Stands in for AnalysisPipeline: completes the row and remembers what it ran."""
+
+    def __init__(self, fail_ids: set[str] = frozenset()) -> None:
+        self.ran: list[str] = []
+        self._fail_ids = fail_ids
+
+    async def run(self, analysis_id, label_id, image_path, db, application_details=None):
+        self.ran.append(analysis_id)
+        await asyncio.sleep(0)
+        status = AnalysisStatus.FAILED if analysis_id in self._fail_ids else AnalysisStatus.COMPLETED
+        analysis = await db.get(AnalysisResult, analysis_id)
+        analysis.status = status
+        await db.commit()
+        return status
+
+
+@pytest.fixture
+def factory(db_engine) -> async_sessionmaker:
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def _batch(factory, statuses: list[AnalysisStatus], queue: bool = True) -> tuple[str, list[str]]:
+    async with factory() as db:
+        batch = BatchJob(status=BatchStatus.PROCESSING, total_labels=len(statuses))
+        db.add(batch)
+        await db.flush()
+        analysis_ids = []
+        for status in statuses:
+            label = Label(original_filename="x.png", stored_filepath="/tmp/x.png", file_size_bytes=1,
+                          mime_type="image/png", batch_id=batch.id)
+            db.add(label)
+            await db.flush()
+            analysis = AnalysisResult(label_id=label.id, status=status)
+            db.add(analysis)
+            await db.flush()
+            if queue:
+                enqueue(db, analysis.id, batch.id)
+            analysis_ids.append(analysis.id)
+        await db.commit()
+        return batch.id, analysis_ids
+
+
+async def _jobs(factory) -> dict[str, AnalysisJob]:
+    async with factory() as db:
+        return {job.analysis_id: job for job in (await db.execute(select(AnalysisJob))).scalars()}
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_claim_leases_each_job_once(factory):
+    _, analysis_ids = await _batch(factory, [AnalysisStatus.PENDING] * 3)
+
+    async with factory() as db:
+        first = await claim_jobs(db, "w1", 2, lease_seconds=60)
+        await db.commit()
+    async with factory() as db:
+        second = await claim_jobs(db, "w2", 5, lease_seconds=60)
+        await db.commit()
+
+    assert len(first) == 2 and len(second) == 1
+    assert {j.analysis_id for j in first + second} == set(analysis_ids)
+    assert first[0].image_path == "/tmp/x.png" and first[0].attempts == 1
+    jobs = await _jobs(factory)
+    assert {j.claimed_by for j in jobs.values()} == {"w1", "w2"}
+    assert all(j.status == JobStatus.RUNNING for j in jobs.values())
+
+
+@pytest.mark.asyncio
+async def test_claim_marks_a_pending_batch_processing(factory):
+    batch_id, _ = await _batch(factory, [AnalysisStatus.PENDING] * 2)
+    async with factory() as db:
+        (await db.get(BatchJob, batch_id)).status = BatchStatus.PENDING
+        await db.commit()
+
+    async with factory() as db:
+        [job] = await claim_jobs(db, "w1", 1, lease_seconds=60)
+        started = await start_batches(db, {job.batch_id})
+        assert await start_batches(db, {job.batch_id}) == []
+        await db.commit()
+    assert started == [(batch_id, {"status": "processing", "total": 2, "completed": 0, "failed": 0})]
+    async with factory() as db:
+        assert (await db.get(BatchJob, batch_id)).status == BatchStatus.PROCESSING
+
+
+@pytest.mark.asyncio
+async def test_claim_takes_single_uploads_before_older_batch_items(factory):
+    await _batch(factory, [AnalysisStatus.PENDING] * 2)
+    async with factory() as db:
+        label = Label(original_filename="x.png", stored_filepath="/tmp/x.png", file_size_bytes=1, mime_type="image/png")
+        db.add(label)
+        await db.flush()
+        single = AnalysisResult(label_id=label.id, status=AnalysisStatus.PENDING)
+        db.add(single)
+        await db.flush()
+        enqueue(db, single.id)
+        await db.commit()
+
+    async with factory() as db:
+        [first] = await claim_jobs(db, "w1", 1, lease_seconds=60)
+        assert await claim_jobs(db, "w1", 5, lease_seconds=60, interactive_only=True) == []
+        await db.commit()
+    assert first.analysis_id == single.id and first.batch_id is None
+
+
+@pytest.mark.asyncio
+async def test_lapsed_lease_is_claimable_and_stale_worker_cannot_settle(factory):
+    await _batch(factory, [AnalysisStatus.PENDING])
+    async with factory() as db:
+        [job] = await claim_jobs(db, "dead", 1, lease_seconds=-1)
+        await db.commit()
+    async with factory() as db:
+        [again] = await claim_jobs(db, "alive", 1, lease_seconds=60)
+        await finish_job(db, job.id, "dead", JobStatus.DONE)
+        await db.commit()
+
+    assert again.id == job.id and again.attempts == 2
+    [stored] = (await _jobs(factory)).values()
+    assert (stored.status, stored.claimed_by) == (JobStatus.RUNNING, "alive")
+
+
+@pytest.mark.asyncio
+async def test_sweep_requeues_lapsed_leases_and_orphans(factory):
+    await _batch(factory, [AnalysisStatus.PENDING])
+    _, orphans = await _batch(factory, [AnalysisStatus.PROCESSING_OCR, AnalysisStatus.COMPLETED], queue=False)
+    async with factory() as db:
+        await claim_jobs(db, "dead", 1, lease_seconds=-1)
+        await db.commit()
+
+    assert await sweep_jobs(factory) == (1, 1)
+    jobs = await _jobs(factory)
+    assert len(jobs) == 2 and orphans[0] in jobs
+    assert all(j.status == JobStatus.QUEUED and j.claimed_by is None for j in jobs.values())
+    assert await sweep_jobs(factory) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_resumes_a_batch_where_it_stopped(factory):
+    batch_id, analysis_ids = await _batch(
+        factory, [AnalysisStatus.COMPLETED, AnalysisStatus.PROCESSING_OCR, AnalysisStatus.PENDING, AnalysisStatus.PENDING],
+    )
+    done, interrupted, _, failing = analysis_ids
+    async with factory() as db:
+        jobs = {j.analysis_id: j for j in (await db.execute(select(AnalysisJob))).scalars()}
+        jobs[done].status = JobStatus.DONE
+        jobs[interrupted].status = JobStatus.RUNNING
+        jobs[interrupted].claimed_by = "crashed"
+        jobs[interrupted].attempts = 1
+        jobs[interrupted].lease_expires_at = _utcnow() - timedelta(seconds=1)
+        await db.commit()
+
+    # As resume_queued_work does at startup
+    await recover_batch_counts(factory)
+    await sweep_jobs(factory)
+    pipeline = _RecordingPipeline(fail_ids={failing})
+    hub = BatchProgressHub()
+    dispatcher = JobDispatcher(pipeline, hub, concurrency=2, poll_interval=0.05, flush_interval_ms=10)
+    dispatcher.start(factory)
+
+    async def _batch_done() -> bool:
+        async with factory() as db:
+            batch = await db.get(BatchJob, batch_id)
+            return batch.status == BatchStatus.COMPLETED
+
+    try:
+        await _wait_for(_batch_done)
+    finally:
+        await dispatcher.stop()
+
+    assert sorted(pipeline.ran) == sorted(analysis_ids[1:])
+    async with factory() as db:
+        batch = await db.get(BatchJob, batch_id)
+        assert (batch.completed_labels, batch.failed_labels) == (3, 1)
+    assert all(j.status == JobStatus.DONE for j in (await _jobs(factory)).values())
+    assert hub.latest(batch_id)[1] is True
+    assert dispatcher.stats()["claimed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_gives_up_after_max_attempts(factory):
+    batch_id, [analysis_id] = await _batch(factory, [AnalysisStatus.PROCESSING_OCR])
+    async with factory() as db:
+        [job] = (await db.execute(select(AnalysisJob))).scalars()
+        job.attempts = 3
+        await db.commit()
+
+    pipeline = _RecordingPipeline()
+    dispatcher = JobDispatcher(pipeline, max_attempts=3, poll_interval=0.05, flush_interval_ms=10)
+    dispatcher.start(factory)
+
+    async def _settled() -> bool:
+        return (await _jobs(factory))[analysis_id].status == JobStatus.FAILED
+
+    try:
+        await _wait_for(_settled)
+    finally:
+        await dispatcher.stop()
+
+    assert pipeline.ran == []
+    async with factory() as db:
+        analysis = await db.get(AnalysisResult, analysis_id)
+        assert analysis.status == AnalysisStatus.FAILED
+        assert "3 attempts" in analysis.error_message
+        assert (await db.get(BatchJob, batch_id)).failed_labels == 1
@@ -0,0 +1,332 @@
+"""Pipeline concurrency behaviour, using fake OCR/LLM services (no Azure)."""
+
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.writer import GroupCommitWriter
+from app.models.analysis import AnalysisResult, AnalysisStatus
+from app.models.base import Base
+from app.models.label import Label
+from app.services.compliance.engine import ComplianceEngine
+from app.services.image import LabelImage, OCRPreprocessOptions
+from app.services.ocr.base import OCRResult
+from app.services.ocr.scheduled import ScheduledOCRService
+from app.services.pipeline import AnalysisPipeline
+from app.services.scheduler import Priority, StageScheduler, run_priority
+from app.services.status import StatusRegistry
+from tests.conftest import FakeLLMService, FakeOCRService
+from tests.test_api import PNG_BYTES
+from tests.test_image import SAMPLE_LABEL
+
+
+class SlowOCRService(FakeOCRService):
+    """Fake OCR that blocks until released, so runs overlap deterministically."""
+
+    def __init__(self, fail: bool = False) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+        self.fail = fail
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("OCR unavailable")
+        return OCRResult(text=self.text, confidence=0.99, duration_ms=1)
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    # File-backed so concurrent sessions get their own connections
+    # (the shared in-memory connection can't hold overlapping transactions)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _create_analysis(session_factory, image_path: str) -> str:
+    async with session_factory() as db:
+        label = Label(
+            original_filename="label.png",
+            stored_filepath=image_path,
+            file_size_bytes=len(PNG_BYTES),
+            mime_type="image/png",
+        )
+        db.add(label)
+        await db.flush()
+        analysis = AnalysisResult(label_id=label.id, status=AnalysisStatus.PENDING)
+        db.add(analysis)
+        await db.commit()
+        return analysis.id
+
+
+async def _run(pipeline, session_factory, analysis_id: str, image_path: str, details=None) -> None:
+    async with session_factory() as db:
+        await pipeline.run(analysis_id, "label", image_path, db, details)
+
+
+async def _load(session_factory, analysis_id: str) -> AnalysisResult:
+    async with session_factory() as db:
+        return await db.get(AnalysisResult, analysis_id)
+
+
+def _write_images(tmp_path, count: int) -> list[str]:
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"copy_{i}.png"
+        path.write_bytes(PNG_BYTES)
+        paths.append(str(path))
+    return paths
+
+
+async def _run_concurrently(pipeline, ocr, session_factory, jobs) -> None:
+    tasks = [asyncio.ensure_future(_run(pipeline, session_factory, *job)) for job in jobs]
+
+    # Hold OCR until every run has either started it or joined an existing flight
+    async def _all_joined() -> None:
+        while ocr.calls + pipeline.coalesced_runs < len(jobs):
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(_all_joined(), timeout=5)
+    ocr.release.set()
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_identical_images_share_one_computation(tmp_path, session_factory):
+    ocr, llm = SlowOCRService(), FakeLLMService()
+    pipeline = AnalysisPipeline(ocr, ComplianceEngine(llm))
+    paths = _write_images(tmp_path, 3)
+    ids = [await _create_analysis(session_factory, p) for p in paths]
+
+    await _run_concurrently(pipeline, ocr, session_factory, list(zip(ids, paths)))
+
+    assert ocr.calls == 1
+    assert pipeline.coalesced_runs == 2
+    results = [await _load(session_factory, i) for i in ids]
+    assert {r.status for r in results} == {AnalysisStatus.COMPLETED}
+    assert len({r.compliance_findings for r in results}) == 1
+    stored = results[0].compliance_findings
+    assert stored == json.dumps(json.loads(stored), separators=(",", ":"), ensure_ascii=False)
+    assert pipeline.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_different_application_details_are_not_coalesced(tmp_path, session_factory):
+    ocr, llm = SlowOCRService(), FakeLLMService()
+    pipeline = AnalysisPipeline(ocr, ComplianceEngine(llm))
+    paths = _write_images(tmp_path, 2)
+    ids = [await _create_analysis(session_factory, p) for p in paths]
+
+    await _run_concurrently(pipeline, ocr, session_factory, [
+        (ids[0], paths[0], {"brand_name": "A"}),
+        (ids[1], paths[1], {"brand_name": "B"}),
+    ])
+
+    assert ocr.calls == 2
+    assert pipeline.coalesced_runs == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_failure_fails_every_waiter(tmp_path, session_factory):
+    ocr, llm = SlowOCRService(fail=True), FakeLLMService()
+    pipeline = AnalysisPipeline(ocr, ComplianceEngine(llm))
+    paths = _write_images(tmp_path, 2)
+    ids = [await _create_analysis(session_factory, p) for p in paths]
+
+    await _run_concurrently(pipeline, ocr, session_factory, list(zip(ids, paths)))
+
+    assert ocr.calls == 1
+    for analysis_id in ids:
+        result = await _load(session_factory, analysis_id)
+        assert result.status == AnalysisStatus.FAILED
+        assert result.error_message == "OCR unavailable"
+
+
+async def _wait_until(predicate) -> None:
+    async def _poll() -> None:
+        while not predicate():
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(_poll(), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_interactive_run_joining_a_batch_flight_promotes_it(tmp_path, session_factory):
+    scheduler = StageScheduler(ocr=1)
+    pipeline = AnalysisPipeline(ScheduledOCRService(FakeOCRService(), scheduler), ComplianceEngine(FakeLLMService()))
+    paths = _write_images(tmp_path, 3)
+    ids = [await _create_analysis(session_factory, p) for p in paths]
+    release = asyncio.Event()
+
+    async def _hold_ocr_slot() -> None:
+        async with scheduler.slot("ocr"):
+            await release.wait()
+
+    def lanes() -> dict:
+        return scheduler.stats()["ocr"]["lanes"]
+
+    async def _run_at(priority, analysis_id, path, details) -> None:
+        with run_priority(priority):
+            await _run(pipeline, session_factory, analysis_id, path, details)
+
+    holder = asyncio.ensure_future(_hold_ocr_slot())
+    await asyncio.sleep(0)
+    runs = [
+        asyncio.ensure_future(_run_at(Priority.BATCH, ids[0], paths[0], {"brand_name": "A"})),
+        asyncio.ensure_future(_run_at(Priority.BATCH, ids[1], paths[1], {"brand_name": "B"})),
+    ]
+    await _wait_until(lambda: lanes()["batch"]["queue_depth"] == 2)
+
+    # Same artwork and details as the first batch item, uploaded at the counter
+    runs.append(asyncio.ensure_future(_run_at(Priority.INTERACTIVE, ids[2], paths[2], {"brand_name": "A"})))
+    await _wait_until(lambda: pipeline.coalesced_runs == 1)
+    assert (lanes()["interactive"]["queue_depth"], lanes()["batch"]["queue_depth"]) == (1, 1)
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(holder, *runs), timeout=5)
+    assert lanes()["interactive"]["admitted"] == 1
+    assert {(await _load(session_factory, i)).status for i in ids} == {AnalysisStatus.COMPLETED}
+
+
+class RecordingOCRService(FakeOCRService):
+    def __init__(self) -> None:
+        super().__init__()
+        self.images: list[LabelImage] = []
+
+    async def extract_text(self, image: LabelImage) -> OCRResult:
+        self.images.append(image)
+        return await super().extract_text(image)
+
+
+@pytest.mark.asyncio
+async def test_preprocess_stage_sends_normalized_image(tmp_path, session_factory):
+    ocr, llm = RecordingOCRService(), FakeLLMService()
+    pipeline = AnalysisPipeline(
+        ocr, ComplianceEngine(llm), ocr_preprocess=OCRPreprocessOptions(max_side=512),
+    )
+    path = str(tmp_path / "label.png")
+    shutil.copy(SAMPLE_LABEL, path)
+    analysis_id = await _create_analysis(session_factory, path)
+
+    await _run(pipeline, session_factory, analysis_id, path)
+
+    assert (await _load(session_factory, analysis_id)).status == AnalysisStatus.COMPLETED
+    sent = ocr.images[0]
+    assert sent.mime_type == "image/jpeg"
+    assert sent.size < os.path.getsize(path)
+
+
+@pytest.mark.asyncio
+async def test_stage_timings_recorded(tmp_path, session_factory):
+    pipeline = AnalysisPipeline(FakeOCRService(), ComplianceEngine(FakeLLMService()))
+    path = _write_images(tmp_path, 1)[0]
+    analysis_id = await _create_analysis(session_factory, path)
+
+    await _run(pipeline, session_factory, analysis_id, path)
+
+    result = await _load(session_factory, analysis_id)
+    assert result.status == AnalysisStatus.COMPLETED
+    timings = json.loads(result.stage_timings)
+    assert {"ocr_ms", "bold_ms", "rules_ms", "compliance_ms"} <= timings.keys()
+
+
+class GatedLLMService(FakeLLMService):
+    """Fake LLM that blocks until released, to observe the compliance stage."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def analyze_compliance(self, text, prompt, image=None) -> str:
+        self.calls += 1
+        await self.release.wait()
+        return self.response
+
+
+@pytest.mark.asyncio
+async def test_registry_publishes_stages_and_partial_timings(tmp_path, session_factory):
+    ocr, llm = SlowOCRService(), GatedLLMService()
+    registry = StatusRegistry()
+    pipeline = AnalysisPipeline(ocr, ComplianceEngine(llm), status_registry=registry)
+    path = _write_images(tmp_path, 1)[0]
+    analysis_id = await _create_analysis(session_factory, path)
+
+    task = asyncio.ensure_future(_run(pipeline, session_factory, analysis_id, path))
+    while ocr.calls == 0:
+        await asyncio.sleep(0.01)
+
+    entry = registry.snapshot(analysis_id)
+    assert entry.status == AnalysisStatus.PROCESSING_OCR
+    assert entry.label_id == (await _load(session_factory, analysis_id)).label_id
+    assert entry.created_at is not None
+    assert entry.stage_timings == {}
+    # Durable mode still commits the transition
+    assert (await _load(session_factory, analysis_id)).status == AnalysisStatus.PROCESSING_OCR
+
+    ocr.release.set()
+    while llm.calls == 0:
+        await asyncio.sleep(0.01)
+    entry = registry.snapshot(analysis_id)
+    assert entry.status == AnalysisStatus.PROCESSING_COMPLIANCE
+    assert "ocr_ms" in entry.stage_timings
+    assert "compliance_ms" not in entry.stage_timings
+
+    llm.release.set()
+    await asyncio.wait_for(task, timeout=5)
+    assert registry.snapshot(analysis_id) is None
+    assert len(registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_deferred_status_stays_in_memory_until_terminal(tmp_path, session_factory):
+    ocr, llm = SlowOCRService(), FakeLLMService()
+    registry = StatusRegistry()
+    pipeline = AnalysisPipeline(ocr, ComplianceEngine(llm), status_registry=registry, defer_status=True)
+    path = _write_images(tmp_path, 1)[0]
+    analysis_id = await _create_analysis(session_factory, path)
+
+    task = asyncio.ensure_future(_run(pipeline, session_factory, analysis_id, path))
+    while ocr.calls == 0:
+        await asyncio.sleep(0.01)
+
+    # Pollers see progress through the registry; nothing was committed yet
+    stored = await _load(session_factory, analysis_id)
+    assert stored.status == AnalysisStatus.PENDING
+    assert registry.resolve(analysis_id, stored.status) == AnalysisStatus.PROCESSING_OCR
+
+    ocr.release.set()
+    await asyncio.wait_for(task, timeout=5)
+
+    assert (await _load(session_factory, analysis_id)).status == AnalysisStatus.COMPLETED
+    assert registry.get(analysis_id) is None
+
+
+@pytest.mark.asyncio
+async def test_group_commit_writes_terminal_states_together(tmp_path, session_factory):
+    ocr, llm = SlowOCRService(), FakeLLMService()
+    writer = GroupCommitWriter(session_factory, max_delay_ms=50)
+    pipeline = AnalysisPipeline(
+        ocr, ComplianceEngine(llm), status_registry=StatusRegistry(), writer=writer, defer_status=True,
+    )
+    paths = _write_images(tmp_path, 5)
+    ids = [await _create_analysis(session_factory, p) for p in paths]
+
+    # Distinct details so the runs aren't coalesced into one computation
+    await _run_concurrently(pipeline, ocr, session_factory, [
+        (analysis_id, path, {"brand_name": str(i)})
+        for i, (analysis_id, path) in enumerate(zip(ids, paths))
+    ])
+    await writer.aclose()
+
+    assert {(await _load(session_factory, i)).status for i in ids} == {AnalysisStatus.COMPLETED}
+    assert writer.stats()["writes"] == 5
+    assert writer.stats()["commits"] < 5
@@ -0,0 +1,124 @@
+import io
+
+import pytest
+from httpx import AsyncClient
+
+from app import dependencies
+from app.providers import Providers
+from tests.conftest import FakeLLMService, FakeOCRService
+from tests.test_api import PNG_BYTES
+
+
+class _ClosableOCR(FakeOCRService):
+    def __init__(self) -> None:
+        super().__init__()
+        self.warmed = False
+        self.closed = False
+
+    async def warmup(self) -> None:
+        self.warmed = True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class _FailingWarmupLLM(FakeLLMService):
+    def __init__(self) -> None:
+        super().__init__()
+        self.closed = False
+
+    async def warmup(self) -> None:
+        raise ConnectionError("endpoint unreachable")
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_provider_container(client: AsyncClient, fake_providers: Providers):
+    for i in range(3):
+        resp = await client.post(
+            "/api/analysis/single",
+            files={"file": (f"label{i}.png", io.BytesIO(PNG_BYTES), "image/png")},
+        )
+        assert resp.status_code == 200
+
+    assert fake_providers.ocr.calls == 3
+    assert dependencies.get_pipeline() is fake_providers.pipeline
+
+
+@pytest.mark.asyncio
+async def test_warmup_failure_is_not_fatal():
+    ocr, llm = _ClosableOCR(), _FailingWarmupLLM()
+    providers = Providers(ocr, llm)
+
+    await providers.warmup()
+    assert ocr.warmed
+
+    await providers.aclose()
+    assert ocr.closed and llm.closed
+
+
+@pytest.mark.asyncio
+async def test_missing_azure_credentials_fail_analyses_not_startup(tmp_path, monkeypatch):
+    from openai import OpenAIError
+
+    from app.config import Settings
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    settings = Settings(
+        _env_file=None, azure_openai_key="", azure_openai_endpoint="", cache_dir=str(tmp_path),
+        cpu_executor_kind="thread",
+    )
+    providers = Providers.from_settings(settings)
+    try:
+        with pytest.raises(OpenAIError):
+            await providers.llm.analyze_compliance("text", "prompt")
+    finally:
+        await providers.aclose()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_builds_and_closes_providers(monkeypatch):
+    from app import main
+
+    ocr, llm = _ClosableOCR(), _FailingWarmupLLM()
+
+    async def _no_tables(engine):
+        return None
+
+    async def _nothing():
+        return None
+
+    monkeypatch.setattr(main, "create_all_tables", _no_tables)
+    monkeypatch.setattr(main, "resume_queued_work", _nothing)
+    monkeypatch.setattr(main.Providers, "from_settings", classmethod(lambda cls, s: cls(ocr, llm)))
+    monkeypatch.setattr(dependencies, "providers", None)
+
+    async with main.lifespan(main.app):
+        assert dependencies.providers is not None
+        assert dependencies.providers.ocr is ocr
+        assert ocr.warmed
+
+    assert ocr.closed and llm.closed
+    assert dependencies.providers is None
+
+
+@pytest.mark.asyncio
+async def test_lifespan_keeps_preinstalled_providers(monkeypatch, fake_providers: Providers):
+    from app import main
+
+    async def _no_tables(engine):
+        return None
+
+    async def _nothing():
+        return None
+
+    monkeypatch.setattr(main, "create_all_tables", _no_tables)
+    monkeypatch.setattr(main, "resume_queued_work", _nothing)
+    monkeypatch.setattr(dependencies, "providers", fake_providers)
+
+    async with main.lifespan(main.app):
+        assert dependencies.providers is fake_providers
+
+    assert dependencies.providers is fake_providers
@@ -0,0 +1,169 @@
+import asyncio
+import io
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.ocr.scheduled import ScheduledOCRService
+from app.services.scheduler import Priority, RunPriority, StageLimiter, StageScheduler, run_priority
+from tests.conftest import FakeOCRService
+from tests.test_api import PNG_BYTES
+
+
+async def _hold(limiter: StageLimiter, order: list, i, release: asyncio.Event) -> None:
+    async with limiter.slot():
+        order.append(i)
+        await release.wait()
+
+
+async def _hold_at(priority: Priority | RunPriority, *args) -> None:
+    with run_priority(priority):
+        await _hold(*args)
+
+
+@pytest.mark.asyncio
+async def test_limiter_admits_up_to_limit_then_first_come_first_served():
+    limiter = StageLimiter(2)
+    order: list[int] = []
+    release = asyncio.Event()
+    tasks = [asyncio.ensure_future(_hold(limiter, order, i, release)) for i in range(5)]
+    await asyncio.sleep(0.01)
+
+    assert order == [0, 1]
+    stats = limiter.stats()
+    assert (stats["active"], stats["queue_depth"], stats["queued"]) == (2, 3, 3)
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2, 3, 4]
+    stats = limiter.stats()
+    assert (stats["active"], stats["queue_depth"], stats["admitted"]) == (0, 0, 5)
+    assert stats["wait_ms_max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue_without_leaking_a_slot():
+    limiter = StageLimiter(1)
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(_hold(limiter, [], 0, release))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(_hold(limiter, [], 1, release))
+    await asyncio.sleep(0)
+    assert limiter.stats()["queue_depth"] == 1
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert limiter.stats()["queue_depth"] == 0
+
+    release.set()
+    await holder
+    async with limiter.slot():
+        assert limiter.stats()["active"] == 1
+    assert limiter.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_waiters_are_admitted_ahead_of_queued_batch_work():
+    limiter = StageLimiter(1, batch_max_wait_ms=60_000)
+    order: list[str] = []
+    release = asyncio.Event()
+    tasks = [asyncio.ensure_future(_hold_at(Priority.BATCH, limiter, order, "b0", release))]
+    await asyncio.sleep(0)
+    tasks += [asyncio.ensure_future(_hold_at(Priority.BATCH, limiter, order, f"b{i}", release)) for i in (1, 2)]
+    await asyncio.sleep(0)
+    tasks += [asyncio.ensure_future(_hold_at(Priority.INTERACTIVE, limiter, order, "i", release))]
+    await asyncio.sleep(0)
+    assert limiter.stats()["lanes"]["batch"]["queue_depth"] == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["b0", "i", "b1", "b2"]
+    assert limiter.stats()["lanes"]["interactive"]["admitted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_promoted_run_moves_its_queued_request_to_the_interactive_lane():
+    limiter = StageLimiter(1, batch_max_wait_ms=60_000)
+    order: list[str] = []
+    release = asyncio.Event()
+    shared = RunPriority(Priority.BATCH)
+    tasks = [asyncio.ensure_future(_hold_at(Priority.BATCH, limiter, order, "b0", release))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(_hold_at(Priority.BATCH, limiter, order, "b1", release)))
+    tasks.append(asyncio.ensure_future(_hold_at(shared, limiter, order, "shared", release)))
+    await asyncio.sleep(0)
+
+    shared.promote(Priority.INTERACTIVE)
+    shared.promote(Priority.BATCH)  # never demoted
+    assert limiter.stats()["lanes"]["interactive"]["queue_depth"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == ["b0", "shared", "b1"]
+    assert shared.priority == Priority.INTERACTIVE
+
+
+@pytest.mark.asyncio
+async def test_batch_waiter_past_its_max_wait_goes_before_interactive():
+    limiter = StageLimiter(1, batch_max_wait_ms=20)
+    order: list[str] = []
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(_hold_at(Priority.BATCH, limiter, order, "b0", release))
+    await asyncio.sleep(0)
+    starved = asyncio.ensure_future(_hold_at(Priority.BATCH, limiter, order, "b1", release))
+    await asyncio.sleep(0.03)
+    late = asyncio.ensure_future(_hold_at(Priority.INTERACTIVE, limiter, order, "i", release))
+    await asyncio.sleep(0)
+
+    release.set()
+    await asyncio.gather(holder, starved, late)
+    assert order == ["b0", "b1", "i"]
+    assert limiter.stats()["aged"] == 1
+
+
+@pytest.mark.asyncio
+async def test_zero_limit_is_unbounded():
+    limiter = StageLimiter(0)
+    order: list[int] = []
+    release = asyncio.Event()
+    tasks = [asyncio.ensure_future(_hold(limiter, order, i, release)) for i in range(20)]
+    await asyncio.sleep(0.01)
+    assert len(order) == 20 and limiter.stats()["queue_depth"] == 0
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_scheduled_ocr_is_limited_across_callers():
+    class _SlowOCR(FakeOCRService):
+        def __init__(self) -> None:
+            super().__init__()
+            self.active = 0
+            self.peak = 0
+
+        async def extract_text(self, image):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return await super().extract_text(image)
+
+    scheduler = StageScheduler(ocr=2)
+    inner = _SlowOCR()
+    ocr = ScheduledOCRService(inner, scheduler)
+    await asyncio.gather(*[ocr.extract_text(None) for _ in range(6)])
+    assert inner.peak == 2
+    assert scheduler.stats()["ocr"]["admitted"] == 6
+
+
+@pytest.mark.asyncio
+async def test_pipeline_cpu_steps_take_scheduler_slots(client: AsyncClient, fake_providers):
+    response = await client.post(
+        "/api/analysis/single",
+        params={"sync": "true"},
+        files={"file": ("test_label.png", io.BytesIO(PNG_BYTES), "image/png")},
+    )
+    assert response.status_code == 200
+    stats = fake_providers.metrics()["scheduler"]
+    assert stats["cpu"]["admitted"] >= 1
+    assert stats["cpu"]["active"] == 0
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.config import Settings
+from app.db.session import create_engines
+
+
+async def _pragma(engine, name: str):
+    async with engine.connect() as conn:
+        return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_default_profile_shares_one_engine(tmp_path):
+    engine, read_engine = create_engines(Settings(database_url=f"sqlite+aiosqlite:///{tmp_path / 'a.db'}"))
+    assert engine is read_engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_profile_applies_pragmas_and_read_only_pool(tmp_path):
+    engine, read_engine = create_engines(Settings(
+        database_url=f"sqlite+aiosqlite:///{tmp_path / 'b.db'}",
+        sqlite_profile_enabled=True,
+        sqlite_busy_timeout_ms=1234,
+        sqlite_synchronous="normal",
+        sqlite_mmap_size_mb=1,
+    ))
+    try:
+        assert await _pragma(engine, "journal_mode") == "wal"
+        assert await _pragma(engine, "busy_timeout") == 1234
+        assert await _pragma(engine, "synchronous") == 1
+        assert await _pragma(engine, "mmap_size") == 1024 * 1024
+
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        async with read_engine.connect() as conn:
+            assert (await conn.execute(text("SELECT count(*) FROM t"))).scalar() == 0
+            with pytest.raises(OperationalError):
+                await conn.execute(text("INSERT INTO t VALUES (1)"))
+    finally:
+        await engine.dispose()
+        await read_engine.dispose()
+
+
+def test_profile_skipped_for_in_memory_database():
+    engine, read_engine = create_engines(Settings(
+        database_url="sqlite+aiosqlite:///:memory:", sqlite_profile_enabled=True,
+    ))
+    assert engine is read_engine
+
+
+def test_rejects_unknown_synchronous_level(tmp_path):
+    with pytest.raises(ValueError):
+        create_engines(Settings(
+            database_url=f"sqlite+aiosqlite:///{tmp_path / 'c.db'}",
+            sqlite_profile_enabled=True,
+            sqlite_synchronous="sometimes",
+        ))
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.writer import GroupCommitWriter
+from app.models.base import Base
+from app.models.batch import BatchJob
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'writer.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+def _count_commits(engine) -> list[int]:
+    commits = [0]
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def _on_commit(conn):
+        commits[0] += 1
+
+    return commits
+
+
+async def _increment(session: AsyncSession, batch_id: str) -> int:
+    batch = await session.get(BatchJob, batch_id)
+    batch.completed_labels += 1
+    return batch.completed_labels
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_commits(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        batch = BatchJob(total_labels=20)
+        db.add(batch)
+        await db.commit()
+    commits = _count_commits(engine)
+    writer = GroupCommitWriter(factory, max_delay_ms=20)
+
+    await asyncio.gather(*[
+        writer.submit(lambda s: _increment(s, batch.id)) for _ in range(20)
+    ])
+    await writer.aclose()
+
+    async with factory() as db:
+        assert (await db.get(BatchJob, batch.id)).completed_labels == 20
+    assert commits[0] < 20
+    assert writer.stats()["writes"] == 20
+
+
+@pytest.mark.asyncio
+async def test_failing_write_does_not_sink_its_group(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        batch = BatchJob(total_labels=2)
+        db.add(batch)
+        await db.commit()
+    writer = GroupCommitWriter(factory, max_delay_ms=20)
+
+    async def _broken(session: AsyncSession) -> None:
+        raise RuntimeError("bad write")
+
+    results = await asyncio.gather(
+        writer.submit(lambda s: _increment(s, batch.id)),
+        writer.submit(_broken),
+        writer.submit(lambda s: _increment(s, batch.id)),
+        return_exceptions=True,
+    )
+    await writer.aclose()
+
+    assert isinstance(results[1], RuntimeError)
+    async with factory() as db:
+        assert (await db.get(BatchJob, batch.id)).completed_labels == 2
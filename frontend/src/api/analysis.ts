@@ -6,10 +6,15 @@ import type {
   ApplicationDetails,
 } from "../types/analysis";
 
+export type UploadSingleResult = AnalysisResponse | { analysis_id: string };
+
+// With syncTimeoutMs the server runs the analysis inline and answers with the
+// full result if it finishes in time; otherwise (HTTP 202) with just the id
 export async function uploadSingle(
   file: File,
   applicationDetails: ApplicationDetails,
-): Promise<{ analysis_id: string }> {
+  syncTimeoutMs?: number,
+): Promise<UploadSingleResult> {
   const formData = new FormData();
   formData.append("file", file);
   for (const [key, value] of Object.entries(applicationDetails)) {
@@ -17,24 +22,45 @@ export async function uploadSingle(
       formData.append(key, value);
     }
   }
-  const response = await apiClient.post<{ analysis_id: string }>(
+  const response = await apiClient.post<UploadSingleResult>(
     "/analysis/single",
     formData,
+    {
+      params: syncTimeoutMs
+        ? { sync: true, timeout_ms: syncTimeoutMs }
+        : undefined,
+    },
   );
   return response.data;
 }
 
-export async function getAnalysis(id: string): Promise<AnalysisResponse> {
-  const response = await apiClient.get<AnalysisResponse>(`/analysis/${id}`);
+export async function getAnalysis(
+  id: string,
+  waitSeconds?: number,
+): Promise<AnalysisResponse> {
+  // With waitSeconds, an in-flight analysis is held until its next stage
+  const response = await apiClient.get<AnalysisResponse>(`/analysis/${id}`, {
+    params: waitSeconds ? { wait: waitSeconds } : undefined,
+  });
   return response.data;
 }
 
+export function analysisEventsUrl(id: string): string {
+  return `/api/analysis/${id}/events`;
+}
+
 export async function getHistory(
-  page: number,
+  cursor: string | null,
   pageSize: number,
   verdict?: string,
 ): Promise<AnalysisListResponse> {
-  const params: Record<string, string | number> = { page, page_size: pageSize };
+  const params: Record<string, string | number> = {
+    page_size: pageSize,
+    view: "summary",
+  };
+  if (cursor) {
+    params.cursor = cursor;
+  }
   if (verdict) {
     params.verdict = verdict;
   }
@@ -70,6 +96,8 @@ export async function uploadBatch(
 }
 
 export async function getBatch(id: string): Promise<BatchDetailResponse> {
-  const response = await apiClient.get<BatchDetailResponse>(`/batch/${id}`);
+  const response = await apiClient.get<BatchDetailResponse>(`/batch/${id}`, {
+    params: { view: "summary" },
+  });
   return response.data;
 }
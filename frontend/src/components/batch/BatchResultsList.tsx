@@ -1,9 +1,9 @@
 import { useNavigate } from "react-router";
-import type { AnalysisResponse } from "../../types/analysis";
+import type { AnalysisSummary } from "../../types/analysis";
 import StatusBadge from "../common/StatusBadge";
 
 interface BatchResultsListProps {
-  analyses: AnalysisResponse[];
+  analyses: AnalysisSummary[];
 }
 
 export default function BatchResultsList({ analyses }: BatchResultsListProps) {
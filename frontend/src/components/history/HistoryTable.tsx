@@ -1,10 +1,10 @@
 import { useCallback, useRef, useEffect } from "react";
 import { useNavigate } from "react-router";
-import type { AnalysisResponse } from "../../types/analysis";
+import type { AnalysisSummary } from "../../types/analysis";
 import StatusBadge from "../common/StatusBadge";
 
 interface HistoryTableProps {
-  analyses: AnalysisResponse[];
+  analyses: AnalysisSummary[];
   page: number;
   totalPages: number;
   onPageChange: (page: number) => void;
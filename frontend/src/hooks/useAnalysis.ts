@@ -1,83 +1,135 @@
 import { useState, useRef, useCallback, useEffect } from "react";
-import { uploadSingle, getAnalysis } from "../api/analysis";
+import { uploadSingle, getAnalysis, analysisEventsUrl } from "../api/analysis";
 import type { AnalysisResponse, ApplicationDetails } from "../types/analysis";
 
-const POLL_INTERVAL_MS = 1000;
-const MAX_POLL_DURATION_MS = 5 * 60 * 1000; // 5 minutes
+// Most labels finish inside this; slower ones continue via the event stream
+const SYNC_TIMEOUT_MS = 4000;
+const LONG_POLL_SECONDS = 25;
+const MAX_WAIT_MS = 5 * 60 * 1000; // 5 minutes
+
+function isFinal(result: AnalysisResponse): boolean {
+  return result.status === "completed" || result.status === "failed";
+}
 
 export default function useAnalysis() {
   const [analysis, setAnalysis] = useState<AnalysisResponse | null>(null);
   const [isUploading, setIsUploading] = useState(false);
   const [isProcessing, setIsProcessing] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const timerRef = useRef<ReturnType<typeof setInterval> | null>(null);
-  const pollStartRef = useRef<number | null>(null);
+  const sourceRef = useRef<EventSource | null>(null);
+  const timeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  // Bumped on every stop so a long-poll loop from an earlier upload exits
+  const runRef = useRef(0);
 
-  const stopPolling = useCallback(() => {
-    if (timerRef.current) {
-      clearInterval(timerRef.current);
-      timerRef.current = null;
+  const stopWatching = useCallback(() => {
+    runRef.current += 1;
+    sourceRef.current?.close();
+    sourceRef.current = null;
+    if (timeoutRef.current) {
+      clearTimeout(timeoutRef.current);
+      timeoutRef.current = null;
     }
-    pollStartRef.current = null;
   }, []);
 
   useEffect(() => {
-    return () => stopPolling();
-  }, [stopPolling]);
+    return () => stopWatching();
+  }, [stopWatching]);
 
   const reset = useCallback(() => {
-    stopPolling();
+    stopWatching();
     setAnalysis(null);
     setIsUploading(false);
     setIsProcessing(false);
     setError(null);
-  }, [stopPolling]);
+  }, [stopWatching]);
+
+  const finish = useCallback(
+    (result: AnalysisResponse) => {
+      stopWatching();
+      setIsProcessing(false);
+      if (result.status === "failed") {
+        setError(result.error_message ?? "Analysis failed");
+      }
+    },
+    [stopWatching],
+  );
+
+  // Fallback when the event stream can't be used: each request returns as
+  // soon as the analysis reaches its next stage
+  const longPoll = useCallback(
+    async (analysisId: string, run: number) => {
+      while (runRef.current === run) {
+        try {
+          const result = await getAnalysis(analysisId, LONG_POLL_SECONDS);
+          if (runRef.current !== run) return;
+          setAnalysis(result);
+          if (isFinal(result)) {
+            finish(result);
+            return;
+          }
+        } catch {
+          if (runRef.current !== run) return;
+          stopWatching();
+          setIsProcessing(false);
+          setError("Failed to fetch analysis status");
+          return;
+        }
+      }
+    },
+    [finish, stopWatching],
+  );
 
   const upload = useCallback(
     async (file: File, applicationDetails: ApplicationDetails) => {
       setError(null);
       setAnalysis(null);
       setIsUploading(true);
-      stopPolling();
+      stopWatching();
 
       try {
-        const { analysis_id } = await uploadSingle(file, applicationDetails);
+        const uploaded = await uploadSingle(
+          file,
+          applicationDetails,
+          SYNC_TIMEOUT_MS,
+        );
         setIsUploading(false);
+        if ("status" in uploaded) {
+          setAnalysis(uploaded);
+          finish(uploaded);
+          return;
+        }
+        const { analysis_id } = uploaded;
         setIsProcessing(true);
-        pollStartRef.current = Date.now();
+        const run = runRef.current;
 
-        timerRef.current = setInterval(async () => {
-          if (
-            pollStartRef.current &&
-            Date.now() - pollStartRef.current > MAX_POLL_DURATION_MS
-          ) {
-            stopPolling();
-            setIsProcessing(false);
-            setError("Analysis timed out — please try again");
-            return;
+        timeoutRef.current = setTimeout(() => {
+          stopWatching();
+          setIsProcessing(false);
+          setError("Analysis timed out — please try again");
+        }, MAX_WAIT_MS);
+
+        const source = new EventSource(analysisEventsUrl(analysis_id));
+        sourceRef.current = source;
+        source.onmessage = (event) => {
+          const result = JSON.parse(event.data as string) as AnalysisResponse;
+          setAnalysis(result);
+          if (isFinal(result)) {
+            finish(result);
           }
-          try {
-            const result = await getAnalysis(analysis_id);
-            setAnalysis(result);
-            if (result.status === "completed" || result.status === "failed") {
-              stopPolling();
-              setIsProcessing(false);
-              if (result.status === "failed") {
-                setError(result.error_message ?? "Analysis failed");
-              }
-            }
-          } catch {
-            stopPolling();
-            setIsProcessing(false);
-            setError("Failed to fetch analysis status");
+        };
+        source.onerror = () => {
+          source.close();
+          if (sourceRef.current === source) {
+            sourceRef.current = null;
+            void longPoll(analysis_id, run);
           }
-        }, POLL_INTERVAL_MS);
+        };
       } catch {
         setIsUploading(false);
         setError("Failed to upload file");
       }
     },
-    [stopPolling],
+    [finish, longPoll, stopWatching],
   );
 
   return { upload, analysis, isUploading, isProcessing, error, reset };
@@ -5,13 +5,13 @@ import BatchProgress from "../components/batch/BatchProgress";
 import BatchResultsList from "../components/batch/BatchResultsList";
 import BatchUploadForm from "../components/batch/BatchUploadForm";
 import LoadingSpinner from "../components/common/LoadingSpinner";
-import type { AnalysisResponse } from "../types/analysis";
+import type { AnalysisSummary } from "../types/analysis";
 
 export default function BatchUploadPage() {
   const [imageFiles, setImageFiles] = useState<File[]>([]);
   const [csvFile, setCsvFile] = useState<File | null>(null);
   const [batchId, setBatchId] = useState<string | null>(null);
-  const [results, setResults] = useState<AnalysisResponse[]>([]);
+  const [results, setResults] = useState<AnalysisSummary[]>([]);
   const [error, setError] = useState<string | null>(null);
   const [isUploading, setIsUploading] = useState(false);
 
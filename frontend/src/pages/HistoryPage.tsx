@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
 import { bulkDeleteAnalyses, getHistory } from "../api/analysis";
-import type { AnalysisResponse } from "../types/analysis";
+import type { AnalysisSummary } from "../types/analysis";
 import HistoryTable from "../components/history/HistoryTable";
 import LoadingSpinner from "../components/common/LoadingSpinner";
 import ErrorMessage from "../components/common/ErrorMessage";
@@ -8,8 +8,10 @@ import ErrorMessage from "../components/common/ErrorMessage";
 const PAGE_SIZE = 20;
 
 export default function HistoryPage() {
-  const [analyses, setAnalyses] = useState<AnalysisResponse[]>([]);
+  const [analyses, setAnalyses] = useState<AnalysisSummary[]>([]);
   const [page, setPage] = useState(1);
+  // cursors[i] fetches page i + 1; page 1 has no cursor
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
   const [total, setTotal] = useState(0);
   const [verdict, setVerdict] = useState("");
   const [loading, setLoading] = useState(true);
@@ -19,16 +21,23 @@ export default function HistoryPage() {
   useEffect(() => {
     setLoading(true);
     setSelectedIds(new Set());
-    getHistory(page, PAGE_SIZE, verdict || undefined)
+    getHistory(cursors[page - 1] ?? null, PAGE_SIZE, verdict || undefined)
       .then((data) => {
         setAnalyses(data.items);
         setTotal(data.total);
+        setCursors((prev) => {
+          const next = prev.slice(0, page);
+          next[page] = data.next_cursor;
+          return next;
+        });
       })
       .catch(() => setError("Failed to load history"))
       .finally(() => setLoading(false));
   }, [page, verdict]);
 
-  const totalPages = Math.ceil(total / PAGE_SIZE);
+  // The total may come from the server's count cache; the cursor is authoritative
+  const hasNext = Boolean(cursors[page]);
+  const totalPages = hasNext ? Math.max(Math.ceil(total / PAGE_SIZE), page + 1) : page;
 
   const handleBulkDelete = async () => {
     const count = selectedIds.size;
@@ -51,6 +60,7 @@ export default function HistoryPage() {
           value={verdict}
           onChange={(e) => {
             setVerdict(e.target.value);
+            setCursors([null]);
             setPage(1);
           }}
           className="rounded border border-gray-300 px-3 py-1.5 text-sm"
@@ -56,7 +56,7 @@ export default function UploadPage() {
   }
 
   if (isUploading) {
-    return <LoadingSpinner message="Uploading label image..." />;
+    return <LoadingSpinner message="Uploading and analyzing label image..." />;
   }
 
   if (isProcessing) {
@@ -42,15 +42,29 @@ export interface AnalysisResponse {
   detected_brand_name: string | null;
   error_message: string | null;
   total_duration_ms: number | null;
+  stage_timings?: Record<string, number> | null;
   image_url: string | null;
   created_at: string;
 }
 
+export type AnalysisSummary = Pick<
+  AnalysisResponse,
+  | "id"
+  | "label_id"
+  | "status"
+  | "overall_verdict"
+  | "detected_brand_name"
+  | "detected_beverage_type"
+  | "created_at"
+>;
+
 export interface AnalysisListResponse {
-  items: AnalysisResponse[];
+  items: AnalysisSummary[];
   total: number;
   page: number;
   page_size: number;
+  next_cursor: string | null;
+  total_exact: boolean;
 }
 
 export interface BatchResponse {
@@ -64,7 +78,7 @@ export interface BatchResponse {
 
 export interface BatchDetailResponse {
   batch: BatchResponse;
-  analyses: AnalysisResponse[];
+  analyses: AnalysisSummary[];
 }
 
 export interface SampleLabel {